@@ -1,7 +1,7 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
 
-from .models import UserAccount
+from .models import APIKey, UserAccount
 
 
 class UserAccountAdmin(UserAdmin):
@@ -39,4 +39,20 @@ class UserAccountAdmin(UserAdmin):
     readonly_fields = ('created_at', 'updated_at')
     list_editable = ('role','verified',)
 
-admin.site.register(UserAccount, UserAccountAdmin)
\ No newline at end of file
+admin.site.register(UserAccount, UserAccountAdmin)
+
+
+@admin.register(APIKey)
+class APIKeyAdmin(admin.ModelAdmin):
+    list_display = ('name', 'prefix', 'is_active', 'rate_limit', 'burst', 'usage_count', 'last_used_at', 'created_at')
+    list_filter = ('is_active',)
+    search_fields = ('name', 'prefix')
+    readonly_fields = ('prefix', 'usage_count', 'last_used_at', 'created_at')
+    ordering = ('-created_at',)
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            raw_key = obj.set_key()
+            # Solo se guarda el hash: es la única vez que se puede ver la clave
+            messages.warning(request, f"API key for {obj.name}: {raw_key} (copy it now, it will not be shown again)")
+        super().save_model(request, obj, form, change)
@@ -0,0 +1,153 @@
+"""
+API keys: búsqueda por hash, cuotas por clave y contadores de uso.
+
+- Las claves activas (modelo ``APIKey`` más las de ``VALID_API_KEYS``) se
+  cargan en un diccionario ``{sha256: entrada}`` guardado en ``two_tier_cache``:
+  comprobar una clave es calcular su hash y una búsqueda en memoria, sin
+  consultas. Guardar o borrar una ``APIKey`` invalida el diccionario en todos
+  los procesos.
+- Cada clave tiene un token bucket en Redis (``rate_limit`` peticiones por
+  minuto, ráfagas de ``burst``). El mismo script suma el uso de la clave, así
+  que la cuota y el contador cuestan un solo round trip.
+- Las claves de ``VALID_API_KEYS`` las comparte todo el frontend público: su
+  cuota es ``SETTINGS_API_KEY_RATE_LIMIT`` y, con 0 (por defecto), no tienen
+  cuota ni gastan el round trip a Redis.
+- ``sync_api_key_usage`` (Celery) vuelca los contadores a ``usage_count`` y
+  ``last_used_at`` con una sentencia UPDATE.
+"""
+import logging
+
+import redis
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from core.cache import aget_or_fill, get_or_fill, two_tier_cache
+from core.redis_client import drain_counters, get_redis, token_bucket
+from .models import APIKey
+
+logger = logging.getLogger(__name__)
+
+API_KEYS_CACHE_KEY = "api_keys:active"
+USAGE_KEY_PREFIX = "api_key:usage:"
+
+
+def _entry(bucket, key_id, rate_limit, burst):
+    if not rate_limit:
+        # Sin cuota
+        return {"id": key_id, "bucket": bucket, "rate": None, "burst": None}
+    return {
+        "id": key_id,
+        "bucket": bucket,
+        "rate": rate_limit / 60,
+        "burst": burst or settings.API_KEY_BURST or rate_limit,
+    }
+
+
+def load_api_keys():
+    """``{sha256: entrada}`` de todas las claves activas."""
+    keys = {}
+    for raw_key in getattr(settings, "VALID_API_KEYS", []):
+        if raw_key:
+            key_hash = APIKey.hash_key(raw_key)
+            keys[key_hash] = _entry(f"settings:{key_hash[:16]}", None, settings.SETTINGS_API_KEY_RATE_LIMIT, None)
+    for key_id, key_hash, rate_limit, burst in APIKey.objects.filter(is_active=True).values_list(
+        "id", "key_hash", "rate_limit", "burst"
+    ):
+        keys[key_hash] = _entry(str(key_id), str(key_id), rate_limit or settings.API_KEY_RATE_LIMIT, burst)
+    return keys
+
+
+def get_api_keys():
+    return get_or_fill(
+        API_KEYS_CACHE_KEY, load_api_keys, timeout=settings.API_KEY_CACHE_TIMEOUT, store=two_tier_cache
+    )
+
+
+async def aget_api_keys():
+    return await aget_or_fill(
+        API_KEYS_CACHE_KEY, load_api_keys, timeout=settings.API_KEY_CACHE_TIMEOUT, store=two_tier_cache
+    )
+
+
+def invalidate_api_keys():
+    two_tier_cache.delete(API_KEYS_CACHE_KEY)
+
+
+def lookup_api_key(raw_key):
+    """Entrada de la clave, o ``None`` si no existe o está desactivada."""
+    if not raw_key:
+        return None
+    return get_api_keys().get(APIKey.hash_key(raw_key))
+
+
+async def alookup_api_key(raw_key):
+    if not raw_key:
+        return None
+    return (await aget_api_keys()).get(APIKey.hash_key(raw_key))
+
+
+def _quota_call(entry):
+    keys = [f"ratelimit:api_key:{entry['bucket']}"]
+    if entry["id"]:
+        keys.append(f"{USAGE_KEY_PREFIX}{entry['id']}")
+    return keys, [entry["rate"], entry["burst"], 1]
+
+
+def _quota_result(result):
+    allowed, retry_after_ms, _ = result
+    return bool(allowed), retry_after_ms / 1000
+
+
+def consume_api_key_quota(entry, client=None):
+    """
+    Gasta un token de la clave y cuenta su uso. Devuelve ``(permitida,
+    segundos hasta el siguiente token)``. Si Redis no responde la petición
+    se permite: la cuota protege la base de datos, no debe tirar la API.
+    """
+    if entry["rate"] is None:
+        return True, 0
+    keys, args = _quota_call(entry)
+    try:
+        return _quota_result(token_bucket(keys=keys, args=args, client=client))
+    except redis.RedisError as e:
+        logger.warning(f"API key quota check failed: {e}")
+        return True, 0
+
+
+async def aconsume_api_key_quota(entry, client=None):
+    if entry["rate"] is None:
+        return True, 0
+    keys, args = _quota_call(entry)
+    try:
+        return _quota_result(await token_bucket.acall(keys=keys, args=args, client=client))
+    except redis.RedisError as e:
+        logger.warning(f"API key quota check failed: {e}")
+        return True, 0
+
+
+def drain_api_key_usage(client=None):
+    """Vacía los contadores de uso; devuelve ``{api_key_id: peticiones}`` y las claves originales."""
+    client = client or get_redis()
+    counters = drain_counters(client.scan_iter(match=f"{USAGE_KEY_PREFIX}*", count=1000), client=client)
+    counts, keys = {}, {}
+    for key, amount in counters.items():
+        key_id = key.decode().removeprefix(USAGE_KEY_PREFIX)
+        counts[key_id] = amount
+        keys[key_id] = key
+    return counts, keys
+
+
+def apply_api_key_usage(counts):
+    """Suma ``counts`` a ``usage_count`` y marca ``last_used_at`` en una sentencia."""
+    if not counts:
+        return 0
+    increments = Case(
+        *[When(id=key_id, then=Value(amount)) for key_id, amount in counts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    return APIKey.objects.filter(id__in=counts).update(
+        usage_count=F("usage_count") + increments,
+        last_used_at=timezone.now(),
+    )
@@ -0,0 +1,86 @@
+"""
+Autenticación JWT con el usuario en cache.
+
+``CachedJWTAuthentication`` valida el token igual que ``JWTAuthentication``,
+pero lee el usuario de ``two_tier_cache`` (LRU del proceso delante de Redis)
+en lugar de consultar ``UserAccount`` en cada petición. Guardar o borrar el
+usuario (cambio de contraseña, desactivación...) invalida la entrada en todos
+los procesos; ``queryset.update()`` no envía señales y debe llamar a
+``invalidate_cached_user``.
+
+Se siguen comprobando ``is_active`` y el cambio de contraseña
+(``CHECK_REVOKE_TOKEN``). El hash de la contraseña no se guarda en cache:
+solo su huella MD5, que es lo que lleva el token.
+
+La blacklist de simplejwt solo contiene refresh tokens; un access token vale
+hasta que expira o cambia la contraseña, igual que con ``JWTAuthentication``.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.cache import two_tier_cache
+from .models import UserAccount
+
+
+def user_cache_key(user_id):
+    return f"auth:jwt_user:{user_id}"
+
+
+def _user_fields():
+    # Todo menos la contraseña, que queda diferida (se lee de la base de datos si se usa)
+    return [field.attname for field in UserAccount._meta.concrete_fields if field.attname != "password"]
+
+
+def get_cached_user(user_id):
+    """
+    ``(usuario, huella de la contraseña)`` del usuario con id ``user_id``, o
+    ``None``. En cache se guardan los valores de los campos: cada llamada
+    devuelve una instancia nueva, que la petición puede modificar sin afectar
+    a otras.
+    """
+    fields = _user_fields()
+    entry = two_tier_cache.get(user_cache_key(user_id))
+    if entry is None:
+        values = UserAccount.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values(*fields, "password").first()
+        if values is None:
+            return None
+        password = values.pop("password")
+        entry = {
+            "fields": values,
+            "password_hash": get_md5_hash_password(password) if api_settings.CHECK_REVOKE_TOKEN else None,
+        }
+        two_tier_cache.set(user_cache_key(user_id), entry, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+    values = entry["fields"]
+    user = UserAccount.from_db(DEFAULT_DB_ALIAS, fields, [values[field] for field in fields])
+    return user, entry["password_hash"]
+
+
+def invalidate_cached_user(user_id):
+    two_tier_cache.delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cached = get_cached_user(user_id)
+        if cached is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        user, password_hash = cached
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
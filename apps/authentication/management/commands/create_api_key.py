@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.authentication.models import APIKey
+
+
+class Command(BaseCommand):
+    help = (
+        "Create an API key and print it. Only its SHA-256 hash is stored, so the "
+        "key cannot be shown again; revoke it by deactivating it in the admin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", help="Who or what the key is for")
+        parser.add_argument("--rate-limit", type=int, default=None,
+                            help="Requests per minute (default: API_KEY_RATE_LIMIT)")
+        parser.add_argument("--burst", type=int, default=None,
+                            help="Requests allowed at once (default: API_KEY_BURST)")
+
+    def handle(self, *args, **options):
+        api_key = APIKey(name=options["name"], rate_limit=options["rate_limit"], burst=options["burst"])
+        raw_key = api_key.set_key()
+        api_key.save()
+        # Solo la clave en stdout, para poder capturarla desde scripts
+        self.stdout.write(raw_key)
+        self.stderr.write(self.style.SUCCESS(f"Created API key {api_key.prefix}... for {api_key.name}."))
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-19 00:20
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_useraccount_otp_secret'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APIKey',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('prefix', models.CharField(editable=False, max_length=8)),
+                ('key_hash', models.CharField(editable=False, max_length=64, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('rate_limit', models.PositiveIntegerField(blank=True, help_text='Requests per minute', null=True)),
+                ('burst', models.PositiveIntegerField(blank=True, help_text='Requests allowed at once', null=True)),
+                ('usage_count', models.PositiveBigIntegerField(default=0, editable=False)),
+                ('last_used_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'API key',
+                'verbose_name_plural': 'API keys',
+            },
+        ),
+    ]
@@ -1,6 +1,10 @@
+import hashlib
+import secrets
 import uuid
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -111,3 +115,62 @@ class UserAccount(AbstractBaseUser, PermissionsMixin):
         return None
     
 
+
+
+class APIKey(models.Model):
+    """
+    API key de un cliente. Solo se guarda el SHA-256 de la clave: la clave en
+    claro se muestra una vez al crearla (admin o ``create_api_key``).
+    """
+
+    id = models.UUIDField(default=uuid.uuid4, unique=True, primary_key=True)
+    name = models.CharField(max_length=100)
+    # Primeros caracteres de la clave, para reconocerla en el admin
+    prefix = models.CharField(max_length=8, editable=False)
+    key_hash = models.CharField(max_length=64, unique=True, editable=False)
+    is_active = models.BooleanField(default=True)
+
+    # Vacíos: API_KEY_RATE_LIMIT / API_KEY_BURST
+    rate_limit = models.PositiveIntegerField(blank=True, null=True, help_text="Requests per minute")
+    burst = models.PositiveIntegerField(blank=True, null=True, help_text="Requests allowed at once")
+
+    # Los actualiza sync_api_key_usage con los contadores de Redis
+    usage_count = models.PositiveBigIntegerField(default=0, editable=False)
+    last_used_at = models.DateTimeField(blank=True, null=True, editable=False)
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "API key"
+        verbose_name_plural = "API keys"
+
+    def __str__(self):
+        return f"{self.name} ({self.prefix}...)"
+
+    @staticmethod
+    def hash_key(raw_key):
+        # Claves aleatorias de 256 bits: un hash rápido basta, no hace falta PBKDF2
+        return hashlib.sha256(raw_key.encode()).hexdigest()
+
+    def set_key(self, raw_key=None):
+        """Asigna una clave (nueva si no se pasa) y la devuelve en claro."""
+        raw_key = raw_key or secrets.token_urlsafe(32)
+        self.prefix = raw_key[:8]
+        self.key_hash = self.hash_key(raw_key)
+        return raw_key
+
+
+@receiver(post_save, sender=APIKey)
+@receiver(post_delete, sender=APIKey)
+def invalidate_api_keys_on_change(sender, instance, **kwargs):
+    from .api_keys import invalidate_api_keys
+    # Altas, revocaciones y cambios de cuota valen en todos los procesos al momento
+    transaction.on_commit(invalidate_api_keys)
+
+
+@receiver(post_save, sender=UserAccount)
+@receiver(post_delete, sender=UserAccount)
+def invalidate_cached_user_on_change(sender, instance, **kwargs):
+    from .authentication import invalidate_cached_user
+    # Contraseña, is_active, rol...: la siguiente petición lee el usuario actualizado
+    transaction.on_commit(lambda: invalidate_cached_user(instance.pk))
@@ -0,0 +1,82 @@
+"""
+Códigos de un solo uso (OTP) en Redis.
+
+Por usuario y propósito se guarda el HMAC-SHA256 del código (con una clave
+derivada de ``SECRET_KEY``) con TTL ``OTP_TTL``. Es un código de 6 dígitos
+que vive minutos: no necesita un hasher lento como Argon2, y guardarlo no
+escribe en la tabla de usuarios.
+
+``consume_otp`` comprueba el código con un script Lua: el código se borra al
+acertar (un solo uso) y cada intento cuenta; tras ``OTP_MAX_ATTEMPTS``
+fallos el código se invalida y hay que pedir otro.
+"""
+import secrets
+
+from django.conf import settings
+from django.utils.crypto import salted_hmac
+
+from core.redis_client import Script, get_redis
+
+
+def otp_key(user_id, purpose):
+    return f"otp:{purpose}:{user_id}"
+
+
+def otp_attempts_key(user_id, purpose):
+    return f"otp:{purpose}:{user_id}:attempts"
+
+
+def otp_digest(user_id, code, purpose):
+    return salted_hmac("apps.authentication.otp", f"{purpose}:{user_id}:{code}", algorithm="sha256").hexdigest()
+
+
+def store_otp(user_id, code, purpose="login", client=None):
+    """Guarda ``code`` (sustituye al anterior y reinicia los intentos)."""
+    client = client or get_redis()
+    pipe = client.pipeline(transaction=True)
+    pipe.set(otp_key(user_id, purpose), otp_digest(user_id, code, purpose), ex=settings.OTP_TTL)
+    pipe.delete(otp_attempts_key(user_id, purpose))
+    pipe.execute()
+
+
+def generate_otp(user_id, purpose="login", client=None):
+    """Genera un código de 6 dígitos, lo guarda y lo devuelve en claro."""
+    code = f"{secrets.randbelow(10 ** 6):06d}"
+    store_otp(user_id, code, purpose, client=client)
+    return code
+
+
+# KEYS = código, intentos; ARGV = HMAC del código recibido, intentos máximos, TTL.
+# Devuelve 1 si el código es correcto (y lo borra), 0 si no.
+_consume_otp = Script(
+    """
+    local stored = redis.call('GET', KEYS[1])
+    if not stored then
+        return 0
+    end
+    local attempts = redis.call('INCR', KEYS[2])
+    if attempts == 1 then
+        redis.call('EXPIRE', KEYS[2], ARGV[3])
+    end
+    if stored == ARGV[1] then
+        redis.call('DEL', KEYS[1], KEYS[2])
+        return 1
+    end
+    if attempts >= tonumber(ARGV[2]) then
+        redis.call('DEL', KEYS[1], KEYS[2])
+    end
+    return 0
+    """
+)
+
+
+def consume_otp(user_id, code, purpose="login", client=None):
+    """``True`` si ``code`` es el código vigente; en ese caso ya no vuelve a valer."""
+    if not code:
+        return False
+    result = _consume_otp(
+        keys=[otp_key(user_id, purpose), otp_attempts_key(user_id, purpose)],
+        args=[otp_digest(user_id, str(code).strip(), purpose), settings.OTP_MAX_ATTEMPTS, settings.OTP_TTL],
+        client=client,
+    )
+    return result == 1
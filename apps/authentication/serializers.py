@@ -2,8 +2,7 @@ from rest_framework import serializers
 from djoser.serializers import UserCreateSerializer
 from django.contrib.auth import get_user_model
 
-from apps.media.serializers import MediaSerializer
-from apps.user_profile.models import UserProfile
+from apps.user_profile.loaders import profile_picture_loader
 
 
 User = get_user_model()
@@ -37,10 +36,7 @@ class UserSerializer(serializers.ModelSerializer):
             "profile_picture",
         ]
     def get_profile_picture(self, obj):
-        user_profile = UserProfile.objects.get(user=obj)
-        if user_profile and user_profile.profile_picture:
-            return MediaSerializer(user_profile.profile_picture).data
-        return None
+        return profile_picture_loader(self).load(obj.pk)
 
 class UserPublicSerializer(serializers.ModelSerializer):
     profile_picture = serializers.SerializerMethodField()
@@ -58,7 +54,4 @@ class UserPublicSerializer(serializers.ModelSerializer):
         ]
 
     def get_profile_picture(self, obj):
-        user_profile = UserProfile.objects.get(user=obj)
-        if user_profile and user_profile.profile_picture:
-            return MediaSerializer(user_profile.profile_picture).data
-        return None
\ No newline at end of file
+        return profile_picture_loader(self).load(obj.pk)
\ No newline at end of file
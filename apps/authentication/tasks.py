@@ -0,0 +1,26 @@
+from celery import shared_task
+
+import logging
+
+from core.redis_client import get_redis
+from .api_keys import apply_api_key_usage, drain_api_key_usage
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def sync_api_key_usage():
+    """
+    Vuelca a la base de datos el uso de las API keys contado en Redis, con una
+    sola sentencia para todas las claves.
+    """
+    counts, keys = drain_api_key_usage()
+    try:
+        apply_api_key_usage(counts)
+    except Exception as e:
+        # Devolver los contadores a Redis para el siguiente intento
+        pipe = get_redis().pipeline(transaction=False)
+        for key_id, amount in counts.items():
+            pipe.incrby(keys[key_id], amount)
+        pipe.execute()
+        logger.error(f"Error syncing API key usage: {str(e)}")
@@ -1,3 +1,268 @@
-from django.test import TestCase
+import re
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+import pyotp
+
+from core.cache import two_tier_cache
+from core.redis_client import get_redis, reset_redis, token_bucket
+from .api_keys import consume_api_key_quota, lookup_api_key
+from .authentication import CachedJWTAuthentication, user_cache_key
+from .models import APIKey, UserAccount
+from .otp import consume_otp, generate_otp
+from .tasks import sync_api_key_usage
+
+
+### API KEY TESTS
+
+@override_settings(REDIS_BACKEND="fake")
+class APIKeyTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        cache.clear()
+        two_tier_cache.clear_local()
+        self.api_key = APIKey(name="Partner", rate_limit=60, burst=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.raw_key = self.api_key.set_key()
+            self.api_key.save()
+
+    def tearDown(self):
+        cache.clear()
+        two_tier_cache.clear_local()
+
+    def test_only_the_hash_is_stored(self):
+        self.assertNotEqual(self.api_key.key_hash, self.raw_key)
+        self.assertEqual(self.api_key.prefix, self.raw_key[:8])
+        self.assertFalse(APIKey.objects.filter(key_hash__contains=self.raw_key).exists())
+
+    def test_lookup_is_cached(self):
+        self.assertEqual(lookup_api_key(self.raw_key)["id"], str(self.api_key.id))
+        self.assertIsNotNone(lookup_api_key(settings.VALID_API_KEYS[0]))
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(lookup_api_key(self.raw_key))
+            self.assertIsNone(lookup_api_key("unknown"))
+
+    def test_revoking_a_key_invalidates_the_cache(self):
+        self.assertIsNotNone(lookup_api_key(self.raw_key))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_key.is_active = False
+            self.api_key.save()
+        self.assertIsNone(lookup_api_key(self.raw_key))
+
+    def test_over_quota_is_throttled_before_the_view(self):
+        url = reverse("category-list")
+        client = APIClient()
+        for _ in range(2):
+            self.assertNotEqual(client.get(url, HTTP_API_KEY=self.raw_key).status_code, 429)
+
+        with self.assertNumQueries(0):
+            response = client.get(url, HTTP_API_KEY=self.raw_key)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "1")
+
+        self.assertIn(client.get(url, HTTP_API_KEY="unknown").status_code, (401, 403))
+
+    def test_settings_keys_have_no_quota_by_default(self):
+        entry = lookup_api_key(settings.VALID_API_KEYS[0])
+        for _ in range(settings.API_KEY_RATE_LIMIT + 10):
+            self.assertEqual(consume_api_key_quota(entry), (True, 0))
+        self.assertEqual(get_redis().keys("ratelimit:api_key:*"), [])
+
+    @override_settings(SETTINGS_API_KEY_RATE_LIMIT=60)
+    def test_settings_keys_quota_is_configurable(self):
+        two_tier_cache.clear_local()
+        cache.clear()
+        entry = lookup_api_key(settings.VALID_API_KEYS[0])
+        results = [consume_api_key_quota(entry)[0] for _ in range(61)]
+        self.assertEqual(results.count(False), 1)
+
+    def test_usage_is_synced_in_one_update(self):
+        other_key = APIKey(name="Other")
+        with self.captureOnCommitCallbacks(execute=True):
+            other_raw_key = other_key.set_key()
+            other_key.save()
+        for raw_key in (self.raw_key, self.raw_key, other_raw_key, settings.VALID_API_KEYS[0]):
+            consume_api_key_quota(lookup_api_key(raw_key))
+
+        with CaptureQueriesContext(connection) as queries:
+            sync_api_key_usage()
+        updates = [query for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+
+        self.api_key.refresh_from_db()
+        other_key.refresh_from_db()
+        self.assertEqual(self.api_key.usage_count, 2)
+        self.assertEqual(other_key.usage_count, 1)
+        self.assertIsNotNone(self.api_key.last_used_at)
+        self.assertEqual(get_redis().keys("api_key:usage:*"), [])
+
+    def test_token_bucket_refills(self):
+        redis_client = get_redis()
+        # El script usa el reloj de Redis (TIME); fakeredis lo lee de time.time
+        with patch("time.time", return_value=1_700_000_000.0):
+            results = [token_bucket(keys=["bucket"], args=[1, 2, 1], client=redis_client)[0] for _ in range(3)]
+            self.assertEqual(results, [1, 1, 0])
+        with patch("time.time", return_value=1_700_000_000.5):
+            self.assertEqual(token_bucket(keys=["bucket"], args=[1, 2, 1], client=redis_client)[:2], [0, 500])
+        with patch("time.time", return_value=1_700_000_001.0):
+            self.assertEqual(token_bucket(keys=["bucket"], args=[1, 2, 1], client=redis_client)[0], 1)
+
+
+### JWT AUTHENTICATION TESTS
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        two_tier_cache.clear_local()
+        self.user = UserAccount.objects.create_user(
+            email="jwtcache@example.com", password="password", username="jwtcache",
+            first_name="JWT", last_name="Cache", is_active=True,
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.factory = APIRequestFactory()
+
+    def tearDown(self):
+        cache.clear()
+        two_tier_cache.clear_local()
+
+    def authenticate(self):
+        request = self.factory.get("/", HTTP_AUTHORIZATION=f"JWT {self.token}")
+        return CachedJWTAuthentication().authenticate(request)[0]
+
+    def test_user_is_cached(self):
+        self.assertEqual(self.authenticate(), self.user)
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertEqual(user.email, self.user.email)
+        self.assertFalse(user._state.adding)
+        # Cada petición recibe su propia instancia
+        user.first_name = "Changed"
+        self.assertEqual(self.authenticate().first_name, "JWT")
+
+    def test_saving_the_user_invalidates_the_cache(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password("new-password")
+            self.user.save()
+        self.assertTrue(self.authenticate().check_password("new-password"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_password_hash_is_not_cached(self):
+        self.authenticate()
+        entry = two_tier_cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn("password", entry["fields"])
+        self.assertNotIn(self.user.password, str(entry))
+
+    def test_password_change_revokes_tokens(self):
+        with patch.object(jwt_settings, "CHECK_REVOKE_TOKEN", True):
+            self.token = AccessToken.for_user(self.user)
+            self.authenticate()
+            with self.assertNumQueries(0):
+                self.authenticate()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.set_password("new-password")
+                self.user.save()
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate()
+
+
+### OTP TESTS
+
+@override_settings(REDIS_BACKEND="fake", OTP_MAX_ATTEMPTS=3)
+class OTPStoreTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        self.user = UserAccount.objects.create_user(
+            email="otp@example.com", password="password", username="otpuser",
+            first_name="One", last_name="Time", is_active=True,
+        )
+
+    def test_code_is_single_use(self):
+        code = generate_otp(self.user.pk)
+        self.assertNotIn(code.encode(), get_redis().get(f"otp:login:{self.user.pk}"))
+        self.assertFalse(consume_otp(self.user.pk, "not-the-code"))
+        self.assertTrue(consume_otp(self.user.pk, code))
+        self.assertFalse(consume_otp(self.user.pk, code))
+
+    def test_code_is_burned_after_max_attempts(self):
+        code = generate_otp(self.user.pk)
+        for _ in range(3):
+            self.assertFalse(consume_otp(self.user.pk, "000000" if code != "000000" else "111111"))
+        self.assertFalse(consume_otp(self.user.pk, code))
+
+    def test_codes_are_scoped_by_purpose(self):
+        code = generate_otp(self.user.pk, purpose="email_change")
+        self.assertFalse(consume_otp(self.user.pk, code))
+        self.assertTrue(consume_otp(self.user.pk, code, purpose="email_change"))
+
+    def test_login_flow_does_not_write_the_user(self):
+        client = APIClient()
+        updated_at = self.user.updated_at
+        response = client.post("/api/authentication/send_otp_login/", {"email": self.user.email},
+                               format="json", HTTP_API_KEY=settings.VALID_API_KEYS[0])
+        self.assertEqual(response.status_code, 200)
+        code = re.search(r"\d{6}", mail.outbox[-1].body).group()
+
+        response = client.post("/api/authentication/verify_otp_login/", {"email": self.user.email, "otp": code},
+                               format="json", HTTP_API_KEY=settings.VALID_API_KEYS[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access", response.json()["results"])
+
+        response = client.post("/api/authentication/verify_otp_login/", {"email": self.user.email, "otp": code},
+                               format="json", HTTP_API_KEY=settings.VALID_API_KEYS[0])
+        self.assertEqual(response.status_code, 400)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.updated_at, updated_at)
+        self.assertIsNone(self.user.otp_secret)
+
+    def test_totp_login_only_writes_the_used_flag_once(self):
+        secret = pyotp.random_base32()
+        UserAccount.objects.filter(pk=self.user.pk).update(otp_base32=secret)
+        client = APIClient()
+
+        for expected_updates in (1, 0):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post("/api/authentication/otp_login/",
+                                       {"email": self.user.email, "otp": pyotp.TOTP(secret).now()},
+                                       format="json", HTTP_API_KEY=settings.VALID_API_KEYS[0])
+            self.assertEqual(response.status_code, 200)
+            updates = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+            self.assertEqual(len(updates), expected_updates)
+            if updates:
+                self.assertNotIn('"updated_at"', updates[0])
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.login_otp_used)
+
+    def test_login_reset_only_resets_user_state(self):
+        UserAccount.objects.filter(pk=self.user.pk).update(
+            otp_base32=pyotp.random_base32(), qr_code="qrcode/otp.png", login_otp_used=True,
+        )
+        client = APIClient()
+        client.force_authenticate(UserAccount.objects.get(pk=self.user.pk))
+        response = client.post("/api/authentication/otp_login_reset/", format="json",
+                               HTTP_API_KEY=settings.VALID_API_KEYS[0])
+        self.assertEqual(response.status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.login_otp_used)
+        self.assertIsNotNone(self.user.otp_created_at)
+        self.assertIsNone(self.user.login_otp)
+        self.assertEqual(get_redis().keys("otp:*"), [])
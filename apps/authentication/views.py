@@ -6,7 +6,6 @@ from rest_framework import status
 from rest_framework import permissions
 from rest_framework_api.views import StandardAPIView
 from django.contrib.auth import get_user_model
-from django.contrib.auth.hashers import make_password
 from django.core.files.base import ContentFile
 from django.utils.crypto import get_random_string
 from django.utils import timezone
@@ -17,6 +16,7 @@ import pyotp
 import qrcode
 
 from core.permissions import HasValidAPIKey
+from .otp import consume_otp, generate_otp
 from utils.ip_utils import get_client_ip
 from utils.string_utils import sanitize_string, sanitize_username
 
@@ -85,21 +85,21 @@ class OTPLoginResetView(StandardAPIView):
             print(f"New login IP for user: {user.email}")
             # TODO: Send user email
 
-        user.login_ip = new_ip
-
         if user.qr_code is None or user.otp_base32 is None:
             return self.error("QR Code or OTP Base32 not found for user")
         
+        # Comprueba que el secreto genera códigos; el TOTP se verifica siempre contra
+        # otp_base32, así que el código no se guarda (ni se hashea con Argon2)
         try:
-            totp = pyotp.TOTP(user.otp_base32).now()
+            pyotp.TOTP(user.otp_base32).now()
         except Exception as e:
             return self.error(f"Error generating TOPT: {str(e)}")
         
-        user.login_otp = make_password(totp)
-        user.otp_created_at = timezone.now()
+        # Solo se reinicia el estado que expone UserSerializer, en un UPDATE de esos campos
+        user.login_ip = new_ip
         user.login_otp_used = False
-
-        user.save()
+        user.otp_created_at = timezone.now()
+        user.save(update_fields=["login_ip", "login_otp_used", "otp_created_at"])
 
         return self.response("OTP Reset Successfully for user")
     
@@ -196,9 +196,11 @@ class OTPLoginView(StandardAPIView):
             if not totp.verify(otp_code):
                 return self.error("Invalid OTP code.")
             
-            # Actualizar el estado del OTP
-            user.login_otp_used = True
-            user.save()
+            # ``login_otp_used`` lo expone UserSerializer: solo se escribe ese campo, y
+            # solo la primera vez tras reiniciar el OTP
+            if not user.login_otp_used:
+                user.login_otp_used = True
+                user.save(update_fields=["login_otp_used"])
 
             # Generar tokens JWT
             refresh = RefreshToken.for_user(user)
@@ -223,19 +225,15 @@ class SendOTPLoginView(StandardAPIView):
         except User.DoesNotExist:
             return self.error("User does not exist or is not active.")
         
-        # Generar OTP
-        secret = pyotp.random_base32()
-        user.otp_secret = secret
-        user.save()
-
-        totp = pyotp.TOTP(secret)
-        otp = totp.now()
+        # Generar OTP: se guarda en Redis, el usuario no se modifica
+        otp = generate_otp(user.pk)
 
         # Enviar correo con OTP
         # Obtener el dominio del sitio configurado
         site = Site.objects.get_current()
         domain = site.domain
 
+        # Se encola en la bandeja de salida (EMAIL_BACKEND): no espera al servidor SMTP
         send_mail(
             'Your OTP Code',
             f'Your OTP code is {otp}',
@@ -263,10 +261,8 @@ class VerifyOTPLoginView(StandardAPIView):
         except User.DoesNotExist:
             return self.error("User does not exist or is not active.")
         
-        # Generar OTP
-        totp = pyotp.TOTP(user.otp_secret)
-
-        if totp.verify(otp_code):
+        # Un solo uso y con intentos limitados
+        if consume_otp(user.pk, otp_code):
             # Generar tokens JWT
             refresh = RefreshToken.for_user(user)
             return self.response({
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from core.admin import ScalableModelAdmin, CursorPaginatedModelAdmin, media_preview
+
 from .models import (
     Category, 
     Post, 
@@ -15,8 +17,9 @@ from .models import (
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'title', 'parent', 'slug', 'thumbnail_preview')
+class CategoryAdmin(ScalableModelAdmin):
+    list_display = ('name', 'title', 'parent', 'slug', media_preview('thumbnail', 'Thumbnail Preview', empty='No Thumbnail'))
+    list_select_related = ('parent', 'thumbnail')
     search_fields = ('name', 'title', 'description', 'slug')
     prepopulated_fields = {'slug': ('name',)}
     list_filter = ('parent',)
@@ -25,8 +28,9 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(CategoryAnalytics)
-class CategoryAnalyticsAdmin(admin.ModelAdmin):
+class CategoryAnalyticsAdmin(ScalableModelAdmin):
     list_display = ('category_name', 'views', 'impressions', 'clicks', 'click_through_rate', 'avg_time_on_page')
+    list_select_related = ('category',)
     search_fields = ('category__name',)
     readonly_fields = ('category','views','impressions','clicks','click_through_rate','avg_time_on_page')
 
@@ -45,8 +49,9 @@ class HeadingInline(admin.TabularInline):
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'status', 'category', 'created_at', 'updated_at', 'thumbnail_preview')
+class PostAdmin(ScalableModelAdmin):
+    list_display = ('title', 'status', 'category', 'created_at', 'updated_at', media_preview('thumbnail', 'Thumbnail Preview', empty='No Thumbnail'))
+    list_select_related = ('category', 'thumbnail')
     search_fields = ('title', 'description', 'content', 'keywords', 'slug')
     prepopulated_fields = {'slug': ('title',)}
     list_filter = ('status','category', 'updated_at',)
@@ -64,8 +69,9 @@ class PostAdmin(admin.ModelAdmin):
 
 
 @admin.register(PostAnalytics)
-class PostAnalyticsAdmin(admin.ModelAdmin):
+class PostAnalyticsAdmin(ScalableModelAdmin):
     list_display = ('post_title', 'views', 'impressions', 'clicks', 'click_through_rate', 'avg_time_on_page', 'likes', 'comments', 'shares')
+    list_select_related = ('post',)
     search_fields = ('post__title', 'post__slug')
     readonly_fields = ('post','views','impressions','clicks','click_through_rate','avg_time_on_page', 'likes', 'comments', 'shares')
 
@@ -76,8 +82,9 @@ class PostAnalyticsAdmin(admin.ModelAdmin):
 
 
 @admin.register(PostInteraction)
-class PostInteractionAdmin(admin.ModelAdmin):
+class PostInteractionAdmin(CursorPaginatedModelAdmin):
     list_display = ('user', 'post', 'interaction_type', 'timestamp')
+    list_select_related = ('user', 'post')
     search_fields = ('user__username', 'post__title', 'interaction_type')
     list_filter = ('interaction_type', 'timestamp')
     ordering = ('-timestamp',)
@@ -90,7 +97,7 @@ class PostInteractionAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ScalableModelAdmin):
     list_display = ("id", "user", "post", "parent", "created_at", "updated_at", "is_active")
     search_fields = ("user__username", "post__title", "content")
     list_filter = ("is_active", "created_at", "updated_at")
@@ -108,7 +115,7 @@ class CommentAdmin(admin.ModelAdmin):
 
 
 @admin.register(PostLike)
-class PostLikeAdmin(admin.ModelAdmin):
+class PostLikeAdmin(CursorPaginatedModelAdmin):
     list_display = ("id", "user", "post", "timestamp")
     search_fields = ("user__username", "post__title")
     list_filter = ("timestamp",)
@@ -126,7 +133,7 @@ class PostLikeAdmin(admin.ModelAdmin):
 
 
 @admin.register(PostShare)
-class PostShareAdmin(admin.ModelAdmin):
+class PostShareAdmin(CursorPaginatedModelAdmin):
     list_display = ("id", "user", "post", "platform", "timestamp")
     search_fields = ("user__username", "post__title", "platform")
     list_filter = ("platform", "timestamp")
@@ -144,7 +151,7 @@ class PostShareAdmin(admin.ModelAdmin):
 
 
 @admin.register(PostView)
-class PostViewAdmin(admin.ModelAdmin):
+class PostViewAdmin(CursorPaginatedModelAdmin):
     list_display = ("id", "user", "post", "ip_address", "timestamp")
     search_fields = ("user__username", "post__title", "ip_address")
     list_filter = ("timestamp",)
@@ -0,0 +1,226 @@
+"""
+Variantes async de los endpoints de lectura con más tráfico.
+
+Mismo comportamiento, claves de cache y respuestas que las vistas de
+``views.py``, pero con los aciertos de cache y los contadores de Redis
+esperados en el event loop (``redis.asyncio``). Solo lo que necesita el ORM
+o los serializadores de DRF (reconstruir el cache, registrar vistas) pasa
+por un hilo. Se enrutan en lugar de las sync con ``ASYNC_READ_VIEWS``.
+
+``PostCommentsStreamView`` (SSE) solo tiene sentido bajo ASGI.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound, APIException
+from rest_framework import status
+
+from core.cache import two_tier_cache, aget_or_fill
+from core.conditional import get_not_modified_response, set_validators
+from core.permissions import HasValidAPIKey
+from core.pubsub import get_hub
+from core.redis_client import aincr_many
+from core.renderers import ORJSONRenderer, EventStreamRenderer
+from core.response_cache import aresponse_cache_key
+from core.views import AsyncStandardAPIView
+from utils.ip_utils import get_client_ip
+from .models import Post
+from .serializers import CategoryListSerializer
+from .views import (
+    HOT_LIST_PAGES,
+    PostListView,
+    PostDetailView,
+    PostHeadingsView,
+    CategoryListView,
+    ListPostCommentsView,
+    post_list_cache_key,
+    apost_comments_cache_key,
+    post_comments_channel,
+    aregister_post_view,
+)
+
+
+class AsyncPostListView(AsyncStandardAPIView, PostListView):
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            search, sorting, ordering, author, is_featured, categories, page = self._get_params(request)
+
+            cache_key = post_list_cache_key(search, sorting, ordering, author, categories, is_featured, page)
+            post_cache = two_tier_cache if page in HOT_LIST_PAGES else cache
+            posts = await aget_or_fill(
+                cache_key,
+                lambda: self._get_posts(search, sorting, author, categories, is_featured),
+                timeout=60 * 5,
+                store=post_cache,
+            )
+
+            await aincr_many([f"post:impressions:{post.id}" for post in posts])
+
+            etag = self._get_etag(request, cache_key, posts)
+            not_modified = get_not_modified_response(request, etag)
+            if not_modified is not None:
+                return not_modified
+
+            return await self.acached_response(
+                request,
+                await aresponse_cache_key(request, "post_list", signed=True),
+                lambda: set_validators(self.paginate(request, self._serialize_posts(posts)), etag),
+                timeout=settings.AWS_CLOUDFRONT_SIGNED_URL_EXPIRE,
+                meta={"post_ids": [post.id for post in posts]},
+            )
+        except NotFound:
+            return self.response([], status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            raise APIException(detail=f"An unexpected error occurred: {str(e)}")
+
+
+class AsyncPostDetailView(AsyncStandardAPIView, PostDetailView):
+
+    async def get(self, request):
+        ip_address = get_client_ip(request)
+        slug = request.query_params.get("slug")
+        user = request.user if request.user.is_authenticated else None
+
+        if not slug:
+            raise NotFound(detail="A valid slug must be provided")
+
+        try:
+            post = await aget_or_fill(
+                f"post_detail:{slug}",
+                lambda: self._get_post(slug),
+                timeout=60 * 5,
+                store=two_tier_cache,
+            )
+
+            await aregister_post_view(post.id, ip_address, user)
+
+            etag, last_modified = self._get_validators(post, user)
+            not_modified = get_not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                not_modified["Vary"] = "Authorization"
+                return not_modified
+
+            if user is None:
+                return await self.acached_response(
+                    request,
+                    await aresponse_cache_key(request, f"post_detail:{slug}", signed=True),
+                    lambda: self._build_response(request, post, etag, last_modified),
+                    timeout=settings.AWS_CLOUDFRONT_SIGNED_URL_EXPIRE,
+                    meta={"post_id": post.id},
+                )
+
+            return await sync_to_async(self._build_response)(request, post, etag, last_modified)
+
+        except Post.DoesNotExist:
+            raise NotFound(detail="The requested post does not exist")
+        except Exception as e:
+            raise APIException(detail=f"An unexpected error occurred: {str(e)}")
+
+
+class AsyncPostHeadingsView(AsyncStandardAPIView, PostHeadingsView):
+
+    async def get(self, request):
+        post_slug = request.query_params.get("slug")
+
+        headings = await aget_or_fill(
+            f"post_headings:{post_slug}",
+            lambda: self._get_headings(post_slug),
+            timeout=60 * 5,
+        )
+
+        not_modified = get_not_modified_response(request, headings["etag"], headings["last_modified"])
+        if not_modified is not None:
+            return not_modified
+
+        return await self.acached_response(
+            request,
+            await aresponse_cache_key(request, f"post_headings:{post_slug}"),
+            lambda: set_validators(self.response(headings["results"]), headings["etag"], headings["last_modified"]),
+        )
+
+
+class AsyncCategoryListView(AsyncStandardAPIView, CategoryListView):
+
+    async def get(self, request):
+        try:
+            parent_slug, ordering, sorting, search, page = self._get_params(request)
+
+            cache_key = f"category_list:{page}:{ordering}:{sorting}:{search}:{parent_slug}"
+            categories = await aget_or_fill(
+                cache_key,
+                lambda: self._get_categories(parent_slug, ordering, sorting, search),
+                timeout=60 * 5,
+                store=two_tier_cache,
+            )
+
+            serialized_categories = await sync_to_async(
+                lambda: CategoryListSerializer(categories, many=True).data
+            )()
+
+            await aincr_many([f"category:impressions:{category.id}" for category in categories])
+
+            return self.paginate(request, serialized_categories)
+        except Exception as e:
+            raise APIException(detail=f"An unexpected error occurred: {str(e)}")
+
+
+class AsyncListPostCommentsView(AsyncStandardAPIView, ListPostCommentsView):
+
+    async def get(self, request):
+        post_slug = request.query_params.get("slug", None)
+        page = request.query_params.get("p", "1")
+
+        if not post_slug:
+            raise NotFound(detail="A valid post slug must be provided")
+
+        serialized_comments = await aget_or_fill(
+            await apost_comments_cache_key(post_slug, page),
+            lambda: self._get_serialized_comments(post_slug),
+            timeout=60 * 5,
+        )
+
+        return self.paginate(request, serialized_comments)
+
+
+class PostCommentsStreamView(AsyncStandardAPIView):
+    """
+    Server-sent events con los comentarios y respuestas nuevos de un post,
+    publicados por ``PostCommentViews`` y ``CommentReplyViews``. El cliente
+    carga el hilo una vez con ``post/comments/`` y aplica los eventos.
+    """
+    permission_classes = [HasValidAPIKey]
+    renderer_classes = [ORJSONRenderer, EventStreamRenderer]
+
+    async def get(self, request):
+        post_slug = request.query_params.get("slug", None)
+
+        if not post_slug:
+            raise NotFound(detail="A valid post slug must be provided")
+
+        post_id = await Post.postobjects.filter(slug=post_slug).values_list("id", flat=True).afirst()
+        if post_id is None:
+            raise NotFound(detail=f"Post: {post_slug} does not exist")
+
+        response = StreamingHttpResponse(self._stream(post_id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Sin buffer en nginx: cada evento se envía al momento
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def _stream(self, post_id):
+        # Una sola suscripción a Redis por proceso, compartida por todos los clientes
+        async with get_hub(post_comments_channel("*")).subscribe(post_comments_channel(post_id)) as queue:
+            yield b"retry: 3000\n\n"
+            # Django 4.2 no detecta la desconexión del cliente en un stream: se
+            # cierra cada cierto tiempo y EventSource se reconecta solo
+            deadline = asyncio.get_running_loop().time() + settings.SSE_STREAM_TIMEOUT
+            while asyncio.get_running_loop().time() < deadline:
+                try:
+                    yield await asyncio.wait_for(queue.get(), settings.SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Comentario SSE: mantiene la conexión abierta a través de proxies
+                    yield b": keepalive\n\n"
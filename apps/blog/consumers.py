@@ -0,0 +1,73 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from core.permissions import ais_valid_api_key
+from .models import Post, PostAnalytics
+
+# Métricas del post que se envían a los clientes conectados
+COUNTER_FIELDS = ("views", "likes", "comments", "shares")
+
+
+def post_counters_group(post_id):
+    return f"post_counters.{post_id}"
+
+
+def get_post_counters(post_id):
+    """Contadores actuales del post, o None si no tiene analíticas."""
+    return PostAnalytics.objects.filter(post_id=post_id).values(*COUNTER_FIELDS).first()
+
+
+class PostCountersConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Envía los contadores de un post publicado: una instantánea al conectar y
+    después las actualizaciones agrupadas por ``broadcast_post_counters``.
+
+    Los navegadores no pueden enviar cabeceras en un WebSocket: la API key se
+    acepta en la cabecera ``API-Key`` o en el parámetro ``api_key``.
+    """
+
+    group_name = None
+
+    async def connect(self):
+        if not await ais_valid_api_key(self._get_api_key()):
+            await self.close(code=4401)
+            return
+
+        slug = self.scope["url_route"]["kwargs"]["slug"]
+        post_id, counters = await self._get_post(slug)
+        if post_id is None:
+            await self.close(code=4404)
+            return
+
+        self.group_name = post_counters_group(post_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.send_json({"type": "counters", "post": str(post_id), **counters})
+
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # Canal de solo lectura
+        pass
+
+    async def post_counters(self, event):
+        await self.send_json({"type": "counters", "post": event["post"], **event["counters"]})
+
+    def _get_api_key(self):
+        headers = dict(self.scope.get("headers", []))
+        api_key = headers.get(b"api-key")
+        if api_key is not None:
+            return api_key.decode("latin-1")
+        query = parse_qs(self.scope.get("query_string", b"").decode("latin-1"))
+        return query.get("api_key", [None])[0]
+
+    @database_sync_to_async
+    def _get_post(self, slug):
+        post_id = Post.postobjects.filter(slug=slug).values_list("id", flat=True).first()
+        if post_id is None:
+            return None, None
+        return post_id, get_post_counters(post_id) or dict.fromkeys(COUNTER_FIELDS, 0)
@@ -0,0 +1,182 @@
+"""
+Eventos de vistas e impresiones de posts, aplicados a la base de datos por lotes.
+
+- Vistas: cada lectura de un post añade un evento al stream de Redis
+  ``POST_VIEWS_STREAM``. ``flush_post_view_events`` (Celery) lo consume con un
+  grupo de consumidores en lotes de ``POST_EVENTS_BATCH_SIZE``.
+- Impresiones: ya llegan agregadas en contadores de Redis por post
+  (``post:impressions:<id>``) y las vacía ``sync_impressions_to_db``.
+
+En los dos casos los eventos se agrupan por post y cada lote se escribe con
+una sola sentencia UPDATE. La carga en la base de datos depende del número
+de posts con actividad, no del número de eventos.
+"""
+import collections
+import uuid
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, IntegerField, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from core.redis_client import get_async_redis, get_redis
+from .models import Post, PostAnalytics, PostInteraction, PostView
+
+POST_VIEWS_STREAM = "events:post_views"
+POST_VIEWS_GROUP = "post_views"
+
+
+def _post_view_event(post_id, ip_address, user_id):
+    return {"post": str(post_id), "ip": ip_address, "user": str(user_id) if user_id else ""}
+
+
+def add_post_view_event(post_id, ip_address, user_id=None, client=None):
+    """Añade una vista al stream. ``MAXLEN`` aproximado acota la memoria si nadie lo consume."""
+    client = client or get_redis()
+    return client.xadd(
+        POST_VIEWS_STREAM,
+        _post_view_event(post_id, ip_address, user_id),
+        maxlen=settings.POST_EVENTS_MAX_LENGTH,
+        approximate=True,
+    )
+
+
+async def aadd_post_view_event(post_id, ip_address, user_id=None, client=None):
+    client = client or get_async_redis()
+    return await client.xadd(
+        POST_VIEWS_STREAM,
+        _post_view_event(post_id, ip_address, user_id),
+        maxlen=settings.POST_EVENTS_MAX_LENGTH,
+        approximate=True,
+    )
+
+
+def ensure_post_views_group(client=None):
+    client = client or get_redis()
+    try:
+        client.xgroup_create(POST_VIEWS_STREAM, POST_VIEWS_GROUP, id="0", mkstream=True)
+    except redis.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def read_post_view_events(consumer, count, client=None):
+    """
+    Hasta ``count`` entradas ``(id, campos)`` para ``consumer``: primero las que
+    otro consumidor leyó y no confirmó en ``POST_EVENTS_CLAIM_IDLE`` segundos
+    (se cayó a mitad de lote), después las nuevas.
+    """
+    client = client or get_redis()
+    _, entries, _ = client.xautoclaim(
+        POST_VIEWS_STREAM, POST_VIEWS_GROUP, consumer,
+        min_idle_time=settings.POST_EVENTS_CLAIM_IDLE * 1000, count=count,
+    )
+    entries = [(entry_id, fields) for entry_id, fields in entries if fields]
+    if len(entries) < count:
+        for _, stream_entries in client.xreadgroup(
+            POST_VIEWS_GROUP, consumer, {POST_VIEWS_STREAM: ">"}, count=count - len(entries)
+        ) or []:
+            entries.extend(stream_entries)
+    return entries
+
+
+def ack_post_view_events(entry_ids, client=None):
+    """Confirma y borra las entradas ya aplicadas en un solo round trip."""
+    if not entry_ids:
+        return
+    client = client or get_redis()
+    pipe = client.pipeline(transaction=False)
+    pipe.xack(POST_VIEWS_STREAM, POST_VIEWS_GROUP, *entry_ids)
+    pipe.xdel(POST_VIEWS_STREAM, *entry_ids)
+    pipe.execute()
+
+
+def parse_post_view_event(fields):
+    """Campos del stream -> ``(post_id, ip_address, user_id)``."""
+    fields = {key.decode() if isinstance(key, bytes) else key: value.decode() if isinstance(value, bytes) else value
+              for key, value in fields.items()}
+    return uuid.UUID(fields["post"]), fields["ip"], uuid.UUID(fields["user"]) if fields.get("user") else None
+
+
+def counter_increments(counts, fk="post_id"):
+    """``Case`` con el incremento de cada fila de ``counts`` (``{fk_id: n}``)."""
+    return Case(
+        *[When(**{fk: key}, then=Value(amount)) for key, amount in counts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def apply_post_views(events):
+    """
+    Aplica un lote de vistas ``(post_id, ip_address, user_id)``. Como antes,
+    solo cuenta la primera vista de cada (post, usuario, IP). Devuelve
+    ``{post_id: vistas únicas nuevas}``.
+    """
+    events = set(events)
+    if not events:
+        return {}
+
+    post_ids = {post_id for post_id, _, _ in events}
+    existing_posts = set(Post.objects.filter(id__in=post_ids).values_list("id", flat=True))
+    existing_views = set(
+        PostView.objects.filter(
+            post_id__in=existing_posts, ip_address__in={ip_address for _, ip_address, _ in events}
+        ).values_list("post_id", "ip_address", "user_id")
+    )
+    new_views = [event for event in events if event[0] in existing_posts and event not in existing_views]
+    if not new_views:
+        return {}
+
+    now = timezone.now()
+    counts = collections.Counter(post_id for post_id, _, _ in new_views)
+
+    with transaction.atomic():
+        PostView.objects.bulk_create(
+            [PostView(post_id=post_id, ip_address=ip_address, user_id=user_id)
+             for post_id, ip_address, user_id in new_views],
+            ignore_conflicts=True,
+        )
+        # bulk_create no llama a PostInteraction.save(): los campos derivados van aquí
+        PostInteraction.objects.bulk_create(
+            [
+                PostInteraction(
+                    post_id=post_id, user_id=user_id, ip_address=ip_address,
+                    interaction_type="view", interaction_category="passive",
+                    hour_of_day=now.hour, day_of_week=now.weekday(),
+                )
+                for post_id, ip_address, user_id in new_views
+            ],
+            ignore_conflicts=True,
+        )
+        PostAnalytics.objects.bulk_create([PostAnalytics(post_id=post_id) for post_id in counts], ignore_conflicts=True)
+        PostAnalytics.objects.filter(post_id__in=counts).update(views=F("views") + counter_increments(counts))
+
+    return dict(counts)
+
+
+def apply_impressions(model, fk, counts):
+    """
+    Suma ``counts`` (``{fk_id: impresiones}``) a ``model`` (``PostAnalytics`` o
+    ``CategoryAnalytics``) y recalcula el CTR en la misma sentencia UPDATE.
+    Devuelve los ids actualizados.
+    """
+    if not counts:
+        return set()
+    related_model = model._meta.get_field(fk.removesuffix("_id")).related_model
+    existing = set(related_model.objects.filter(id__in=counts).values_list("id", flat=True))
+    counts = {key: amount for key, amount in counts.items() if key in existing}
+    if not counts:
+        return set()
+
+    increments = counter_increments(counts, fk)
+    with transaction.atomic():
+        model.objects.bulk_create([model(**{fk: key}) for key in counts], ignore_conflicts=True)
+        model.objects.filter(**{f"{fk}__in": counts}).update(
+            impressions=F("impressions") + increments,
+            # Las expresiones leen los valores previos al UPDATE
+            click_through_rate=Cast(F("clicks"), FloatField()) * 100 / (F("impressions") + increments),
+        )
+    return set(counts)
@@ -0,0 +1,165 @@
+"""
+Exportación en streaming de interacciones, vistas y analíticas de posts.
+
+Las filas se leen con ``iterator(chunk_size=...)`` (un cursor del lado del
+servidor en PostgreSQL) y se escriben por bloques de ``chunk_size`` filas,
+así que la memoria no depende de cuántas filas se exporten. Lo usan
+``ExportPostDataView`` y el comando ``export_post_data``.
+
+Detrás de PgBouncer (``DATABASE_PGBOUNCER``) los cursores del lado del
+servidor están desactivados y psycopg2 trae el resultado entero: para
+exportaciones grandes conviene una conexión directa a Postgres o a una réplica.
+"""
+import csv
+import datetime
+import io
+import zlib
+from itertools import islice
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import PostInteraction, PostView, PostAnalytics
+
+EXPORTS = {
+    "interactions": {
+        "model": PostInteraction,
+        "time_field": "timestamp",
+        "fields": (
+            "id", "post_id", "user_id", "comment_id", "interaction_type", "interaction_category",
+            "weight", "timestamp", "device_type", "ip_address", "hour_of_day", "day_of_week",
+        ),
+    },
+    "views": {
+        "model": PostView,
+        "time_field": "timestamp",
+        "fields": ("id", "post_id", "user_id", "ip_address", "timestamp"),
+    },
+    "analytics": {
+        "model": PostAnalytics,
+        "time_field": None,
+        "fields": (
+            "post_id", "impressions", "clicks", "click_through_rate", "avg_time_on_page",
+            "views", "likes", "comments", "shares",
+        ),
+    },
+}
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def parse_time(value):
+    """Fecha (``2024-01-31``) o fecha y hora ISO 8601; ``None`` si viene vacío."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"Invalid date: {value}")
+        parsed = datetime.datetime.combine(date, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def export_queryset(name, since=None, until=None, post_slug=None):
+    """Filas (``values_list``) de la exportación ``name``, sin orden."""
+    if name not in EXPORTS:
+        raise ValueError(f"Unknown export: {name}. Choose one of: {', '.join(EXPORTS)}")
+    export = EXPORTS[name]
+
+    queryset = export["model"].objects.all()
+    if since or until:
+        time_field = export["time_field"]
+        if time_field is None:
+            raise ValueError(f"The {name} export cannot be filtered by time")
+        if since:
+            queryset = queryset.filter(**{f"{time_field}__gte": since})
+        if until:
+            queryset = queryset.filter(**{f"{time_field}__lt": until})
+    if post_slug:
+        queryset = queryset.filter(post__slug=post_slug)
+
+    # Sin ORDER BY la base de datos devuelve filas en cuanto las lee, en lugar
+    # de ordenar todo el rango antes de la primera
+    return queryset.order_by().values_list(*export["fields"])
+
+
+def _csv_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(fields, rows):
+    return b"".join(
+        orjson.dumps(dict(zip(fields, row)), option=orjson.OPT_APPEND_NEWLINE) for row in rows
+    )
+
+
+def encode_csv(fields, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+}
+
+
+def stream_rows(queryset, file_format="ndjson", chunk_size=2000):
+    """Genera el export en bloques de bytes, uno por cada ``chunk_size`` filas."""
+    fields = queryset._fields
+    encode = ENCODERS[file_format]
+
+    if file_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(fields)
+        yield buffer.getvalue().encode()
+
+    # Dentro de una transacción el cursor no necesita WITH HOLD (que copia el
+    # resultado entero en el servidor) y lee una instantánea consistente
+    with transaction.atomic(using=queryset.db):
+        rows = queryset.iterator(chunk_size=chunk_size)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield encode(fields, chunk)
+
+
+def gzip_stream(chunks, level=6):
+    """Comprime en gzip un iterable de bytes sin juntarlo en memoria."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def aiter_chunks(chunks):
+    """
+    Versión async de un generador sync. Bajo ASGI, ``StreamingHttpResponse``
+    consumiría un iterador sync entero con ``list()`` antes de enviar nada.
+    Cada bloque se pide en el hilo de la petición, el mismo que abrió la
+    transacción y el cursor.
+    """
+    chunks = iter(chunks)
+    try:
+        while True:
+            chunk = await sync_to_async(next)(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        await sync_to_async(getattr(chunks, "close", lambda: None))()
@@ -0,0 +1,82 @@
+"""
+Handlers de ``CachedResponseMiddleware``: sirven la respuesta ya renderizada
+de los endpoints públicos del blog sin pasar por DRF. Devuelven None si no
+está en cache y la petición sigue hasta la vista. Bajo ASGI se usan las
+variantes con prefijo ``a``.
+"""
+from core.redis_client import aincr_many, incr_many
+from core.response_cache import (
+    aget_cached_response,
+    aresponse_cache_key,
+    get_cached_response,
+    response_cache_key,
+    serve_cached_response,
+)
+from utils.ip_utils import get_client_ip
+from .views import aregister_post_view, register_post_view
+
+
+def _impression_keys(cached):
+    # Mismos efectos que PostListView
+    return [f"post:impressions:{post_id}" for post_id in cached.meta.get("post_ids", [])]
+
+
+def post_list(request):
+    cached = get_cached_response(response_cache_key(request, "post_list", signed=True))
+    if cached is None:
+        return None
+    incr_many(_impression_keys(cached))
+    return serve_cached_response(request, cached)
+
+
+async def apost_list(request):
+    cached = await aget_cached_response(await aresponse_cache_key(request, "post_list", signed=True))
+    if cached is None:
+        return None
+    await aincr_many(_impression_keys(cached))
+    return serve_cached_response(request, cached)
+
+
+def post_detail(request):
+    slug = request.GET.get("slug")
+    if not slug:
+        return None
+
+    cached = get_cached_response(response_cache_key(request, f"post_detail:{slug}", signed=True))
+    if cached is None:
+        return None
+
+    # Solo se cachean respuestas anónimas
+    register_post_view(cached.meta["post_id"], get_client_ip(request), None)
+
+    return serve_cached_response(request, cached)
+
+
+async def apost_detail(request):
+    slug = request.GET.get("slug")
+    if not slug:
+        return None
+
+    cached = await aget_cached_response(await aresponse_cache_key(request, f"post_detail:{slug}", signed=True))
+    if cached is None:
+        return None
+
+    await aregister_post_view(cached.meta["post_id"], get_client_ip(request), None)
+
+    return serve_cached_response(request, cached)
+
+
+def post_headings(request):
+    slug = request.GET.get("slug")
+    cached = get_cached_response(response_cache_key(request, f"post_headings:{slug}"))
+    if cached is None:
+        return None
+    return serve_cached_response(request, cached)
+
+
+async def apost_headings(request):
+    slug = request.GET.get("slug")
+    cached = await aget_cached_response(await aresponse_cache_key(request, f"post_headings:{slug}"))
+    if cached is None:
+        return None
+    return serve_cached_response(request, cached)
@@ -0,0 +1,263 @@
+import csv
+import io
+import json
+import sys
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from apps.blog.models import Post, PostAnalytics, Heading, Category
+from apps.blog.utils import build_headings
+from apps.media.models import Media
+from utils.string_utils import sanitize_fields
+
+User = get_user_model()
+
+# Mismos campos y valores por defecto que PostAuthorViews
+POST_FIELDS = {
+    "title": "string",
+    "description": "string",
+    "content": "html",
+    "status": "string",
+    "keywords": "string",
+}
+POST_FIELD_DEFAULTS = {"description": "", "status": "draft", "keywords": ""}
+
+
+def read_records(stream, file_format):
+    """Yield one dict per post from a JSONL or CSV stream without loading it in memory."""
+    if file_format == "csv":
+        yield from csv.DictReader(stream)
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise CommandError(f"Invalid JSON on line {line_number}: {e}")
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def copy_value(value):
+    """Format a value for COPY ... WITH (FORMAT csv): NULL is an unquoted empty field."""
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class Command(BaseCommand):
+    help = (
+        "Import posts from a JSONL or CSV file in batches. Posts, their analytics, "
+        "thumbnails and headings are inserted with bulk_create (or COPY on PostgreSQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to a .jsonl or .csv file, or '-' to read JSONL from stdin")
+        parser.add_argument("--format", choices=["jsonl", "csv"], default=None,
+                            help="Input format. Guessed from the file extension by default.")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Number of posts inserted per transaction (default: 1000)")
+        parser.add_argument("--author", default=None,
+                            help="Username used for records without an 'author' field")
+        parser.add_argument("--copy", action="store_true",
+                            help="Use COPY FROM STDIN instead of INSERT (PostgreSQL only)")
+        parser.add_argument("--no-sanitize", action="store_true",
+                            help="Skip bleach sanitization. Only for dumps that were already sanitized.")
+        parser.add_argument("--skip-headings", action="store_true",
+                            help="Do not extract headings from the content")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+        batch_size = options["batch_size"]
+        self.sanitize = not options["no_sanitize"]
+        self.skip_headings = options["skip_headings"]
+
+        self.use_copy = options["copy"]
+        if self.use_copy and connection.vendor != "postgresql":
+            self.stderr.write("COPY is only available on PostgreSQL, falling back to bulk_create.")
+            self.use_copy = False
+
+        self.default_author = None
+        if options["author"]:
+            try:
+                self.default_author = User.objects.get(username=options["author"])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['author']}' does not exist")
+
+        # Caches de búsqueda compartidos entre lotes
+        self.categories = {}
+        self.authors = {}
+        self.skipped = 0
+
+        imported = 0
+        started = time.monotonic()
+
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            for chunk in chunked(read_records(stream, file_format), batch_size):
+                imported += self.import_chunk(chunk)
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"{imported} posts imported ({imported / elapsed:.0f} posts/s)")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} posts in {time.monotonic() - started:.1f}s, skipped {self.skipped}."
+        ))
+
+    def import_chunk(self, records):
+        self.load_lookups(records)
+
+        slugs = [slugify(record.get("slug") or record.get("title") or "") for record in records]
+        existing_slugs = set(Post.objects.filter(slug__in=slugs).values_list("slug", flat=True))
+
+        posts = []
+        thumbnails = []
+        headings = []
+
+        for record, slug in zip(records, slugs):
+            if not slug or slug in existing_slugs:
+                self.skipped += 1
+                continue
+            existing_slugs.add(slug)
+
+            post = self.build_post(record, slug)
+            if post is None:
+                self.skipped += 1
+                continue
+
+            thumbnail = self.build_thumbnail(record)
+            if thumbnail is not None:
+                thumbnails.append(thumbnail)
+                post.thumbnail_id = thumbnail.id
+
+            posts.append(post)
+            headings.extend(self.build_record_headings(post, record))
+
+        with transaction.atomic():
+            self.insert(Media, thumbnails)
+            self.insert(Post, posts)
+            self.insert(PostAnalytics, [PostAnalytics(post_id=post.id) for post in posts])
+            self.insert(Heading, headings)
+
+        return len(posts)
+
+    def load_lookups(self, records):
+        """Fetch the categories and authors referenced by a chunk with one query each."""
+        category_slugs = {record.get("category") for record in records} - set(self.categories) - {None, ""}
+        if category_slugs:
+            for category in Category.objects.filter(slug__in=category_slugs):
+                self.categories[category.slug] = category.id
+
+        usernames = {record.get("author") for record in records} - set(self.authors) - {None, ""}
+        if usernames:
+            for user in User.objects.filter(username__in=usernames):
+                self.authors[user.username] = user.id
+
+    def build_post(self, record, slug):
+        category_id = self.categories.get(record.get("category"))
+        author_id = self.authors.get(record.get("author"))
+        if author_id is None and self.default_author is not None:
+            author_id = self.default_author.id
+
+        if category_id is None or author_id is None:
+            return None
+
+        if self.sanitize:
+            fields = sanitize_fields(record, POST_FIELDS, defaults=POST_FIELD_DEFAULTS)
+        else:
+            fields = {field: record.get(field, POST_FIELD_DEFAULTS.get(field, "")) for field in POST_FIELDS}
+
+        created_at = parse_datetime(record.get("created_at") or "") or timezone.now()
+        if timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at)
+
+        featured = record.get("featured", False)
+        if isinstance(featured, str):
+            featured = featured.lower() in ["true", "1", "yes"]
+
+        return Post(
+            user_id=author_id,
+            category_id=category_id,
+            slug=slug,
+            featured=featured,
+            created_at=created_at,
+            **fields,
+        )
+
+    def build_thumbnail(self, record):
+        key = record.get("thumbnail_key")
+        if not key:
+            return None
+        return Media(
+            order=record.get("thumbnail_order") or 0,
+            name=record.get("thumbnail_name") or "",
+            size=record.get("thumbnail_size") or "",
+            type=record.get("thumbnail_type") or "",
+            key=key,
+            media_type=record.get("thumbnail_media_type") or "image",
+        )
+
+    def build_record_headings(self, post, record):
+        # Los registros JSONL pueden traer los headings ya calculados
+        if isinstance(record.get("headings"), list):
+            return [
+                Heading(
+                    post=post,
+                    title=heading["title"],
+                    slug=heading.get("slug") or slugify(heading["title"]),
+                    level=heading["level"],
+                    order=heading.get("order", order),
+                )
+                for order, heading in enumerate(record["headings"], start=1)
+            ]
+
+        if self.skip_headings:
+            return []
+        return build_headings(post, post.content)
+
+    def insert(self, model, objs):
+        if not objs:
+            return
+        if self.use_copy:
+            self.copy(model, objs)
+        else:
+            model.objects.bulk_create(objs, batch_size=1000)
+
+    def copy(self, model, objs):
+        """Insert ``objs`` with a single COPY FROM STDIN statement."""
+        fields = model._meta.concrete_fields
+        columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+        table = connection.ops.quote_name(model._meta.db_table)
+
+        buffer = io.StringIO()
+        for obj in objs:
+            values = [
+                field.get_db_prep_save(field.pre_save(obj, add=True), connection)
+                for field in fields
+            ]
+            buffer.write(",".join(copy_value(value) for value in values))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-19 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0022_post_featured'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='postinteraction',
+            index=models.Index(fields=['timestamp', 'id'], name='postinteraction_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postlike',
+            index=models.Index(fields=['timestamp', 'id'], name='postlike_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postshare',
+            index=models.Index(fields=['timestamp', 'id'], name='postshare_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postview',
+            index=models.Index(fields=['timestamp', 'id'], name='postview_timestamp_idx'),
+        ),
+    ]
@@ -1,6 +1,6 @@
 import uuid
 
-from django.db import models
+from django.db import models, transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
@@ -10,7 +10,7 @@ from django.conf import settings
 from ckeditor.fields import RichTextField
 
 from apps.media.models import Media
-from apps.media.serializers import MediaSerializer
+from utils.s3_utils import cached_signed_urls
 
 User = settings.AUTH_USER_MODEL
 
@@ -46,8 +46,7 @@ class Category(models.Model):
     
     def thumbnail_preview(self):
         if self.thumbnail:
-            serializer = MediaSerializer(instance=self.thumbnail)
-            url = serializer.data.get('url')
+            url = cached_signed_urls([self.thumbnail.key]).get(self.thumbnail.key)
             if url:
                 return format_html('<img src="{}" style="width: 100px; height: auto;" />', url)
         return 'No Thumbnail'
@@ -147,8 +146,7 @@ class Post(models.Model):
     
     def thumbnail_preview(self):
         if self.thumbnail:
-            serializer = MediaSerializer(instance=self.thumbnail)
-            url = serializer.data.get('url')
+            url = cached_signed_urls([self.thumbnail.key]).get(self.thumbnail.key)
             if url:
                 return format_html('<img src="{}" style="width: 100px; height: auto;" />', url)
         return 'No Thumbnail'
@@ -186,6 +184,8 @@ class PostLike(models.Model):
     class Meta:
         unique_together = ("post", "user")
         ordering = ["-timestamp"]
+        # Paginación por cursor del admin y exportaciones por rango de fechas
+        indexes = [models.Index(fields=["timestamp", "id"], name="postlike_timestamp_idx")]
 
     def __str__(self):
         return f"Like by {self.user.username} on {self.post.title}"
@@ -209,6 +209,9 @@ class PostShare(models.Model):
     )
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["timestamp", "id"], name="postshare_timestamp_idx")]
+
     def __str__(self):
         return f"Share by {self.user.username if self.user else 'Anonymous'} on {self.post.title} via {self.platform}"
 
@@ -252,6 +255,7 @@ class PostInteraction(models.Model):
     class Meta:
         unique_together = ('user', 'post', 'interaction_type', 'comment')
         ordering = ['-timestamp']
+        indexes = [models.Index(fields=["timestamp", "id"], name="postinteraction_timestamp_idx")]
     
     def __str__(self):
         username = self.user.username if self.user else "Anonymous"
@@ -299,6 +303,7 @@ class PostView(models.Model):
     class Meta:
         unique_together = ("post", "user", "ip_address")
         ordering = ["-timestamp"]
+        indexes = [models.Index(fields=["timestamp", "id"], name="postview_timestamp_idx")]
 
     def __str__(self):
         return f"View by {self.user.username if self.user else 'Anonymous'} on {self.post.title}"
@@ -326,6 +331,16 @@ class PostAnalytics(models.Model):
             self.click_through_rate = 0
         self.save()
 
+    def increment_click(self):
+        self.clicks += 1
+        self.save()
+        self._update_click_through_rate()
+
+    def increment_impression(self):
+        self.impressions += 1
+        self.save()
+        self._update_click_through_rate()
+
     def increment_metric(self, metric_name):
         """
         Incrementa cualquier métrica específica (likes, comments, shares).
@@ -371,6 +386,14 @@ def create_post_analytics(sender, instance, created, **kwargs):
     if created:
         PostAnalytics.objects.create(post=instance)
 
+@receiver(post_save, sender=PostAnalytics)
+def broadcast_post_counters_on_save(sender, instance, created, **kwargs):
+    if created:
+        return
+    from .tasks import schedule_post_counters_broadcast
+    # Los clientes WebSocket reciben los contadores agrupados, no un mensaje por evento
+    transaction.on_commit(lambda: schedule_post_counters_broadcast(instance.post_id))
+
 @receiver(post_save, sender=Category)
 def create_category_analytics(sender, instance, created, **kwargs):
     if created:
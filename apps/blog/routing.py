@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .consumers import PostCountersConsumer
+
+websocket_urlpatterns = [
+    path('ws/blog/post/<slug:slug>/counters/', PostCountersConsumer.as_asgi()),
+]
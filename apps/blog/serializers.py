@@ -14,6 +14,7 @@ from .models import (
 )
 from apps.media.serializers import MediaSerializer
 from apps.authentication.serializers import UserPublicSerializer
+from apps.user_profile.loaders import PrimeAuthorsListSerializer
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -123,6 +124,8 @@ class PostListSerializer(serializers.ModelSerializer):
             "user",
             "featured",
         ]
+        # Los autores de toda la página se cargan en un lote
+        list_serializer_class = PrimeAuthorsListSerializer
 
     def get_view_count(self, obj):
         return obj.post_analytics.views if obj.post_analytics else 0
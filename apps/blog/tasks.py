@@ -1,41 +1,126 @@
 from celery import shared_task
 
 import logging
+import os
+import socket
+import uuid
 
-import redis
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
 from django.conf import settings
-
-from .models import PostAnalytics, Post, CategoryAnalytics, Category
+from django.core.cache import cache
+
+from core.redis_client import get_redis, drain_counters, incr_many
+from .models import PostAnalytics, Post, CategoryAnalytics
+from .events import (
+    add_post_view_event,
+    ensure_post_views_group,
+    read_post_view_events,
+    ack_post_view_events,
+    parse_post_view_event,
+    apply_post_views,
+    apply_impressions,
+)
+from .consumers import post_counters_group, get_post_counters
 
 logger = logging.getLogger(__name__)
 
-redis_client = redis.StrictRedis(host=settings.REDIS_HOST, port=6379, db=0)
+POST_VIEW_FLUSH_SCHEDULED_KEY = "post_view_events:scheduled"
 
 @shared_task
 def increment_post_impressions(post_id):
     """
-    Incrementa las impresiones del post asociado
+    Incrementa las impresiones del post asociado. Solo para mensajes ya
+    encolados: las impresiones se cuentan en Redis y las aplica
+    ``sync_impressions_to_db``.
     """
-    try:
-        analytics, created = PostAnalytics.objects.get_or_create(post__id=post_id)
-        analytics.increment_impression()
-    except Exception as e:
-        logger.info(f"Error incrementing impressions for Post ID {post_id}: {str(e)}")
+    incr_many([f"post:impressions:{post_id}"])
 
 
 @shared_task
 def increment_post_views_task(slug, ip_address, user=None):
     """
-    Incrementa las vistas de un post.
+    Incrementa las vistas de un post. Solo para mensajes ya encolados: las
+    vistas van al stream de eventos y las aplica ``flush_post_view_events``.
     """
-    try:
-        post = Post.objects.get(slug=slug)
-        post_analytics, _ = PostAnalytics.objects.get_or_create(post=post)
-        post_analytics.increment_view(ip_address , user=user)
-    except Post.DoesNotExist:
+    post_id = Post.objects.filter(slug=slug).values_list("id", flat=True).first()
+    if post_id is None:
         logger.error(f"Post with slug {slug} does not exist.")
+        return
+    add_post_view_event(post_id, ip_address, user)
+    schedule_post_view_flush()
+
+
+@shared_task(ignore_result=True)
+def flush_post_view_events():
+    """
+    Aplica las vistas del stream en lotes de ``POST_EVENTS_BATCH_SIZE``, con
+    una sentencia por lote para las analíticas. Las entradas se confirman
+    después de escribirlas; si el worker cae a mitad de lote, otro consumidor
+    las reclama pasado ``POST_EVENTS_CLAIM_IDLE``.
+    """
+    # Los eventos a partir de aquí programan la siguiente ejecución
+    cache.delete(POST_VIEW_FLUSH_SCHEDULED_KEY)
+
+    client = get_redis()
+    consumer = f"{socket.gethostname()}:{os.getpid()}"
+    batch_size = settings.POST_EVENTS_BATCH_SIZE
+    ensure_post_views_group(client)
+
+    applied = {}
+    for _ in range(settings.POST_EVENTS_MAX_BATCHES):
+        entries = read_post_view_events(consumer, batch_size, client)
+        if not entries:
+            break
+
+        counts = apply_post_views(parse_post_view_event(fields) for _, fields in entries)
+        ack_post_view_events([entry_id for entry_id, _ in entries], client)
+        for post_id, views in counts.items():
+            applied[post_id] = applied.get(post_id, 0) + views
+
+        if len(entries) < batch_size:
+            break
+    else:
+        # Quedan eventos: seguir en otra ejecución en lugar de ocupar el worker
+        schedule_post_view_flush()
+
+    # update() no envía post_save: los contadores de WebSocket se programan aquí
+    for post_id in applied:
+        schedule_post_counters_broadcast(post_id)
+
+    if applied:
+        logger.info(f"Applied {sum(applied.values())} post views to {len(applied)} posts")
+
+
+def schedule_post_view_flush():
+    """
+    Programa ``flush_post_view_events`` al final de ``POST_EVENTS_FLUSH_INTERVAL``:
+    todos los eventos de ese intervalo se aplican en la misma ejecución.
+    """
+    interval = settings.POST_EVENTS_FLUSH_INTERVAL
+    # El TTL solo libera la clave si la tarea se pierde
+    if not cache.add(POST_VIEW_FLUSH_SCHEDULED_KEY, 1, timeout=max(interval * 10, 10)):
+        return
+    try:
+        flush_post_view_events.apply_async(countdown=interval)
     except Exception as e:
-        logger.error(f"Error incrementing views for Post slug {slug}: {str(e)}")
+        cache.delete(POST_VIEW_FLUSH_SCHEDULED_KEY)
+        logger.error(f"Error scheduling post view events flush: {str(e)}")
+
+
+def _drain_impressions(pattern):
+    """Vacía los contadores de ``pattern``; devuelve ``{uuid: impresiones}`` y las claves originales."""
+    counters = drain_counters(get_redis().scan_iter(match=pattern, count=1000))
+    counts, keys = {}, {}
+    for key, impressions in counters.items():
+        try:
+            object_id = uuid.UUID(key.decode("utf-8").split(":")[-1])
+        except ValueError:
+            logger.info(f"Invalid impressions key {key}. Skipping.")
+            continue
+        counts[object_id] = impressions
+        keys[object_id] = key
+    return counts, keys
 
 
 @shared_task
@@ -43,75 +128,123 @@ def sync_impressions_to_db():
     """
     Sincronizar las impresiones almacenadas en redis con la base de datos
     """
-    keys = redis_client.keys("post:impressions:*")
-    for key in keys:
-        try:
-            post_id = key.decode("utf-8").split(":")[-1]
+    # Leer y borrar los contadores de forma atómica: no se pierden incrementos concurrentes
+    counts, keys = _drain_impressions("post:impressions:*")
+    try:
+        # Una sola sentencia para todos los posts; los que no existen se descartan
+        apply_impressions(PostAnalytics, "post_id", counts)
+    except Exception as e:
+        # Devolver las impresiones a Redis para el siguiente intento
+        _restore_impressions(counts, keys)
+        logger.error(f"Error syncing post impressions: {str(e)}")
+        return
 
-            # Validar que el post existe
-            try:
-                post = Post.objects.get(id=post_id)
-            except Post.DoesNotExist:
-                logger.info(f"Post with ID {post_id} does not exist. Skipping.")
-                continue
+    # El orden por popularidad pudo cambiar
+    schedule_cache_warming()
 
-            # Obtener impresiones de redis
-            impressions = int(redis_client.get(key))
-            if impressions == 0:
-                redis_client.delete(key)
-                continue
-            
-            # Obtener y crear instancia de category analytics
-            analytics, created = PostAnalytics.objects.get_or_create(post=post)
 
-            # Incrementar impresiones
-            analytics.impressions += impressions
-            analytics.save()
+@shared_task
+def sync_category_impressions_to_db():
+    """
+    Sincronizar las impresiones almacenadas en redis con la base de datos
+    """
+    counts, keys = _drain_impressions("category:impressions:*")
+    try:
+        apply_impressions(CategoryAnalytics, "category_id", counts)
+    except Exception as e:
+        _restore_impressions(counts, keys)
+        logger.error(f"Error syncing category impressions: {str(e)}")
 
-            # Incrementar la tasa de clics (CTR)
-            analytics._update_click_through_rate()
 
-            # Eliminar la clave de redis despues de sincronizar
-            redis_client.delete(key)
-        except Exception as e:
-            print(f"Error syncing impressions for {key}: {str(e)}")
+def _restore_impressions(counts, keys):
+    pipe = get_redis().pipeline(transaction=False)
+    for object_id, impressions in counts.items():
+        pipe.incrby(keys[object_id], impressions)
+    pipe.execute()
 
 
-@shared_task
-def sync_category_impressions_to_db():
+def cache_warming_scheduled_key(force):
+    # Las ejecuciones forzadas se programan aparte: una pendiente sin forzar no las absorbe
+    return f"cache_warming:scheduled:{'force' if force else 'stale'}"
+
+
+@shared_task(rate_limit="2/m", ignore_result=True)
+def warm_post_caches(force=False):
     """
-    Sincronizar las impresiones almacenadas en redis con la base de datos
+    Precalcula el detalle de los posts más vistos y las primeras páginas
+    de los listados para que el primer lector no pague un cache frío.
     """
-    keys = redis_client.keys("category:impressions:*")
-    for key in keys:
-        try:
-            # Decodificar y extraer el ID de la categoría desde la clave Redis
-            category_id = key.decode("utf-8").split(":")[-1]
-
-            # Validar que la categoria existe
-            try:
-                category = Category.objects.get(id=category_id)
-            except Category.DoesNotExist:
-                logger.info(f"Category with ID {category_id} does not exist. Skipping.")
-                continue
-            
-            # Obtener impresiones de redis
-            impressions = int(redis_client.get(key))
-            if impressions == 0:
-                redis_client.delete(key)
-                continue
-
-            # Obtener y crear instancia de category analytics
-            analytics, created = CategoryAnalytics.objects.get_or_create(category=category)
-
-            # Incrementar impresiones
-            analytics.impressions += impressions
-            analytics.save()
-
-            # Actualizar tasa de clics (CTR)
-            analytics._update_click_through_rate()
-
-            # Eliminar la clave de redis despues de sincronizar
-            redis_client.delete(key)
-        except Exception as e:
-            print(f"Error syncing impressions for {key}: {str(e)}")
\ No newline at end of file
+    # Las llamadas a partir de aquí programan otra ejecución
+    cache.delete(cache_warming_scheduled_key(force))
+
+    # Una sola ejecución a la vez
+    if not cache.add("cache_warming:running", 1, timeout=60 * 5):
+        if force:
+            # Una ejecución forzada no se pierde: vuelve a programarse tras la que está en curso
+            schedule_cache_warming(force=True)
+        logger.info("Cache warming already running. Skipping.")
+        return
+
+    try:
+        from .warming import warm_caches
+
+        stats = warm_caches(force=force)
+        logger.info(f"Cache warming finished: {stats}")
+    finally:
+        cache.delete("cache_warming:running")
+
+
+def schedule_cache_warming(force=False):
+    """
+    Encola ``warm_post_caches`` con un retraso; las llamadas dentro de esa
+    ventana se agrupan en una sola ejecución. Las forzadas se agrupan aparte.
+    """
+    scheduled_key = cache_warming_scheduled_key(force)
+    if not cache.add(scheduled_key, 1, timeout=settings.CACHE_WARM_COUNTDOWN):
+        return
+    try:
+        warm_post_caches.apply_async(kwargs={"force": force}, countdown=settings.CACHE_WARM_COUNTDOWN)
+    except Exception as e:
+        cache.delete(scheduled_key)
+        logger.error(f"Error scheduling cache warming: {str(e)}")
+
+
+@shared_task(ignore_result=True)
+def broadcast_post_counters(post_id):
+    """
+    Envía los contadores actuales del post a sus clientes WebSocket. Todos los
+    cambios desde que se programó llegan en este único mensaje.
+    """
+    # Los cambios a partir de aquí programan el siguiente envío
+    cache.delete(f"post_counters:scheduled:{post_id}")
+
+    counters = get_post_counters(post_id)
+    if counters is None:
+        return
+
+    # Guardar PostAnalytics no siempre cambia estos contadores (p. ej. impresiones)
+    last_key = f"post_counters:last:{post_id}"
+    if cache.get(last_key) == counters:
+        return
+    cache.set(last_key, counters, timeout=60 * 60)
+
+    async_to_sync(get_channel_layer().group_send)(
+        post_counters_group(post_id),
+        {"type": "post.counters", "post": str(post_id), "counters": counters},
+    )
+
+
+def schedule_post_counters_broadcast(post_id):
+    """
+    Programa ``broadcast_post_counters`` al final del intervalo: como máximo un
+    mensaje por post y ``POST_COUNTERS_INTERVAL``, sea cual sea el ritmo de eventos.
+    """
+    interval = settings.POST_COUNTERS_INTERVAL
+    # El TTL solo libera la clave si la tarea se pierde
+    if not cache.add(f"post_counters:scheduled:{post_id}", 1, timeout=max(interval * 10, 10)):
+        return
+    try:
+        broadcast_post_counters.apply_async((str(post_id),), countdown=interval)
+    except Exception as e:
+        cache.delete(f"post_counters:scheduled:{post_id}")
+        logger.error(f"Error scheduling counters broadcast for Post ID {post_id}: {str(e)}")
@@ -0,0 +1,1351 @@
+import datetime
+import decimal
+import gc
+import gzip
+import io
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.utils.translation import gettext_lazy
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+from rest_framework_simplejwt.tokens import AccessToken
+import bleach
+import fakeredis
+
+
+from ..models import Category, CategoryAnalytics, Post, PostAnalytics, PostView, PostInteraction, Heading
+from ..admin import PostViewAdmin
+from ..exports import aiter_chunks
+from ..async_views import (
+    AsyncPostListView,
+    AsyncPostDetailView,
+    AsyncPostHeadingsView,
+    AsyncCategoryListView,
+    AsyncListPostCommentsView,
+)
+from ..serializers import PostListSerializer
+from ..views import (
+    PostLikeViews,
+    PostListView,
+    PostHeadingsView,
+    CategoryListView,
+    ListPostCommentsView,
+    register_post_view,
+)
+from ..tasks import (
+    sync_impressions_to_db,
+    sync_category_impressions_to_db,
+    broadcast_post_counters,
+    schedule_post_counters_broadcast,
+    flush_post_view_events,
+    increment_post_views_task,
+)
+from ..events import POST_VIEWS_STREAM, POST_VIEWS_GROUP, ensure_post_views_group, read_post_view_events
+from ..consumers import post_counters_group
+from ..routing import websocket_urlpatterns
+from apps.authentication.models import UserAccount
+from apps.media.models import Media
+from apps.user_profile.models import UserProfile
+from core.cache import (
+    TwoTierCache,
+    CacheEntry,
+    get_or_fill,
+    two_tier_cache,
+    acache_get,
+    aget_or_fill,
+)
+from core.admin import estimated_count
+from core.ratelimit import RateLimit, TokenBucketThrottle
+from core.db_router import PrimaryReplicaRouter, use_replicas
+from core.middleware import ReplicaRoutingMiddleware
+from core.renderers import ORJSONRenderer
+from core.parsers import ORJSONParser
+from core.redis_client import (
+    get_redis,
+    reset_redis,
+    incr_many,
+    aincr_many,
+    drain_counters,
+    incr_expire,
+    Script,
+)
+from utils.string_utils import (
+    ALLOWED_TAGS,
+    ALLOWED_ATTRIBUTES,
+    ALLOWED_SCHEMES,
+    is_safe_text,
+    sanitize_html,
+    sanitize_string,
+    sanitize_fields,
+    sanitize_many,
+)
+
+
+def create_author(username="author"):
+    return UserAccount.objects.create_user(
+        email=f"{username}@example.com", password="password", username=username,
+        first_name="Test", last_name="Author",
+    )
+
+
+### MODELS TESTS
+
+class CategoryModelTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(
+            name="Tech",
+            title="Technology",
+            description="All about technology",
+            slug="tech"
+        )
+    
+    def test_category_creation(self):
+        self.assertEqual(str(self.category), 'Tech')
+        self.assertEqual(self.category.title, 'Technology')
+
+
+class PostModelTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(
+            name="Tech",
+            title="Technology",
+            description="All about technology",
+            slug="tech"
+        )
+
+        self.post = Post.objects.create(
+            user=create_author(),
+            title="Post 1",
+            description="A test post",
+            content="Content for the post",
+            thumbnail=None,
+            keywords="test, post",
+            slug="post-1",
+            category=self.category,
+            status="published"
+        )
+    
+    def test_post_creation(self):
+        self.assertEqual(str(self.post), "Post 1")
+        self.assertEqual(self.post.category.name, "Tech")
+    
+    def test_post_published_manager(self):
+        self.assertTrue(Post.postobjects.filter(status="published").exists())
+    
+
+class PostAnalyticsModelTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Analytics", slug="analytics")
+        self.post = Post.objects.create(
+            user=create_author(),
+            title="Analytics Post",
+            description="Post for analytics",
+            content="Analytics content",
+            slug="analytics-post",
+            category=self.category
+        )
+        # La señal post_save de Post ya crea sus analíticas
+        self.analytics = PostAnalytics.objects.get(post=self.post)
+
+    def test_click_through_rate_update(self):
+        self.analytics.increment_impression()
+        self.analytics.increment_click()
+        self.analytics.refresh_from_db()
+        self.assertEqual(self.analytics.click_through_rate, 100.0)
+
+
+class HeadingModelTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Heading", slug="heading")
+        self.post = Post.objects.create(
+            user=create_author(),
+            title="Post with Headings",
+            description="Post containing headings",
+            content="Content with headings",
+            slug="post-with-headings",
+            category=self.category
+        )
+        self.heading = Heading.objects.create(
+            post=self.post,
+            title="Heading 1",
+            slug="heading-1",
+            level=1,
+            order=1
+        )
+
+    def test_heading_creation(self):
+        self.assertEqual(self.heading.slug, "heading-1")
+        self.assertEqual(self.heading.level, 1)
+
+
+# VIEWS TESTS
+@override_settings(REDIS_BACKEND="fake")
+class PostListViewTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        self.client = APIClient()
+        cache.clear()  # Limpia el caché antes de cada prueba
+
+        self.category = Category.objects.create(name="API", slug="api")
+        self.api_key = settings.VALID_API_KEYS[0]
+        self.post = Post.objects.create(
+            user=create_author(),
+            title="API Post",
+            description="API post description",
+            content="API content",
+            slug="api-post",
+            category=self.category,
+            status="published"
+        )
+
+    def tearDown(self):
+        cache.clear() 
+    
+    def test_get_post_list(self):
+        url = reverse('post-list')
+        response = self.client.get(
+            url,
+            HTTP_API_KEY=self.api_key
+        )
+
+        data = response.json()
+
+        self.assertIn('success', data)
+        self.assertTrue(data['success'])
+        self.assertIn('status', data)
+        self.assertEqual(data['status'], 200)
+        self.assertIn('results', data)
+        self.assertEqual(data['count'], 1)
+
+        results = data['results']
+        self.assertEqual(len(results), 1)
+
+        post_data = results[0]
+        self.assertEqual(post_data['id'], str(self.post.id))
+        self.assertEqual(post_data['title'], self.post.title)
+        self.assertEqual(post_data['description'], self.post.description)
+        self.assertIsNone(post_data['thumbnail'])
+        self.assertEqual(post_data['slug'], self.post.slug)
+
+        category_data = post_data['category']
+        self.assertEqual(category_data['name'], self.category.name)
+        self.assertEqual(category_data['slug'], self.category.slug)
+
+        self.assertEqual(post_data['view_count'], 0)
+
+        self.assertIsNone(data['next'])
+        self.assertIsNone(data['previous'])
+
+
+@override_settings(REDIS_BACKEND="fake")
+class PostDetailViewTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        self.client = APIClient()
+        cache.clear()
+
+        # Configuración de la API-Key de prueba
+        self.api_key = settings.VALID_API_KEYS[0]
+
+        # Crear datos de prueba
+        self.category = Category.objects.create(name="Detail Category", slug="detail-category")
+        self.post = Post.objects.create(
+            user=create_author(),
+            title="Detail Post",
+            description="Detailed post description",
+            content="Detailed content",
+            slug="detail-post",
+            category=self.category,
+            status="published"
+        )
+
+    def tearDown(self):
+        cache.clear() 
+    
+    @patch('apps.blog.views.register_post_view')
+    def test_get_post_detail_success(self, mock_register_view):
+        """
+        Test para verificar que se obtienen los detalles de un post existente
+        y que la vista se registra correctamente.
+        """
+        # Ruta hacia la vista con query parameter 'slug'
+        url = reverse('post-detail') + f"?slug={self.post.slug}"
+
+        # Simula una solicitud GET con encabezado API-Key
+        response = self.client.get(
+            url,
+            HTTP_API_KEY=self.api_key
+        )
+
+        # Verifica el estado de la respuesta
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Decodifica la respuesta JSON
+        data = response.json()
+
+        # Verifica el formato de la respuesta
+        self.assertIn('success', data)
+        self.assertTrue(data['success'])
+        self.assertIn('status', data)
+        self.assertEqual(data['status'], 200)
+        self.assertIn('results', data)
+
+        post_data = data['results']
+
+        self.assertEqual(post_data['id'], str(self.post.id))
+        self.assertEqual(post_data['title'], self.post.title)
+        self.assertEqual(post_data['description'], self.post.description)
+        self.assertIsNone(post_data['thumbnail'])
+        self.assertEqual(post_data['slug'], self.post.slug)
+
+        # Verifica los detalles de la categoría
+        category_data = post_data['category']
+        self.assertEqual(category_data['name'], self.category.name)
+        self.assertEqual(category_data['slug'], self.category.slug)
+
+        # Verifica que el conteo de vistas sea inicial (0)
+        self.assertEqual(post_data['view_count'], 0)
+
+        mock_register_view.assert_called_once_with(self.post.id, '127.0.0.1', None)  # IP predeterminada en tests
+
+    @patch('apps.blog.views.register_post_view')
+    def test_get_post_detail_not_found(self, mock_register_view):
+        """
+        Test para verificar que se devuelve un error 404 si el post no existe.
+        """
+        # Ruta hacia la vista con un slug inexistente
+        url = reverse('post-detail') + "?slug=non-existent-slug"
+
+        # Simula una solicitud GET con encabezado API-Key
+        response = self.client.get(
+            url,
+            HTTP_API_KEY=self.api_key
+        )
+
+        # Verifica el estado de la respuesta
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # Decodifica la respuesta JSON
+        data = response.json()
+
+        # Verifica el mensaje de error
+        self.assertIn('detail', data)
+        self.assertEqual(data['detail'], "The requested post does not exist")
+
+
+@override_settings(REDIS_BACKEND="fake")
+class PostHeadingsViewTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        self.client = APIClient()
+        cache.clear()
+
+        # Configuración de la API-Key de prueba
+        self.api_key = settings.VALID_API_KEYS[0]
+
+        # Crear datos de prueba
+        self.category = Category.objects.create(name="Test Category", slug="test-category")
+        self.post = Post.objects.create(
+            user=create_author(),
+            title="Post with Headings",
+            description="Post with multiple headings",
+            content="Content",
+            slug="post-with-headings",
+            category=self.category,
+            status="published"
+        )
+        self.heading1 = Heading.objects.create(
+            post=self.post,
+            title="Heading 1",
+            slug="heading-1",
+            level=1,
+            order=1
+        )
+        self.heading2 = Heading.objects.create(
+            post=self.post,
+            title="Heading 2",
+            slug="heading-2",
+            level=2,
+            order=2
+        )
+
+    def tearDown(self):
+        cache.clear() 
+    
+    def test_get_post_headings_success(self):
+        """
+        Test para obtener encabezados de un post existente.
+        """
+        url = reverse('post-headings') + f"?slug={self.post.slug}"
+
+        response = self.client.get(
+            url,
+            HTTP_API_KEY=self.api_key
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['status'], 200)
+        self.assertIn('results', data)
+
+        # Verificar los encabezados
+        results = data['results']
+        self.assertEqual(len(results), 2)
+
+        self.assertEqual(results[0]['title'], self.heading1.title)
+        self.assertEqual(results[0]['slug'], self.heading1.slug)
+        self.assertEqual(results[0]['level'], self.heading1.level)
+
+        self.assertEqual(results[1]['title'], self.heading2.title)
+        self.assertEqual(results[1]['slug'], self.heading2.slug)
+        self.assertEqual(results[1]['level'], self.heading2.level)
+
+    def test_get_post_headings_not_found(self):
+        """
+        Test para verificar que no se encuentran encabezados para un slug inexistente.
+        """
+        url = reverse('post-headings') + "?slug=non-existent-slug"
+
+        response = self.client.get(
+            url,
+            HTTP_API_KEY=self.api_key
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['status'], 200)
+        self.assertEqual(len(data['results']), 0)
+
+
+@override_settings(REDIS_BACKEND="fake")
+class IncrementPostClickViewTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        self.client = APIClient()
+        cache.clear()
+
+        self.api_key = settings.VALID_API_KEYS[0]
+
+        self.category = Category.objects.create(name="Analytics Category", slug="analytics-category")
+        self.post = Post.objects.create(
+            user=create_author(),
+            title="Post for Analytics",
+            description="Post description",
+            content="Content",
+            slug="post-for-analytics",
+            category=self.category,
+            status="published"
+        )
+
+    def tearDown(self):
+        cache.clear() 
+    
+    def test_increment_post_click_success(self):
+        """
+        Test para incrementar clics exitosamente.
+        """
+        url = reverse('increment-post-click')
+
+        response = self.client.post(
+            url,
+            {"slug": self.post.slug},
+            HTTP_API_KEY=self.api_key,
+            format='json'
+        )
+
+        # Verifica el estado de la respuesta
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Decodifica la respuesta JSON
+        data = response.json()
+
+        # Verifica la estructura de la respuesta
+        self.assertIn('success', data)
+        self.assertTrue(data['success'])
+        self.assertIn('status', data)
+        self.assertEqual(data['status'], 200)
+        self.assertIn('results', data)
+
+        # Verifica el contenido de los resultados
+        results = data['results']
+        self.assertIn('message', results)
+        self.assertEqual(results['message'], "Click incremented successfully")
+        self.assertIn('clicks', results)
+
+        # Verifica que los clics han incrementado correctamente
+        self.assertEqual(results['clicks'], 1)  # El contador debe ser 1 en la primera llamada
+
+        # Verifica el estado del modelo `PostAnalytics`
+        from apps.blog.models import PostAnalytics
+        post_analytics = PostAnalytics.objects.get(post=self.post)
+        self.assertEqual(post_analytics.clicks, 1)
+
+### UTILS TESTS
+
+class SanitizeUtilsTest(TestCase):
+    def test_fast_path_matches_bleach(self):
+        """
+        Los textos seguros que se saltan bleach deben quedar igual que si pasaran por bleach.
+        """
+        samples = ["Plain title", "Keywords: django, orm", "Line one\nLine two", "100% 'quoted' \"text\""]
+        for sample in samples:
+            self.assertTrue(is_safe_text(sample))
+            expected = bleach.clean(
+                sample, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, protocols=ALLOWED_SCHEMES, strip=True
+            )
+            self.assertEqual(sanitize_html(sample), expected)
+
+    def test_unsafe_input_is_cleaned(self):
+        self.assertEqual(sanitize_html('<p>Hi</p><script>alert(1)</script>'), '<p>Hi</p>alert(1)')
+        self.assertEqual(sanitize_string('<b>Título</b>'), 'Título')
+
+    def test_sanitize_fields(self):
+        cleaned = sanitize_fields(
+            {"title": "<i>Hello</i>", "content": "<p>Body</p><iframe></iframe>"},
+            {"title": "string", "content": "html", "status": "string"},
+            defaults={"status": "draft"},
+        )
+        self.assertEqual(cleaned, {"title": "Hello", "content": "<p>Body</p>", "status": "draft"})
+
+    def test_sanitize_many_reuses_results(self):
+        self.assertEqual(sanitize_many(["a<b>", "a<b>", None]), ["a", "a", ""])
+
+
+### COMMANDS TESTS
+
+class ImportPostsCommandTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Import", slug="import")
+        self.user = UserAccount.objects.create_user(
+            email="importer@example.com", password="password", username="importer",
+            first_name="Import", last_name="User"
+        )
+
+    def _write_jsonl(self, records):
+        tmp = tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False)
+        with tmp:
+            for record in records:
+                tmp.write(json.dumps(record) + "\n")
+        self.addCleanup(os.remove, tmp.name)
+        return tmp.name
+
+    def test_import_posts_in_batches(self):
+        records = [
+            {
+                "title": f"Imported post {i}",
+                "description": "Imported",
+                "content": f"<h1>Intro {i}</h1><p>Body</p><h2>Details</h2>",
+                "category": "import",
+                "author": "importer",
+                "status": "published",
+                "thumbnail_key": f"media/imported/{i}.png" if i % 2 else "",
+            }
+            for i in range(5)
+        ]
+        # Registros con categoria inexistente o slug repetido se omiten
+        records.append({"title": "Orphan", "content": "x", "category": "missing", "author": "importer"})
+        records.append(dict(records[0]))
+
+        call_command("import_posts", self._write_jsonl(records), batch_size=2, stdout=io.StringIO())
+
+        self.assertEqual(Post.objects.count(), 5)
+        self.assertEqual(PostAnalytics.objects.count(), 5)
+        self.assertEqual(Heading.objects.count(), 10)
+        self.assertEqual(Post.objects.exclude(thumbnail=None).count(), 2)
+
+        post = Post.objects.get(slug="imported-post-1")
+        self.assertEqual(post.user, self.user)
+        self.assertEqual(list(post.headings.values_list("title", flat=True)), ["Intro 1", "Details"])
+
+
+### REDIS TESTS
+
+@override_settings(REDIS_BACKEND="fake")
+class RedisClientTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        self.redis = get_redis()
+
+    def test_counters_round_trip(self):
+        self.assertEqual(incr_many(["a", "b", "a"], client=self.redis), [1, 1, 2])
+        self.assertEqual(self.redis.get("a"), b"2")
+        self.assertEqual(sorted(self.redis.keys("*")), [b"a", b"b"])
+
+        self.assertEqual(drain_counters([b"a", b"b", b"c"], client=self.redis), {b"a": 2, b"b": 1})
+        self.assertEqual(self.redis.keys("*"), [])
+
+    def test_incr_expire_sets_ttl_only_on_creation(self):
+        self.assertEqual(incr_expire(keys=["window"], args=[1, 60], client=self.redis), 1)
+        self.redis.expire("window", 5)
+        self.assertEqual(incr_expire(keys=["window"], args=[1, 60], client=self.redis), 2)
+        self.assertLessEqual(self.redis.ttl("window"), 5)
+
+    def test_scripts_run_on_the_async_client(self):
+        async def run():
+            return await incr_expire.acall(keys=["window"], args=[2, 60])
+
+        self.assertEqual(async_to_sync(run)(), 2)
+        self.assertEqual(self.redis.get("window"), b"2")
+
+    def test_scripts_do_not_keep_clients_alive(self):
+        script = Script("return 1")
+        server = fakeredis.FakeServer()
+        # Con el script ya cargado: el traceback de NOSCRIPT quedaría retenido por fakeredis
+        fakeredis.FakeRedis(server=server).script_load(script.lua)
+        client = fakeredis.FakeRedis(server=server)
+        self.assertEqual(script(client=client), 1)
+        self.assertEqual(len(script._scripts), 1)
+
+        del client
+        gc.collect()
+        self.assertEqual(len(script._scripts), 0)
+
+
+@override_settings(REDIS_BACKEND="fake")
+class SyncImpressionsTaskTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        cache.clear()
+        user = UserAccount.objects.create_user(
+            email="impressions@example.com", password="password", username="impressions",
+            first_name="Sync", last_name="Impressions",
+        )
+        category = Category.objects.create(name="Impressions", slug="impressions")
+        self.post = Post.objects.create(
+            user=user, title="Impressions", description="", content="",
+            slug="impressions", category=category, status="published",
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    @patch("apps.blog.tasks.schedule_cache_warming")
+    def test_sync_drains_redis_counters(self, mock_schedule):
+        incr_many([f"post:impressions:{self.post.id}"] * 3)
+
+        sync_impressions_to_db()
+
+        self.assertEqual(PostAnalytics.objects.get(post=self.post).impressions, 3)
+        self.assertIsNone(get_redis().get(f"post:impressions:{self.post.id}"))
+
+    @patch("apps.blog.tasks.schedule_cache_warming")
+    def test_sync_is_one_update_for_all_posts(self, mock_schedule):
+        posts = [
+            Post.objects.create(
+                user=self.post.user, title=f"Impressions {i}", description="", content="",
+                slug=f"impressions-{i}", category=self.post.category, status="published",
+            )
+            for i in range(5)
+        ]
+        PostAnalytics.objects.filter(post=self.post).update(clicks=1)
+        incr_many([f"post:impressions:{self.post.id}"] * 4 + [f"post:impressions:{post.id}" for post in posts])
+        incr_many([f"post:impressions:{uuid.uuid4()}"])
+
+        with CaptureQueriesContext(connection) as queries:
+            sync_impressions_to_db()
+        updates = [query for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+
+        analytics = PostAnalytics.objects.get(post=self.post)
+        self.assertEqual(analytics.impressions, 4)
+        self.assertAlmostEqual(analytics.click_through_rate, 25.0)
+        self.assertEqual(PostAnalytics.objects.filter(post__in=posts, impressions=1).count(), 5)
+
+    def test_sync_category_impressions(self):
+        incr_many([f"category:impressions:{self.post.category.id}"] * 2)
+
+        sync_category_impressions_to_db()
+
+        self.assertEqual(CategoryAnalytics.objects.get(category=self.post.category).impressions, 2)
+
+
+@override_settings(REDIS_BACKEND="fake", POST_EVENTS_BATCH_SIZE=3)
+class PostViewEventsTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        cache.clear()
+        self.user = UserAccount.objects.create_user(
+            email="viewevents@example.com", password="password", username="viewevents",
+            first_name="View", last_name="Events",
+        )
+        category = Category.objects.create(name="View Events", slug="view-events")
+        self.posts = [
+            Post.objects.create(
+                user=self.user, title=f"View Events {i}", description="", content="",
+                slug=f"view-events-{i}", category=category, status="published",
+            )
+            for i in range(2)
+        ]
+
+    def tearDown(self):
+        cache.clear()
+
+    def _views(self, post):
+        return PostAnalytics.objects.get(post=post).views
+
+    @patch("apps.blog.tasks.schedule_post_counters_broadcast")
+    @patch("apps.blog.tasks.flush_post_view_events.apply_async")
+    def test_views_are_applied_in_batches(self, apply_async, broadcast):
+        for _ in range(3):
+            register_post_view(self.posts[0].id, "10.0.0.1", None)
+        register_post_view(self.posts[0].id, "10.0.0.2", None)
+        register_post_view(self.posts[0].id, "10.0.0.2", self.user)
+        register_post_view(self.posts[1].id, "10.0.0.1", None)
+        register_post_view(uuid.uuid4(), "10.0.0.1", None)
+
+        # Un solo flush programado para todo el intervalo
+        apply_async.assert_called_once_with(countdown=settings.POST_EVENTS_FLUSH_INTERVAL)
+        self.assertEqual(self._views(self.posts[0]), 0)
+
+        flush_post_view_events()
+
+        self.assertEqual(self._views(self.posts[0]), 3)
+        self.assertEqual(self._views(self.posts[1]), 1)
+        self.assertEqual(PostView.objects.count(), 4)
+        self.assertEqual(PostInteraction.objects.filter(interaction_type="view", interaction_category="passive").count(), 4)
+        self.assertEqual(get_redis().xlen(POST_VIEWS_STREAM), 0)
+        self.assertEqual({call.args[0] for call in broadcast.call_args_list}, {self.posts[0].id, self.posts[1].id})
+
+        # Las vistas repetidas no vuelven a contar
+        register_post_view(self.posts[0].id, "10.0.0.1", None)
+        flush_post_view_events()
+        self.assertEqual(self._views(self.posts[0]), 3)
+
+    @patch("apps.blog.tasks.schedule_post_counters_broadcast")
+    @patch("apps.blog.tasks.flush_post_view_events.apply_async")
+    def test_writes_do_not_grow_with_events(self, apply_async, broadcast):
+        def updates_for(events):
+            for i in range(events):
+                register_post_view(self.posts[i % 2].id, f"10.0.{events}.{i}", None)
+            with CaptureQueriesContext(connection) as queries:
+                flush_post_view_events()
+            return [query for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+
+        # Un UPDATE por lote de POST_EVENTS_BATCH_SIZE eventos
+        self.assertEqual(len(updates_for(3)), 1)
+        self.assertEqual(len(updates_for(9)), 3)
+
+    @override_settings(POST_EVENTS_CLAIM_IDLE=0)
+    @patch("apps.blog.tasks.schedule_post_counters_broadcast")
+    @patch("apps.blog.tasks.flush_post_view_events.apply_async")
+    def test_unacknowledged_events_are_reclaimed(self, apply_async, broadcast):
+        register_post_view(self.posts[0].id, "10.0.0.1", None)
+        ensure_post_views_group()
+        # Un consumidor lee el lote y se cae antes de confirmarlo
+        get_redis().xreadgroup(POST_VIEWS_GROUP, "dead", {POST_VIEWS_STREAM: ">"}, count=10)
+        self.assertEqual(get_redis().xreadgroup(POST_VIEWS_GROUP, "other", {POST_VIEWS_STREAM: ">"}), [])
+
+        flush_post_view_events()
+
+        self.assertEqual(self._views(self.posts[0]), 1)
+        self.assertEqual(read_post_view_events("other", 10), [])
+
+    def test_views_are_applied_directly_without_redis(self):
+        with patch("apps.blog.views.add_post_view_event", side_effect=RedisConnectionError("down")):
+            register_post_view(self.posts[0].id, "10.0.0.1", self.user)
+        self.assertEqual(self._views(self.posts[0]), 1)
+
+    @patch("apps.blog.tasks.flush_post_view_events.apply_async")
+    def test_legacy_view_task_queues_an_event(self, apply_async):
+        increment_post_views_task(self.posts[0].slug, "10.0.0.1")
+        self.assertEqual(get_redis().xlen(POST_VIEWS_STREAM), 1)
+        apply_async.assert_called_once()
+
+
+### ASYNC VIEWS TESTS
+
+@override_settings(REDIS_BACKEND="fake")
+class AsyncReadViewsTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        cache.clear()
+        two_tier_cache.clear_local()
+
+        self.factory = APIRequestFactory()
+        self.api_key = settings.VALID_API_KEYS[0]
+
+        user = UserAccount.objects.create_user(
+            email="async@example.com", password="password", username="async",
+            first_name="Async", last_name="Views",
+        )
+        self.category = Category.objects.create(name="Async", slug="async")
+        self.post = Post.objects.create(
+            user=user, title="Async Post", description="", content="<h2>Intro</h2>",
+            slug="async-post", category=self.category, status="published",
+        )
+
+    def tearDown(self):
+        cache.clear()
+        two_tier_cache.clear_local()
+
+    def get(self, view_class, query="", **extra):
+        view = view_class.as_view()
+        request = self.factory.get(f"/{query}", HTTP_API_KEY=self.api_key, **extra)
+        response = async_to_sync(view)(request) if view_class.view_is_async else view(request)
+        # Las respuestas de DRF se renderizan en el handler de Django
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def test_async_views_match_sync_views(self):
+        cases = [
+            (PostListView, AsyncPostListView, ""),
+            (PostHeadingsView, AsyncPostHeadingsView, f"?slug={self.post.slug}"),
+            (CategoryListView, AsyncCategoryListView, ""),
+            (ListPostCommentsView, AsyncListPostCommentsView, f"?slug={self.post.slug}"),
+        ]
+        for sync_view, async_view, query in cases:
+            with self.subTest(view=async_view.__name__):
+                self.assertTrue(async_view.view_is_async)
+                async_response = self.get(async_view, query)
+                cache.clear()
+                two_tier_cache.clear_local()
+                sync_response = self.get(sync_view, query)
+
+                self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+                # Las URLs firmadas cambian de un segundo a otro
+                unsigned = lambda response: re.sub(rb"Expires=\d+&Signature=[^&\"]+", b"", response.content)
+                self.assertEqual(json.loads(unsigned(async_response)), json.loads(unsigned(sync_response)))
+
+    def test_cached_post_list_is_served_without_serializing(self):
+        first = self.get(AsyncPostListView)
+        with patch("apps.blog.views.PostListSerializer") as serializer:
+            response = self.get(AsyncPostListView)
+            serializer.assert_not_called()
+
+        self.assertEqual(response.content, first.content)
+        self.assertEqual(get_redis().get(f"post:impressions:{self.post.id}"), b"2")
+
+        response = self.get(AsyncPostListView, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_post_detail(self):
+        response = self.get(AsyncPostDetailView, f"?slug={self.post.slug}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["results"]["slug"], self.post.slug)
+
+        response = self.get(AsyncPostDetailView, "?slug=missing")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_permissions_are_checked(self):
+        request = self.factory.get("/")
+        response = async_to_sync(AsyncPostListView.as_view())(request)
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_async_cache_reads(self):
+        store = TwoTierCache(backend=cache)
+        store.set("key", CacheEntry("value", time.time() + 60, 0), timeout=60)
+        store.clear_local()
+
+        self.assertEqual(async_to_sync(acache_get)("key", store=store).value, "value")
+        self.assertEqual(store.stats()["redis"]["hits"], 1)
+        self.assertEqual(async_to_sync(aget_or_fill)("key", lambda: "rebuilt", store=store), "value")
+        self.assertEqual(async_to_sync(aget_or_fill)("other", lambda: "built", store=store), "built")
+
+        self.assertEqual(async_to_sync(aincr_many)(["a", "a"]), [1, 2])
+
+    def test_middleware_fast_path_under_asgi(self):
+        url = reverse('post-list')
+        first = self.client.get(url, HTTP_API_KEY=self.api_key)
+
+        with patch("apps.blog.views.PostListView.get") as view:
+            response = async_to_sync(self.async_client.get)(url, headers={"API-Key": self.api_key})
+            view.assert_not_called()
+        self.assertEqual(response.content, first.content)
+
+
+### WEBSOCKET COUNTERS TESTS
+
+IN_MEMORY_CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class PostCountersBroadcastTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = UserAccount.objects.create_user(
+            email="counters@example.com", password="password", username="counters",
+            first_name="Live", last_name="Counters",
+        )
+        category = Category.objects.create(name="Counters", slug="counters")
+        self.post = Post.objects.create(
+            user=user, title="Counters", description="", content="",
+            slug="counters", category=category, status="published",
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    @patch("apps.blog.tasks.broadcast_post_counters.apply_async")
+    def test_broadcasts_are_coalesced(self, apply_async):
+        analytics = PostAnalytics.objects.get(post=self.post)
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(5):
+                analytics.increment_metric("likes")
+
+        apply_async.assert_called_once_with((str(self.post.id),), countdown=settings.POST_COUNTERS_INTERVAL)
+
+        # Tras el envío se puede programar el siguiente
+        broadcast_post_counters(self.post.id)
+        schedule_post_counters_broadcast(self.post.id)
+        self.assertEqual(apply_async.call_count, 2)
+
+    def test_broadcast_skips_unchanged_counters(self):
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(post_counters_group(self.post.id), channel)
+
+        PostAnalytics.objects.filter(post=self.post).update(likes=3)
+        broadcast_post_counters(self.post.id)
+        message = async_to_sync(layer.receive)(channel)
+        self.assertEqual(message["type"], "post.counters")
+        self.assertEqual(message["counters"]["likes"], 3)
+
+        PostAnalytics.objects.filter(post=self.post).update(impressions=10)
+        broadcast_post_counters(self.post.id)
+        self.assertTrue(layer.channels.get(channel) is None or layer.channels[channel].empty())
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class PostCountersConsumerTest(TransactionTestCase):
+    def setUp(self):
+        user = UserAccount.objects.create_user(
+            email="socket@example.com", password="password", username="socket",
+            first_name="Web", last_name="Socket",
+        )
+        category = Category.objects.create(name="Socket", slug="socket")
+        self.post = Post.objects.create(
+            user=user, title="Socket", description="", content="",
+            slug="socket", category=category, status="published",
+        )
+        self.api_key = settings.VALID_API_KEYS[0]
+
+    async def connect(self, slug, api_key):
+        # channels.testing requiere daphne: se usa el comunicador ASGI de asgiref
+        communicator = ApplicationCommunicator(URLRouter(websocket_urlpatterns), {
+            "type": "websocket",
+            "path": f"/ws/blog/post/{slug}/counters/",
+            "query_string": f"api_key={api_key}".encode(),
+            "headers": [],
+            "subprotocols": [],
+        })
+        await communicator.send_input({"type": "websocket.connect"})
+        return communicator, await communicator.receive_output()
+
+    async def receive_json(self, communicator):
+        message = await communicator.receive_output()
+        self.assertEqual(message["type"], "websocket.send")
+        return json.loads(message["text"])
+
+    async def test_snapshot_and_updates(self):
+        communicator, message = await self.connect(self.post.slug, self.api_key)
+        self.assertEqual(message["type"], "websocket.accept")
+
+        snapshot = await self.receive_json(communicator)
+        self.assertEqual(snapshot, {"type": "counters", "post": str(self.post.id), "views": 0, "likes": 0, "comments": 0, "shares": 0})
+
+        counters = {"views": 1, "likes": 2, "comments": 0, "shares": 0}
+        await get_channel_layer().group_send(
+            post_counters_group(self.post.id),
+            {"type": "post.counters", "post": str(self.post.id), "counters": counters},
+        )
+        self.assertEqual((await self.receive_json(communicator))["likes"], 2)
+
+        await communicator.send_input({"type": "websocket.disconnect", "code": 1000})
+        await communicator.wait()
+
+    async def test_rejects_invalid_key_and_unknown_post(self):
+        _, message = await self.connect(self.post.slug, "invalid")
+        self.assertEqual(message, {"type": "websocket.close", "code": 4401})
+
+        _, message = await self.connect("missing", self.api_key)
+        self.assertEqual(message["code"], 4404)
+
+
+### READ REPLICA TESTS
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRoutingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.middleware = ReplicaRoutingMiddleware(self._record_db)
+
+    def tearDown(self):
+        cache.clear()
+
+    def _record_db(self, request):
+        # Solo se resuelve el alias, sin lanzar la query contra la réplica
+        self.read_db = Post.objects.all().db
+        return HttpResponse(status=201 if request.method == "POST" else 200)
+
+    def test_router(self):
+        router = PrimaryReplicaRouter()
+        self.assertEqual(Post.objects.all().db, "default")
+        with use_replicas():
+            self.assertEqual(Post.objects.all().db, "replica_1")
+            self.assertEqual(router.db_for_write(Post), "default")
+            with use_replicas(False):
+                self.assertEqual(Post.objects.all().db, "default")
+        self.assertTrue(router.allow_migrate("default", "blog"))
+        self.assertFalse(router.allow_migrate("replica_1", "blog"))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_reads_from_primary(self):
+        with use_replicas():
+            self.assertEqual(Post.objects.all().db, "default")
+
+    def test_anonymous_get_reads_from_replica(self):
+        self.middleware(self.factory.get("/"))
+        self.assertEqual(self.read_db, "replica_1")
+
+    def test_writes_make_the_client_sticky(self):
+        self.middleware(self.factory.post("/", HTTP_AUTHORIZATION="JWT first"))
+        self.assertEqual(self.read_db, "default")
+
+        self.middleware(self.factory.get("/", HTTP_AUTHORIZATION="JWT first"))
+        self.assertEqual(self.read_db, "default")
+
+        self.middleware(self.factory.get("/", HTTP_AUTHORIZATION="JWT second"))
+        self.assertEqual(self.read_db, "replica_1")
+
+    def test_async_writes_make_the_client_sticky(self):
+        async def record_db(request):
+            return await sync_to_async(self._record_db)(request)
+
+        middleware = ReplicaRoutingMiddleware(record_db)
+        async_to_sync(middleware)(self.factory.post("/", HTTP_AUTHORIZATION="JWT first"))
+        async_to_sync(middleware)(self.factory.get("/", HTTP_AUTHORIZATION="JWT first"))
+        self.assertEqual(self.read_db, "default")
+
+        async_to_sync(middleware)(self.factory.get("/", HTTP_AUTHORIZATION="JWT second"))
+        self.assertEqual(self.read_db, "replica_1")
+
+    def test_cache_fills_read_from_primary(self):
+        with use_replicas():
+            db = get_or_fill("replica:fill", lambda: Post.objects.all().db)
+        self.assertEqual(db, "default")
+
+
+### EXPORT TESTS
+
+class ExportPostDataTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.api_key = settings.VALID_API_KEYS[0]
+
+        self.staff = UserAccount.objects.create_user(
+            email="exporter@example.com", password="password", username="exporter",
+            first_name="Export", last_name="Staff", is_active=True, is_staff=True,
+        )
+        self.category = Category.objects.create(name="Export", slug="export")
+        self.posts = [
+            Post.objects.create(
+                user=self.staff, title=f"Export {i}", description="", content="<p>Body</p>",
+                slug=f"export-{i}", category=self.category, status="published",
+            )
+            for i in range(2)
+        ]
+        for i in range(5):
+            PostView.objects.create(post=self.posts[i % 2], ip_address=f"10.0.0.{i}")
+        # Las dos primeras vistas son antiguas
+        old = PostView.objects.order_by("ip_address")[:2]
+        PostView.objects.filter(id__in=[view.id for view in old]).update(
+            timestamp=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        )
+
+        self.client.credentials(HTTP_API_KEY=self.api_key, HTTP_AUTHORIZATION=f"JWT {AccessToken.for_user(self.staff)}")
+
+    def _export(self, **params):
+        response = self.client.get(reverse("post-data-export"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, b"".join(response.streaming_content)
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_ndjson_export_is_streamed_in_chunks(self):
+        response = self.client.get(reverse("post-data-export"), {"type": "views"})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 3)
+
+        rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(set(rows[0]), {"id", "post_id", "user_id", "ip_address", "timestamp"})
+
+    def test_csv_export_filtered_by_time_and_post(self):
+        response, content = self._export(type="views", output="csv", since="2021-01-01", slug="export-0")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="views.csv"')
+
+        lines = content.decode().splitlines()
+        self.assertEqual(lines[0], "id,post_id,user_id,ip_address,timestamp")
+        expected = PostView.objects.filter(post=self.posts[0], timestamp__year__gt=2020).count()
+        self.assertEqual(len(lines) - 1, expected)
+        self.assertTrue(all(str(self.posts[0].id) in line for line in lines[1:]))
+
+    def test_gzip_export(self):
+        response, content = self._export(type="analytics", gzip="true")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        rows = [json.loads(line) for line in gzip.decompress(content).splitlines()]
+        self.assertEqual({row["post_id"] for row in rows}, {str(post.id) for post in self.posts})
+
+    def test_invalid_parameters(self):
+        url = reverse("post-data-export")
+        self.assertEqual(self.client.get(url, {"type": "analytics", "since": "2021-01-01"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {"type": "likes"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {"since": "yesterday"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {"output": "xml"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_staff(self):
+        user = UserAccount.objects.create_user(
+            email="noexport@example.com", password="password", username="noexport",
+            first_name="No", last_name="Export", is_active=True,
+        )
+        self.client.credentials(HTTP_API_KEY=self.api_key, HTTP_AUTHORIZATION=f"JWT {AccessToken.for_user(user)}")
+        response = self.client.get(reverse("post-data-export"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_async_iteration(self):
+        async def collect():
+            return [chunk async for chunk in aiter_chunks(iter([b"a", b"b"]))]
+
+        self.assertEqual(async_to_sync(collect)(), [b"a", b"b"])
+
+    def test_command(self):
+        tmp = tempfile.NamedTemporaryFile(suffix=".csv.gz", delete=False)
+        tmp.close()
+        self.addCleanup(os.remove, tmp.name)
+
+        call_command("export_post_data", "views", output=tmp.name, until="2021-01-01", stderr=io.StringIO())
+
+        with open(tmp.name, "rb") as f:
+            lines = gzip.decompress(f.read()).decode().splitlines()
+        self.assertEqual(lines[0], "id,post_id,user_id,ip_address,timestamp")
+        self.assertEqual(len(lines), 3)
+
+
+### ADMIN TESTS
+
+class AdminChangelistTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = UserAccount.objects.create_superuser(
+            "staffadmin@example.com", "password", username="staffadmin", first_name="Admin", last_name="User",
+        )
+        self.client.force_login(self.admin, backend="django.contrib.auth.backends.ModelBackend")
+
+        self.category = Category.objects.create(name="Admin", slug="admin")
+        self.posts = [
+            Post.objects.create(
+                user=self.admin, title=f"Admin {i}", description="", content="<p>Body</p>",
+                slug=f"admin-{i}", category=self.category, status="published",
+                thumbnail=Media.objects.create(order=1, name=f"{i}.png", size="1 KB", type="png", key=f"media/admin/{i}.png"),
+            )
+            for i in range(3)
+        ]
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_cursor_pagination(self):
+        for i in range(5):
+            PostView.objects.create(post=self.posts[0], ip_address=f"10.0.1.{i}")
+        url = reverse("admin:blog_postview_changelist")
+
+        seen = []
+        with patch.object(PostViewAdmin, "list_per_page", 2):
+            response = self.client.get(url)
+            while True:
+                self.assertEqual(response.status_code, 200)
+                cl = response.context["cl"]
+                seen.extend(view.id for view in cl.result_list)
+                if cl.next_page_url is None:
+                    break
+                response = self.client.get(url + cl.next_page_url)
+
+        expected = list(PostView.objects.order_by("-timestamp", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_redirects(self):
+        response = self.client.get(reverse("admin:blog_postview_changelist"), {"cursor": "nope_1"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_thumbnails_are_signed_once_per_window(self):
+        url = reverse("admin:blog_post_changelist")
+        with patch("utils.s3_utils.cloudfront_signed_url", return_value="https://cdn/signed") as sign:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(sign.call_count, 3)
+            self.assertContains(response, 'src="https://cdn/signed"', count=3)
+
+            self.client.get(url)
+            self.assertEqual(sign.call_count, 3)
+
+    def test_estimated_count_falls_back_to_exact_count(self):
+        self.assertIsNone(estimated_count(Post.objects.all()))
+        response = self.client.get(reverse("admin:blog_post_changelist"))
+        self.assertEqual(response.context["cl"].result_count, 3)
+        self.assertIsNone(response.context["cl"].full_result_count)
+
+
+### PROFILE PICTURE LOADER TESTS
+
+class ProfilePictureLoaderTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="Authors", slug="authors")
+        self.authors = []
+        for i in range(3):
+            author = UserAccount.objects.create_user(
+                email=f"author{i}@example.com", password="password", username=f"author{i}",
+                first_name="Post", last_name="Author",
+            )
+            if i < 2:
+                UserProfile.objects.filter(user=author).update(profile_picture=Media.objects.create(
+                    name=f"{i}.png", size="1 KB", type="png", key=f"media/avatars/{i}.png", media_type="image",
+                ))
+            self.authors.append(author)
+        for i in range(6):
+            Post.objects.create(
+                user=self.authors[i % 3], title=f"Post {i}", description="", content="",
+                slug=f"authors-post-{i}", category=category, status="published",
+            )
+
+    def tearDown(self):
+        cache.clear()
+
+    @patch("utils.s3_utils.cloudfront_signed_url", side_effect=lambda key, expire_date: f"https://cdn/{key}")
+    def test_authors_are_loaded_and_signed_once(self, mock_sign):
+        posts = list(Post.objects.select_related("category", "user", "thumbnail", "post_analytics"))
+
+        with self.assertNumQueries(1):
+            data = PostListSerializer(posts, many=True).data
+
+        # Un avatar por autor (el tercero tiene el de por defecto), no uno por post
+        self.assertEqual(mock_sign.call_count, 3)
+        pictures = {item["user"]["username"]: item["user"]["profile_picture"] for item in data}
+        self.assertEqual(pictures["author0"]["url"], "https://cdn/media/avatars/0.png")
+        self.assertEqual(pictures["author1"]["url"], "https://cdn/media/avatars/1.png")
+        self.assertEqual(pictures["author2"]["url"], "https://cdn/media/profiles/default/user_default_profile.png")
+
+
+### RATE LIMIT TESTS
+
+@override_settings(REDIS_BACKEND="fake")
+class RateLimitTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        self.factory = APIRequestFactory()
+        self.user = UserAccount.objects.create_user(
+            email="ratelimit@example.com", password="password", username="ratelimit",
+            first_name="Rate", last_name="Limit", is_active=True,
+        )
+
+    def request(self, user=None, ip="10.0.0.1", **extra):
+        request = self.factory.post("/", REMOTE_ADDR=ip, **extra)
+        request.user = user or AnonymousUser()
+        return request
+
+    def test_policy_keys(self):
+        view = PostLikeViews()
+        self.assertEqual(RateLimit("1/m").bucket_key(self.request(self.user), view),
+                         f"ratelimit:PostLikeViews:user:{self.user.pk}")
+        self.assertEqual(RateLimit("1/m").bucket_key(self.request(), view), "ratelimit:PostLikeViews:ip:10.0.0.1")
+        self.assertEqual(RateLimit("1/m", key="ip", scope="likes").bucket_key(self.request(self.user), view),
+                         "ratelimit:likes:ip:10.0.0.1")
+
+        request = self.request()
+        request.api_key = {"bucket": "partner"}
+        self.assertEqual(RateLimit("1/m", key="api_key").bucket_key(request, view),
+                         "ratelimit:PostLikeViews:api_key:partner")
+
+    def test_throttle_uses_the_method_policy(self):
+        view = PostLikeViews()
+        throttle = TokenBucketThrottle()
+        self.assertEqual([throttle.allow_request(self.request(self.user), view) for _ in range(11)],
+                         [True] * 10 + [False])
+        self.assertGreaterEqual(throttle.wait(), 1)
+        # Otro usuario tiene su propio bucket; GET no tiene política
+        self.assertTrue(throttle.allow_request(self.request(ip="10.0.0.2"), view))
+        get_request = self.factory.get("/")
+        get_request.user = self.user
+        with patch("core.ratelimit.token_bucket") as mock_bucket:
+            self.assertTrue(throttle.allow_request(get_request, view))
+        mock_bucket.assert_not_called()
+
+    def test_redis_errors_let_requests_through(self):
+        with patch("core.ratelimit.token_bucket", side_effect=RedisConnectionError):
+            self.assertTrue(TokenBucketThrottle().allow_request(self.request(self.user), PostLikeViews()))
+
+    def test_newsletter_signup_is_limited_per_ip(self):
+        client = APIClient()
+        url = "/api/newsletter/signup/"
+        for i in range(3):
+            response = client.post(url, {"email": f"reader{i}@example.com"}, format="json",
+                                   HTTP_API_KEY=settings.VALID_API_KEYS[0])
+            self.assertEqual(response.status_code, 200)
+
+        response = client.post(url, {"email": "reader4@example.com"}, format="json",
+                               HTTP_API_KEY=settings.VALID_API_KEYS[0])
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+        response = client.post(url, {"email": "reader5@example.com"}, format="json",
+                               HTTP_API_KEY=settings.VALID_API_KEYS[0], REMOTE_ADDR="10.0.0.9")
+        self.assertEqual(response.status_code, 200)
+
+
+### RENDERER TESTS
+
+class ORJSONRendererTest(TestCase):
+    def test_output_matches_drf_renderer(self):
+        data = ReturnDict({
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "created_at": datetime.datetime(2024, 1, 2, 3, 4, 5, 600, tzinfo=datetime.timezone.utc),
+            "price": decimal.Decimal("1.50"),
+            "title": gettext_lazy("Title"),
+            "text": "line\u2028break \u00f1",
+            "results": ReturnList([{"views": 1}], serializer=None),
+        }, serializer=None)
+
+        rendered = ORJSONRenderer().render(data)
+
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(data)))
+        self.assertIn(b'"2024-01-02T03:04:05.000600Z"', rendered)
+        self.assertIn(b"\\u2028", rendered)
+
+    def test_indent_uses_stdlib_renderer(self):
+        rendered = ORJSONRenderer().render({"a": 1}, "application/json; indent=4")
+        self.assertEqual(rendered, b'{\n    "a": 1\n}')
+
+    def test_parser(self):
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"title": "ñ"}'.encode())), {"title": "ñ"})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"views": NaN}'))
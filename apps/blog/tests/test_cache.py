@@ -0,0 +1,433 @@
+import gzip
+import json
+import re
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework import status
+
+
+from ..models import Category, Post, Heading
+from ..views import (
+    post_list_cache_key,
+    category_posts_cache_key,
+    post_comments_cache_key,
+    invalidate_post_detail_cache,
+)
+from ..warming import warm_caches
+from ..tasks import schedule_cache_warming, warm_post_caches
+from apps.authentication.models import UserAccount
+from apps.media.models import Media
+from core.cache import (
+    LocalLRUCache,
+    TwoTierCache,
+    CacheEntry,
+    get_or_fill,
+    two_tier_cache,
+    warm,
+    get_generation,
+    bump_generation,
+)
+from core.conditional import make_etag
+from core.response_cache import compress, negotiate_encoding
+from core.redis_client import get_redis, reset_redis
+
+
+### CACHE TESTS
+
+class LocalLRUCacheTest(TestCase):
+    def test_evicts_least_recently_used(self):
+        local = LocalLRUCache(max_entries=2, timeout=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+
+        self.assertEqual(local.get("a"), 1)
+        self.assertIsNone(local.get("b"))
+        self.assertEqual(local.get("c"), 3)
+
+    def test_entries_expire(self):
+        local = LocalLRUCache(max_entries=10, timeout=60)
+        local.set("a", 1, timeout=-1)
+        self.assertIsNone(local.get("a"))
+
+    def test_delete_pattern(self):
+        local = LocalLRUCache()
+        local.set("post_list:a", 1)
+        local.set("post_detail:a", 2)
+        local.delete_pattern("post_list:*")
+
+        self.assertIsNone(local.get("post_list:a"))
+        self.assertEqual(local.get("post_detail:a"), 2)
+
+
+class TwoTierCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.two_tier = TwoTierCache(backend=cache, max_entries=10, local_timeout=30)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_reads_fill_local_tier(self):
+        cache.set("post_detail:a", "value")
+
+        self.assertEqual(self.two_tier.get("post_detail:a"), "value")
+        self.assertEqual(self.two_tier.get("post_detail:a"), "value")
+
+        stats = self.two_tier.stats()
+        self.assertEqual(stats["redis"]["hits"], 1)
+        self.assertEqual(stats["local"]["hits"], 1)
+        self.assertEqual(stats["local"]["hit_rate"], 0.5)
+
+    def test_delete_invalidates_both_tiers(self):
+        self.two_tier.set("post_detail:a", "value", timeout=60)
+        self.two_tier.delete("post_detail:a")
+
+        self.assertIsNone(self.two_tier.get("post_detail:a"))
+        self.assertIsNone(cache.get("post_detail:a"))
+
+    def test_invalidation_message_evicts_local_copy(self):
+        self.two_tier.set("post_list:1", "value", timeout=60)
+        cache.delete("post_list:1")
+
+        # Mensaje publicado por otro worker
+        self.two_tier._handle_message(json.dumps({"pattern": "post_list:*"}))
+
+        self.assertIsNone(self.two_tier.get("post_list:1"))
+
+    def test_set_publishes_invalidation_for_other_workers(self):
+        with patch.object(self.two_tier, "_publish") as publish:
+            self.two_tier.set("post_detail:a", "value", timeout=60)
+        publish.assert_called_once_with({"keys": ["post_detail:a"]})
+
+        # El mensaje propio no borra la copia recién escrita; el de otro worker sí
+        self.two_tier._handle_message(json.dumps({"keys": ["post_detail:a"], "origin": self.two_tier._origin}))
+        self.assertEqual(self.two_tier.local.get("post_detail:a"), "value")
+        self.two_tier._handle_message(json.dumps({"keys": ["post_detail:a"], "origin": "other"}))
+        self.assertIsNone(self.two_tier.local.get("post_detail:a"))
+
+
+class GetOrFillTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def tearDown(self):
+        cache.clear()
+
+    def build(self):
+        self.calls += 1
+        return f"value-{self.calls}"
+
+    def test_builds_once_and_reuses_fresh_entry(self):
+        self.assertEqual(get_or_fill("key", self.build, timeout=60), "value-1")
+        self.assertEqual(get_or_fill("key", self.build, timeout=60), "value-1")
+        self.assertEqual(self.calls, 1)
+
+    def test_caches_empty_results(self):
+        self.assertEqual(get_or_fill("key", list, timeout=60), [])
+        self.assertIsInstance(cache.get("key"), CacheEntry)
+
+    def test_serves_stale_while_another_worker_rebuilds(self):
+        cache.set("key", CacheEntry("stale", expires_at=0, delta=0), timeout=60)
+        cache.add("lock:key", 1)
+
+        self.assertEqual(get_or_fill("key", self.build, timeout=60), "stale")
+        self.assertEqual(self.calls, 0)
+
+    @override_settings(CACHE_BACKGROUND_REFRESH=False)
+    def test_lock_owner_rebuilds_stale_entry(self):
+        cache.set("key", CacheEntry("stale", expires_at=0, delta=0), timeout=60)
+
+        self.assertEqual(get_or_fill("key", self.build, timeout=60), "value-1")
+        self.assertIsNone(cache.get("lock:key"))
+
+    def test_waits_then_builds_when_lock_is_held_without_value(self):
+        cache.add("lock:key", 1)
+
+        self.assertEqual(get_or_fill("key", self.build, timeout=60, wait_timeout=0.1), "value-1")
+
+    def test_lock_is_released_when_builder_fails(self):
+        def failing_builder():
+            raise Post.DoesNotExist()
+
+        with self.assertRaises(Post.DoesNotExist):
+            get_or_fill("key", failing_builder, timeout=60)
+        self.assertIsNone(cache.get("lock:key"))
+
+
+### CONDITIONAL GET TESTS
+
+class MakeEtagTest(TestCase):
+    def test_etag_is_quoted_and_stable(self):
+        etag = make_etag("post", 1)
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        self.assertEqual(etag, make_etag("post", 1))
+        self.assertNotEqual(etag, make_etag("post", 2))
+
+
+class ConditionalGetViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        two_tier_cache.clear_local()
+
+        self.api_key = settings.VALID_API_KEYS[0]
+
+        self.user = UserAccount.objects.create_user(
+            email="conditional@example.com", password="password", username="conditional",
+            first_name="Conditional", last_name="Get",
+        )
+        self.category = Category.objects.create(name="Conditional", slug="conditional")
+        self.post = Post.objects.create(
+            user=self.user,
+            title="Conditional Post",
+            description="Conditional description",
+            content="<h2>First</h2><p>Body</p>",
+            slug="conditional-post",
+            category=self.category,
+            status="published",
+        )
+        Heading.objects.create(post=self.post, title="First", slug="first", level=2, order=1)
+
+    def tearDown(self):
+        cache.clear()
+        two_tier_cache.clear_local()
+
+    def test_post_detail_returns_304_for_matching_etag(self):
+        url = reverse('post-detail') + f"?slug={self.post.slug}"
+
+        response = self.client.get(url, HTTP_API_KEY=self.api_key)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(url, HTTP_API_KEY=self.api_key, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_post_detail_etag_changes_when_post_is_updated(self):
+        url = reverse('post-detail') + f"?slug={self.post.slug}"
+        etag = self.client.get(url, HTTP_API_KEY=self.api_key)["ETag"]
+
+        self.post.title = "Updated title"
+        self.post.save()
+        invalidate_post_detail_cache(self.post.slug)
+
+        response = self.client.get(url, HTTP_API_KEY=self.api_key, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    @override_settings(REDIS_BACKEND="fake")
+    def test_post_list_returns_304_and_counts_impressions(self):
+        reset_redis()
+        url = reverse('post-list')
+
+        response = self.client.get(url, HTTP_API_KEY=self.api_key)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url, HTTP_API_KEY=self.api_key, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(get_redis().get(f"post:impressions:{self.post.id}"), b"2")
+
+    def test_post_headings_honours_if_modified_since(self):
+        url = reverse('post-headings') + f"?slug={self.post.slug}"
+
+        response = self.client.get(url, HTTP_API_KEY=self.api_key)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+        response = self.client.get(
+            url, HTTP_API_KEY=self.api_key, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class GenerationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_bump_generation_changes_namespaced_keys(self):
+        generation = get_generation("post_comments:a")
+        self.assertEqual(get_generation("post_comments:a"), generation)
+
+        key = post_comments_cache_key("a", "2")
+        cache.set(key, "page")
+
+        self.assertEqual(bump_generation("post_comments:a"), generation + 1)
+        self.assertNotEqual(post_comments_cache_key("a", "2"), key)
+        # Otros namespaces no se ven afectados
+        self.assertEqual(post_comments_cache_key("b"), post_comments_cache_key("b"))
+
+    def test_bump_generation_without_counter(self):
+        self.assertGreater(bump_generation("comment_replies:1"), 0)
+        self.assertEqual(get_generation("comment_replies:1"), cache.get("gen:comment_replies:1"))
+
+
+### CACHE WARMING TESTS
+
+class WarmTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_warm_skips_fresh_entries_unless_forced(self):
+        self.assertTrue(warm("warm:a", lambda: 1, timeout=60))
+        self.assertFalse(warm("warm:a", lambda: 2, timeout=60, min_ttl=30))
+        self.assertEqual(get_or_fill("warm:a", lambda: 3), 1)
+
+        self.assertTrue(warm("warm:a", lambda: 2, timeout=60, min_ttl=30, force=True))
+        self.assertEqual(get_or_fill("warm:a", lambda: 3), 2)
+
+    def test_warm_skips_keys_being_rebuilt(self):
+        cache.add("lock:warm:a", 1)
+        self.assertFalse(warm("warm:a", lambda: 1))
+        self.assertIsNone(cache.get("warm:a"))
+
+
+@override_settings(CACHE_WARM_INTERVAL=0, CACHE_WARM_LIST_PAGES=2, CACHE_WARM_SORTINGS=[None, "newest"])
+class WarmCachesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = UserAccount.objects.create_user(
+            email="warm@example.com", password="password", username="warm",
+            first_name="Warm", last_name="Cache",
+        )
+        self.category = Category.objects.create(name="Warm", slug="warm")
+        self.post = Post.objects.create(
+            user=user, title="Warm Post", description="", content="<p>Body</p>",
+            slug="warm-post", category=self.category, status="published",
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_warm_caches_fills_detail_list_and_category_keys(self):
+        stats = warm_caches()
+
+        self.assertEqual(stats, {"warmed": 7, "skipped": 0, "failed": 0})
+        self.assertEqual(cache.get(f"post_detail:{self.post.slug}").value, self.post)
+        self.assertEqual(cache.get(post_list_cache_key(sorting="newest", page="2")).value, [self.post])
+        self.assertEqual(cache.get(category_posts_cache_key(self.category.slug)).value, [self.post])
+
+        # Una segunda ejecución no reconstruye las claves frescas
+        self.assertEqual(warm_caches()["warmed"], 0)
+
+    @patch("apps.blog.tasks.warm_post_caches.apply_async")
+    def test_forced_warming_is_not_absorbed_by_a_pending_run(self, apply_async):
+        schedule_cache_warming()
+        schedule_cache_warming()
+        schedule_cache_warming(force=True)
+        schedule_cache_warming(force=True)
+        self.assertEqual(
+            [call.kwargs["kwargs"] for call in apply_async.call_args_list], [{"force": False}, {"force": True}]
+        )
+
+    @patch("apps.blog.tasks.warm_post_caches.apply_async")
+    def test_forced_warming_waits_for_the_running_one(self, apply_async):
+        cache.set("cache_warming:running", 1)
+        with patch("apps.blog.warming.warm_caches") as warm:
+            warm_post_caches(force=True)
+            warm.assert_not_called()
+        apply_async.assert_called_once_with(kwargs={"force": True}, countdown=settings.CACHE_WARM_COUNTDOWN)
+
+
+### RESPONSE CACHE TESTS
+
+@override_settings(RESPONSE_CACHE_MIN_COMPRESS_SIZE=0)
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        two_tier_cache.clear_local()
+
+        self.api_key = settings.VALID_API_KEYS[0]
+
+        user = UserAccount.objects.create_user(
+            email="compressed@example.com", password="password", username="compressed",
+            first_name="Compressed", last_name="Response",
+        )
+        self.category = Category.objects.create(name="Compressed", slug="compressed")
+        self.post = Post.objects.create(
+            user=user, title="Compressed Post", description="Compressed description",
+            content="<p>Body</p>" * 50, slug="compressed-post", category=self.category, status="published",
+        )
+
+    def tearDown(self):
+        cache.clear()
+        two_tier_cache.clear_local()
+
+    def test_negotiate_encoding(self):
+        available = {"identity": b"", "gzip": b"", "br": b""}
+        self.assertEqual(negotiate_encoding("gzip, deflate, br", available), "br")
+        self.assertEqual(negotiate_encoding("gzip, br;q=0", available), "gzip")
+        self.assertEqual(negotiate_encoding("*", {"identity": b"", "gzip": b""}), "gzip")
+        self.assertEqual(negotiate_encoding("", available), "identity")
+        self.assertEqual(negotiate_encoding("br", {"identity": b""}), "identity")
+
+    def test_compress_keeps_identity_body(self):
+        content = b'{"results": "' + b"a" * 1000 + b'"}'
+        bodies = compress(content)
+        self.assertEqual(bodies["identity"], content)
+        self.assertEqual(gzip.decompress(bodies["gzip"]), content)
+
+    def test_post_detail_is_served_compressed_from_cache(self):
+        url = reverse('post-detail') + f"?slug={self.post.slug}"
+
+        response = self.client.get(url, HTTP_API_KEY=self.api_key, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertTrue(response["ETag"].startswith("W/"))
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(data["results"]["slug"], self.post.slug)
+
+        # Los siguientes aciertos no vuelven a serializar
+        with patch("apps.blog.views.PostSerializer") as serializer:
+            response = self.client.get(url, HTTP_API_KEY=self.api_key)
+            serializer.assert_not_called()
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response.json()["results"]["slug"], self.post.slug)
+
+        # Un ETag débil sigue validando contra el contenido sin comprimir
+        response = self.client.get(url, HTTP_API_KEY=self.api_key, HTTP_IF_NONE_MATCH=f'W/{response["ETag"]}')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cached_thumbnail_urls_outlive_the_window(self):
+        self.post.thumbnail = Media.objects.create(order=1, name="t.png", size="1 KB", type="png", key="media/t.png")
+        self.post.save()
+        url = reverse('post-detail') + f"?slug={self.post.slug}"
+        expire = settings.AWS_CLOUDFRONT_SIGNED_URL_EXPIRE
+        window_start = 1_800_000_000 // expire * expire
+
+        # Se llena el cache al principio de la ventana y se sirve al final
+        with patch("time.time", return_value=window_start + 1):
+            self.client.get(url, HTTP_API_KEY=self.api_key)
+        with patch("time.time", return_value=window_start + expire - 1), \
+                patch("apps.blog.views.PostSerializer") as serializer:
+            response = self.client.get(url, HTTP_API_KEY=self.api_key)
+            serializer.assert_not_called()
+
+        thumbnail_url = response.json()["results"]["thumbnail"]["url"]
+        expires = int(re.search(r"Expires=(\d+)", thumbnail_url).group(1))
+        self.assertGreaterEqual(expires - (window_start + expire - 1), expire)
+
+    def test_invalidation_drops_rendered_response(self):
+        url = reverse('post-headings') + f"?slug={self.post.slug}"
+        self.assertEqual(self.client.get(url, HTTP_API_KEY=self.api_key).json()["results"], [])
+
+        Heading.objects.create(post=self.post, title="New", slug="new", level=2, order=1)
+        invalidate_post_detail_cache(self.post.slug)
+
+        self.assertEqual(len(self.client.get(url, HTTP_API_KEY=self.api_key).json()["results"]), 1)
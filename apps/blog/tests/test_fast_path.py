@@ -0,0 +1,95 @@
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+from ..models import Category, Post
+from apps.authentication.models import UserAccount
+from core.cache import two_tier_cache
+from core.redis_client import (
+    get_async_redis,
+    get_redis,
+    reset_redis,
+)
+
+
+### MIDDLEWARE TESTS
+
+class CachedResponseMiddlewareTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        two_tier_cache.clear_local()
+
+        self.api_key = settings.VALID_API_KEYS[0]
+
+        self.user = UserAccount.objects.create_user(
+            email="fastpath@example.com", password="password", username="fastpath",
+            first_name="Fast", last_name="Path", is_active=True,
+        )
+        self.category = Category.objects.create(name="Fast Path", slug="fast-path")
+        self.post = Post.objects.create(
+            user=self.user, title="Fast Path Post", description="", content="<p>Body</p>",
+            slug="fast-path-post", category=self.category, status="published",
+        )
+
+    def tearDown(self):
+        cache.clear()
+        two_tier_cache.clear_local()
+
+    @override_settings(REDIS_BACKEND="fake")
+    def test_cached_post_list_skips_the_view(self):
+        reset_redis()
+        url = reverse('post-list')
+        first = self.client.get(url, HTTP_API_KEY=self.api_key)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        with patch("apps.blog.views.PostListView.get") as view:
+            response = self.client.get(url, HTTP_API_KEY=self.api_key)
+            view.assert_not_called()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, first.content)
+        # Las impresiones se siguen contando en el fast path
+        self.assertEqual(get_redis().get(f"post:impressions:{self.post.id}"), b"2")
+
+    @override_settings(REDIS_BACKEND="fake")
+    async def test_async_hits_are_served_on_the_event_loop(self):
+        await sync_to_async(reset_redis)()
+        url = reverse('post-list')
+        first = await sync_to_async(self.client.get)(url, HTTP_API_KEY=self.api_key)
+
+        # Bajo ASGI no se usa el handler sync (hilo) ni la vista
+        with patch("apps.blog.fast_path.post_list") as handler, patch("apps.blog.views.PostListView.get") as view:
+            response = await AsyncClient().get(url, headers={"API-Key": self.api_key})
+            handler.assert_not_called()
+            view.assert_not_called()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, first.content)
+        self.assertEqual(await get_async_redis().get(f"post:impressions:{self.post.id}"), b"2")
+
+    def test_cached_post_detail_requires_api_key(self):
+        url = reverse('post-detail') + f"?slug={self.post.slug}"
+        self.client.get(url, HTTP_API_KEY=self.api_key)
+
+        response = self.client.get(url, HTTP_API_KEY="invalid")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_authenticated_requests_go_through_the_view(self):
+        url = reverse('post-headings') + f"?slug={self.post.slug}"
+        self.client.get(url, HTTP_API_KEY=self.api_key)
+
+        token = AccessToken.for_user(self.user)
+        with patch("apps.blog.views.PostHeadingsView.get", return_value=HttpResponse("view")) as view:
+            response = self.client.get(url, HTTP_API_KEY=self.api_key, HTTP_AUTHORIZATION=f"JWT {token}")
+            view.assert_called_once()
+        self.assertEqual(response.content, b"view")
@@ -0,0 +1,81 @@
+import json
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import TestCase, override_settings
+from django.conf import settings
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+from ..models import Category, Post, Comment
+from ..async_views import PostCommentsStreamView
+from ..views import post_comments_channel, publish_comment_event
+from apps.authentication.models import UserAccount
+from core.redis_client import get_redis, reset_redis
+
+
+### COMMENTS STREAM TESTS
+
+@override_settings(REDIS_BACKEND="fake")
+class PostCommentsStreamTest(TestCase):
+    def setUp(self):
+        reset_redis()
+        self.api_key = settings.VALID_API_KEYS[0]
+        self.user = UserAccount.objects.create_user(
+            email="stream@example.com", password="password", username="stream",
+            first_name="Comment", last_name="Stream", is_active=True,
+        )
+        category = Category.objects.create(name="Stream", slug="stream")
+        self.post = Post.objects.create(
+            user=self.user, title="Stream", description="", content="",
+            slug="stream", category=category, status="published",
+        )
+
+    def test_streams_published_comments(self):
+        request = APIRequestFactory().get(
+            f"/?slug={self.post.slug}", HTTP_API_KEY=self.api_key, HTTP_ACCEPT="text/event-stream"
+        )
+        comment = Comment.objects.create(user=self.user, post=self.post, content="<p>Hola</p>")
+
+        async def read_stream():
+            response = await PostCommentsStreamView.as_view()(request)
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            stream = response.streaming_content
+            chunks = [await anext(stream)]
+            # La suscripción está activa en cuanto llega el primer chunk
+            await sync_to_async(publish_comment_event)(comment, "comment")
+            chunks.append(await anext(stream))
+            # streaming_content es un envoltorio: se cierra el generador de la vista
+            await response._iterator.aclose()
+            return chunks
+
+        retry, frame = async_to_sync(read_stream)()
+
+        self.assertEqual(retry, b"retry: 3000\n\n")
+        lines = frame.decode().split("\n")
+        self.assertEqual(lines[0], "event: comment")
+        self.assertEqual(lines[1], f"id: {comment.id}")
+        self.assertEqual(json.loads(lines[2][len("data: "):])["content"], "<p>Hola</p>")
+        # Sin clientes se libera la suscripción compartida
+        self.assertEqual(get_redis().publish(post_comments_channel(self.post.id), "x"), 0)
+
+    def test_unknown_post(self):
+        request = APIRequestFactory().get("/?slug=missing", HTTP_API_KEY=self.api_key)
+        response = async_to_sync(PostCommentsStreamView.as_view())(request)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch("apps.blog.views.publish_comment_event")
+    def test_new_comments_are_published(self, publish):
+        client = APIClient()
+        client.credentials(HTTP_API_KEY=self.api_key, HTTP_AUTHORIZATION=f"JWT {AccessToken.for_user(self.user)}")
+
+        response = client.post("/api/blog/post/comment/", {"slug": self.post.slug, "content": "Hola"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        comment = Comment.objects.get(post=self.post, parent=None)
+        publish.assert_called_once_with(comment, "comment")
+
+        response = client.post("/api/blog/post/comment/reply/", {"comment_id": str(comment.id), "content": "Re"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        publish.assert_called_with(Comment.objects.get(parent=comment), "reply")
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
@@ -19,27 +20,49 @@ from .views import (
     PostAuthorViews,
     DetailPostView,
     CategoriesListView,
-    DetailCategoryView
+    DetailCategoryView,
+    ExportPostDataView,
 )
+from .async_views import (
+    AsyncPostListView,
+    AsyncPostDetailView,
+    AsyncPostHeadingsView,
+    AsyncCategoryListView,
+    AsyncListPostCommentsView,
+    PostCommentsStreamView,
+)
+
+
+def read_view(view, async_view):
+    """Bajo ASGI los endpoints de lectura usan sus variantes async."""
+    return (async_view if settings.ASYNC_READ_VIEWS else view).as_view()
+
 
 urlpatterns = [
     path('generate_posts/', GenerateFakePostsView.as_view()),
     path('generate_analytics/', GenerateFakeAnalyticsView.as_view()),
-    path('posts/', PostListView.as_view(), name='post-list'),
-    path('post/', PostDetailView.as_view(), name='post-detail'),
-    path('post/headings/', PostHeadingsView.as_view(), name='post-headings'),
+    path('posts/', read_view(PostListView, AsyncPostListView), name='post-list'),
+    path('post/', read_view(PostDetailView, AsyncPostDetailView), name='post-detail'),
+    path('post/headings/', read_view(PostHeadingsView, AsyncPostHeadingsView), name='post-headings'),
     path('post/increment_click/', IncrementPostClickView.as_view(), name='increment-post-click'),
     path('category/', DetailCategoryView.as_view(), name='category-detail'),
-    path('categories/', CategoryListView.as_view(), name='category-list'),
+    path('categories/', read_view(CategoryListView, AsyncCategoryListView), name='category-list'),
     path('categories/list/', CategoriesListView.as_view()),
     path('category/posts/', CategoryDetailView.as_view(), name='category-posts'),
     path('category/increment_click/', IncrementCategoryClickView.as_view(), name='increment-category-click'),
     path('post/comment/', PostCommentViews.as_view()),
-    path('post/comments/', ListPostCommentsView.as_view()),
+    path('post/comments/', read_view(ListPostCommentsView, AsyncListPostCommentsView)),
     path('post/comment/replies/', ListCommentRepliesView.as_view()),
     path('post/comment/reply/', CommentReplyViews.as_view()),
     path('post/like/', PostLikeViews.as_view()),
     path('post/share/', PostShareView.as_view()),
     path('post/author/', PostAuthorViews.as_view()),
     path('post/get/', DetailPostView.as_view()),
-]
\ No newline at end of file
+    path('export/', ExportPostDataView.as_view(), name='post-data-export'),
+]
+
+if settings.ASYNC_READ_VIEWS:
+    # Un stream SSE necesita ASGI: bajo WSGI ocuparía un hilo por cliente
+    urlpatterns.append(
+        path('post/comments/stream/', PostCommentsStreamView.as_view(), name='post-comments-stream')
+    )
\ No newline at end of file
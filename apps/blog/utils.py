@@ -0,0 +1,24 @@
+from bs4 import BeautifulSoup
+from django.utils.text import slugify
+
+from .models import Heading
+
+
+def build_headings(post, content):
+    """
+    Devuelve instancias de Heading (sin guardar) para los h1-h6 del contenido HTML,
+    listas para ``Heading.objects.bulk_create``.
+    """
+    soup = BeautifulSoup(content or "", "html.parser")
+    headings = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])
+
+    return [
+        Heading(
+            post=post,
+            title=heading.get_text(strip=True),
+            slug=slugify(heading.get_text(strip=True)),
+            level=int(heading.name[1]),  # Extract the level from 'h1', 'h2', etc.
+            order=order,
+        )
+        for order, heading in enumerate(headings, start=1)
+    ]
@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from rest_framework_api.views import StandardAPIView
 from rest_framework.exceptions import NotFound, APIException, ValidationError
 from rest_framework import permissions, status
@@ -8,37 +9,153 @@ from django.core.cache import cache
 from django.db.models import Q, F, Prefetch, Value
 from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
-import redis
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from redis.exceptions import RedisError
+import json
+import logging
 from pprint import pprint
-from bs4 import BeautifulSoup
 
 
 from core.permissions import HasValidAPIKey
+from core.ratelimit import RateLimit
+from core.cache import two_tier_cache, get_or_fill, get_generation, aget_generation, bump_generation, acache_get
+from core.conditional import make_etag, signed_url_window, get_not_modified_response, set_validators
+from core.response_cache import CachedResponseMixin, response_cache_key
+from core.redis_client import get_redis, incr_many
+from core.renderers import event_stream_frame
 from .models import (
     Post, 
     Heading, 
     PostAnalytics, 
     Category, 
     CategoryAnalytics, 
-    PostView, 
     PostInteraction, 
     Comment,
     PostLike,
     PostShare
 )
 from .serializers import CategorySerializer, PostListSerializer, PostSerializer, HeadingSerializer, CategoryListSerializer, CommentSerializer
+from .utils import build_headings
+from .tasks import POST_VIEW_FLUSH_SCHEDULED_KEY, schedule_cache_warming, schedule_post_view_flush
+from .events import aadd_post_view_event, add_post_view_event, apply_post_views
+from .exports import CONTENT_TYPES, export_queryset, parse_time, stream_rows, gzip_stream, aiter_chunks
 from utils.ip_utils import get_client_ip
+from utils.s3_utils import cached_signed_urls
 from apps.authentication.models import UserAccount
 from apps.media.models import Media
-from utils.string_utils import sanitize_string, sanitize_html
+from utils.string_utils import sanitize_html, sanitize_fields
 
 from faker import Faker
 import random
 import uuid
 from django.utils.text import slugify
 
+logger = logging.getLogger(__name__)
 
-redis_client = redis.StrictRedis(host=settings.REDIS_HOST, port=6379, db=0)
+# Páginas de listados que se guardan también en el cache local de cada worker
+HOT_LIST_PAGES = {"1", "2", "3"}
+
+# Campos de un post que se sanitizan al crear o actualizar
+POST_FIELDS = {
+    "title": "string",
+    "description": "string",
+    "content": "html",
+    "status": "string",
+    "keywords": "string",
+}
+POST_FIELD_DEFAULTS = {"description": "", "status": "draft", "keywords": ""}
+
+
+def post_list_cache_key(search="", sorting=None, ordering=None, author=None, categories=None, is_featured=None, page="1"):
+    return f"post_list:{search}:{sorting}:{ordering}:{author}:{categories or []}:{is_featured}:{page}"
+
+
+def category_posts_cache_key(slug, page="1"):
+    return f"category_posts:{slug}:{page}"
+
+
+# Los comentarios se cachean bajo un contador de generación por post / comentario:
+# invalidar todas las páginas de un hilo es un solo INCR, sin índice de claves.
+
+def post_comments_cache_key(post_slug, page="1"):
+    return f"post_comments:{post_slug}:{get_generation(f'post_comments:{post_slug}')}:{page}"
+
+
+async def apost_comments_cache_key(post_slug, page="1"):
+    return f"post_comments:{post_slug}:{await aget_generation(f'post_comments:{post_slug}')}:{page}"
+
+
+def comment_replies_cache_key(comment_id, page="1"):
+    return f"comment_replies:{comment_id}:{get_generation(f'comment_replies:{comment_id}')}:{page}"
+
+
+def register_post_view(post_id, ip_address, user):
+    """
+    Registra la vista en el stream de eventos; ``flush_post_view_events`` crea
+    la vista única, la interacción 'view' y actualiza PostAnalytics por lotes.
+    """
+    user_id = user.id if user is not None else None
+    try:
+        add_post_view_event(post_id, ip_address, user_id)
+    except RedisError as e:
+        # Sin Redis la vista se aplica directamente, como un lote de uno
+        logger.warning(f"Could not queue view for Post ID {post_id}: {str(e)}")
+        apply_post_views([(post_id, ip_address, user_id)])
+        return
+    schedule_post_view_flush()
+
+
+async def aregister_post_view(post_id, ip_address, user):
+    """
+    Versión async de ``register_post_view``. Solo pasa por un hilo si Redis
+    falla o si el flush aún no está programado (una vez por intervalo).
+    """
+    user_id = user.id if user is not None else None
+    try:
+        await aadd_post_view_event(post_id, ip_address, user_id)
+    except RedisError as e:
+        logger.warning(f"Could not queue view for Post ID {post_id}: {str(e)}")
+        await sync_to_async(apply_post_views)([(post_id, ip_address, user_id)])
+        return
+    if await acache_get(POST_VIEW_FLUSH_SCHEDULED_KEY) is None:
+        await sync_to_async(schedule_post_view_flush)()
+
+
+def invalidate_post_detail_cache(*slugs):
+    """
+    Invalida el detalle cacheado de los posts, sus encabezados y sus respuestas renderizadas.
+    """
+    two_tier_cache.delete(*[f"post_detail:{slug}" for slug in slugs])
+    cache.delete_many([f"post_headings:{slug}" for slug in slugs])
+    for slug in slugs:
+        bump_generation(f"responses:post_detail:{slug}")
+        bump_generation(f"responses:post_headings:{slug}")
+
+
+def invalidate_post_comments_cache(post_slug):
+    bump_generation(f"post_comments:{post_slug}")
+
+
+def invalidate_comment_replies_cache(comment_id):
+    bump_generation(f"comment_replies:{comment_id}")
+
+
+def post_comments_channel(post_id):
+    return f"comments:post:{post_id}"
+
+
+def publish_comment_event(comment, event):
+    """
+    Publica el comentario en el canal pub/sub de su post, ya como evento SSE,
+    para los clientes de ``PostCommentsStreamView``.
+    """
+    frame = event_stream_frame(event, CommentSerializer(comment).data, event_id=comment.id)
+    try:
+        get_redis().publish(post_comments_channel(comment.post_id), frame)
+    except Exception as e:
+        # El comentario ya está guardado: los clientes lo verán al recargar
+        logger.error(f"Error publishing comment {comment.id}: {str(e)}")
 
 
 class CategoriesListView(StandardAPIView):
@@ -136,10 +253,11 @@ class PostAuthorViews(StandardAPIView):
             return self.error(f"Missing required fields: {', '.join(missing_fields)}")
 
         # Obtener parametros
-        title = sanitize_string(request.data.get('title', None))
-        description = sanitize_string(request.data.get('description', ""))
-        content = sanitize_html(request.data.get('content', None))        
-        post_status = sanitize_string(request.data.get('status', 'draft'))        
+        cleaned_data = sanitize_fields(request.data, POST_FIELDS, defaults=POST_FIELD_DEFAULTS)
+        title = cleaned_data["title"]
+        description = cleaned_data["description"]
+        content = cleaned_data["content"]
+        post_status = cleaned_data["status"]
 
         # Thumbnail params
         thumbnail_name = request.data.get("thumbnail_name", None)
@@ -150,7 +268,7 @@ class PostAuthorViews(StandardAPIView):
         thumbnail_media_type = request.data.get("thumbnail_media_type", 'image')
 
         # Other params
-        keywords = sanitize_string(request.data.get("keywords", ""))
+        keywords = cleaned_data["keywords"]
         slug = slugify(request.data.get("slug", None))
         category_slug = slugify(request.data.get("category", None))
 
@@ -188,21 +306,13 @@ class PostAuthorViews(StandardAPIView):
                 post.save()
 
             # Procesar encabezados dinámicamente desde el contenido HTML
-            soup = BeautifulSoup(content, "html.parser")
-            headings = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])
-            
-            for order, heading in enumerate(headings, start=1):
-                level = int(heading.name[1])  # Extract the level from 'h1', 'h2', etc.
-                Heading.objects.create(
-                    post=post,
-                    title=heading.get_text(strip=True),
-                    slug=slugify(heading.get_text(strip=True)),
-                    level=level,
-                    order=order,
-                )
+            Heading.objects.bulk_create(build_headings(post, content))
 
         except Exception as e:
             return self.error(f"An error occurred: {str(e)}")
+
+        # Recalcular listados y posts populares en segundo plano
+        schedule_cache_warming(force=True)
         
         return self.response(
             f"Post '{post.title}' created successfully. It will be showed in a few minutes",
@@ -218,11 +328,12 @@ class PostAuthorViews(StandardAPIView):
             return self.error("You do not have permission to edit posts")
         
         post_slug = request.data.get("post_slug", None)
-        title = sanitize_string(request.data.get('title', None))
-        description = sanitize_string(request.data.get('description', ""))
-        content = sanitize_html(request.data.get('content', None))        
-        post_status = sanitize_string(request.data.get('status', 'draft'))   
-        keywords = sanitize_string(request.data.get('keywords', ""))
+        cleaned_data = sanitize_fields(request.data, POST_FIELDS, defaults=POST_FIELD_DEFAULTS)
+        title = cleaned_data["title"]
+        description = cleaned_data["description"]
+        content = cleaned_data["content"]
+        post_status = cleaned_data["status"]
+        keywords = cleaned_data["keywords"]
         slug = slugify(request.data.get("slug", None))
         category_slug = slugify(request.data.get("category", None))
 
@@ -270,25 +381,17 @@ class PostAuthorViews(StandardAPIView):
 
             post.thumbnail = thumbnail
 
-        # Procesar encabezados dinámicamente desde el contenido HTML
-        soup = BeautifulSoup(content, "html.parser")
-        headings = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])
-
-        # Borrar los headings actuales del post
+        # Borrar los headings actuales del post y procesar los nuevos desde el contenido HTML
         Heading.objects.filter(post=post).delete()
-        
-        for order, heading in enumerate(headings, start=1):
-            level = int(heading.name[1])  # Extract the level from 'h1', 'h2', etc.
-            Heading.objects.create(
-                post=post,
-                title=heading.get_text(strip=True),
-                slug=slugify(heading.get_text(strip=True)),
-                level=level,
-                order=order,
-            )
+        Heading.objects.bulk_create(build_headings(post, content))
 
         post.save()
 
+        # Invalidar caché relacionado con este post
+        self._invalidate_post_list_cache()
+        invalidate_post_detail_cache(post_slug, slug)
+        schedule_cache_warming(force=True)
+
         serialized_post = PostSerializer(post, context={'request': request}).data
 
         return self.response(serialized_post)
@@ -315,137 +418,162 @@ class PostAuthorViews(StandardAPIView):
 
         # Invalidar caché relacionado con este post
         self._invalidate_post_list_cache()
-        self._invalidate_post_detail_cache(post_slug)
+        invalidate_post_detail_cache(post_slug)
         
         return self.response(f"Post with slug {post_slug} deleted successully.")
 
     def _invalidate_post_list_cache(self):
         """
-        Invalida las claves de caché relacionadas con la lista de posts.
-        """
-        # Obtén todas las claves de caché activas relacionadas con los posts
-        cache_keys = cache.keys("post_list:*")  # Asume que todas las claves inician con 'post_list:'
-
-        # Eliminar todas las claves relacionadas
-        for key in cache_keys:
-            cache.delete(key)
-    
-    def _invalidate_post_detail_cache(self, slug):
-        """
-        Invalida el cache del post.
+        Invalida las claves de caché relacionadas con la lista de posts,
+        en Redis y en el cache local de cada worker.
         """
-        cache_key = f"post_detail:{slug}"
-        cache.delete(cache_key)
+        two_tier_cache.delete_pattern("post_list:*")
+        bump_generation("responses:post_list")
 
 
-class PostListView(StandardAPIView):
+class PostListView(CachedResponseMixin, StandardAPIView):
     permission_classes = [HasValidAPIKey]
 
     def get(self, request, *args, **kwargs):
         try:
             # Parametros de solicitud
-            search = request.query_params.get("search", "").strip()
-            sorting = request.query_params.get("sorting", None)
-            ordering = request.query_params.get("ordering", None)
-            author = request.query_params.get("author", None)
-            is_featured = request.query_params.get("is_featured", None)
-            categories = request.query_params.getlist("categories", [])
-            page = request.query_params.get("p", "1")
+            search, sorting, ordering, author, is_featured, categories, page = self._get_params(request)
 
             # Construir clave de cache para resultados paginados
-            cache_key = f"post_list:{search}:{sorting}:{ordering}:{author}:{categories}:{is_featured}:{page}"
-            cached_posts = cache.get(cache_key)
-            if cached_posts:
-                # Serializar los datos del caché
-                serialized_posts = PostListSerializer(cached_posts, many=True).data
-                # Incrementar impresiones en Redis para los posts del caché
-                for post in cached_posts:
-                    redis_client.incr(f"post:impressions:{post.id}")  # Usar `post.id`
-                return self.paginate(request, serialized_posts)
-
-            # Consulta inicial optimizada con nombres de anotación únicos
-            posts = Post.postobjects.all().select_related("category").annotate(
-                analytics_views=Coalesce(F("post_analytics__views"), Value(0)),
-                analytics_likes=Coalesce(F("post_analytics__likes"), Value(0)),
-                analytics_comments=Coalesce(F("post_analytics__comments"), Value(0)),
-                analytics_shares=Coalesce(F("post_analytics__shares"), Value(0)),
+            cache_key = post_list_cache_key(search, sorting, ordering, author, categories, is_featured, page)
+            # Las primeras páginas se sirven también desde el cache local del proceso
+            post_cache = two_tier_cache if page in HOT_LIST_PAGES else cache
+            posts = get_or_fill(
+                cache_key,
+                lambda: self._get_posts(search, sorting, author, categories, is_featured),
+                timeout=60 * 5,
+                store=post_cache,
             )
-            
-            # Filtrar por autor
-            if author:
-                posts = posts.filter(user__username=author)
-
-            # Si no hay posts del autor, responder inmediatamente
-            if not posts.exists():
-                raise NotFound(detail=f"No posts found for author: {author}")
-            
-            # Filtrar por busqueda
-            if search:
-                posts = posts.filter(
-                    Q(title__icontains=search) |
-                    Q(description__icontains=search) |
-                    Q(content__icontains=search) |
-                    Q(keywords__icontains=search) |
-                    Q(category__name__icontains=search)
-                )
-            
-            # Filtrar por categoria
-            if categories:
-                category_queries = Q()
-                for category in categories:
-                    # Check if category is a valid uuid
-                    try:
-                        uuid.UUID(category)
-                        uuid_query = (
-                            Q(category__id=category)
-                        )
-                        category_queries |= uuid_query
-                    except ValueError:
-                        slug_query = (
-                            Q(category__slug=category)
-                        )
-                        category_queries |= slug_query
-                posts = posts.filter(category_queries)
-            
-            # Filtrar por posts destacados
-            if is_featured:
-                # Convertir el valor del parámetro a booleano
-                is_featured = is_featured.lower() in ['true', '1', 'yes']
-                posts = posts.filter(featured=is_featured)
-            
-            # Ordenamiento
-            if sorting:
-                if sorting == "newest":
-                    posts = posts.order_by("-created_at")
-                elif sorting == 'az':
-                    posts = posts.order_by("title")
-                elif sorting == 'za':
-                    posts = posts.order_by("-title")
-                elif sorting == "recently_updated":
-                    posts = posts.order_by("-updated_at")
-                elif sorting == "most_viewed":
-                    posts = posts.order_by("-analytics_views") 
-
-            # if ordering:
-
-            # Guardar los objetos en el caché
-            cache.set(cache_key, posts, timeout=60 * 5)
-
-            # Serializar los datos para la respuesta
-            serialized_posts = PostListSerializer(posts, many=True).data
-
-            # Incrementar impresiones en Redis
-            for post in posts:
-                redis_client.incr(f"post:impressions:{post.id}")  # Usar `post.id`
 
-            return self.paginate(request, serialized_posts)
+            # Incrementar impresiones en Redis (un solo round trip)
+            incr_many([f"post:impressions:{post.id}" for post in posts])
+
+            etag = self._get_etag(request, cache_key, posts)
+            not_modified = get_not_modified_response(request, etag)
+            if not_modified is not None:
+                return not_modified
+
+            # Respuesta ya renderizada y comprimida; solo se serializa al llenar el cache
+            return self.cached_response(
+                request,
+                response_cache_key(request, "post_list", signed=True),
+                lambda: set_validators(self.paginate(request, self._serialize_posts(posts)), etag),
+                timeout=settings.AWS_CLOUDFRONT_SIGNED_URL_EXPIRE,
+                meta={"post_ids": [post.id for post in posts]},
+            )
         except NotFound as e:
             return self.response([], status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             raise APIException(detail=f"An unexpected error occurred: {str(e)}")
 
+    def _get_params(self, request):
+        return (
+            request.query_params.get("search", "").strip(),
+            request.query_params.get("sorting", None),
+            request.query_params.get("ordering", None),
+            request.query_params.get("author", None),
+            request.query_params.get("is_featured", None),
+            request.query_params.getlist("categories", []),
+            request.query_params.get("p", "1"),
+        )
+
+    def _serialize_posts(self, posts):
+        """
+        Serializa el listado con las thumbnails firmadas por ventana
+        (``cached_signed_urls``): la respuesta se cachea hasta el final de la
+        ventana y las URLs siguen valiendo mientras se sirve.
+        """
+        signed_urls = cached_signed_urls(post.thumbnail.key for post in posts if post.thumbnail_id)
+        return PostListSerializer(posts, many=True, context={"signed_urls": signed_urls}).data
+
+    def _get_etag(self, request, cache_key, posts):
+        """
+        ETag calculado sobre el resultado cacheado, antes de serializar.
+        La respuesta incluye URLs firmadas: solo se valida por ETag, sin Last-Modified.
+        """
+        return make_etag(
+            cache_key,
+            request.query_params.get("page_size", ""),
+            signed_url_window(),
+            *[(post.id, post.updated_at, post.analytics_views) for post in posts],
+        )
 
-class PostDetailView(StandardAPIView):
+    def _get_posts(self, search, sorting, author, categories, is_featured):
+        """
+        Construye la lista de posts publicados para los filtros dados.
+        """
+        # Consulta inicial optimizada con nombres de anotación únicos
+        posts = Post.postobjects.all().select_related("category", "post_analytics", "user", "thumbnail").annotate(
+            analytics_views=Coalesce(F("post_analytics__views"), Value(0)),
+            analytics_likes=Coalesce(F("post_analytics__likes"), Value(0)),
+            analytics_comments=Coalesce(F("post_analytics__comments"), Value(0)),
+            analytics_shares=Coalesce(F("post_analytics__shares"), Value(0)),
+        )
+        
+        # Filtrar por autor
+        if author:
+            posts = posts.filter(user__username=author)
+
+        # Si no hay posts del autor, responder inmediatamente
+        if not posts.exists():
+            raise NotFound(detail=f"No posts found for author: {author}")
+        
+        # Filtrar por busqueda
+        if search:
+            posts = posts.filter(
+                Q(title__icontains=search) |
+                Q(description__icontains=search) |
+                Q(content__icontains=search) |
+                Q(keywords__icontains=search) |
+                Q(category__name__icontains=search)
+            )
+        
+        # Filtrar por categoria
+        if categories:
+            category_queries = Q()
+            for category in categories:
+                # Check if category is a valid uuid
+                try:
+                    uuid.UUID(category)
+                    uuid_query = (
+                        Q(category__id=category)
+                    )
+                    category_queries |= uuid_query
+                except ValueError:
+                    slug_query = (
+                        Q(category__slug=category)
+                    )
+                    category_queries |= slug_query
+            posts = posts.filter(category_queries)
+        
+        # Filtrar por posts destacados
+        if is_featured:
+            # Convertir el valor del parámetro a booleano
+            is_featured = is_featured.lower() in ['true', '1', 'yes']
+            posts = posts.filter(featured=is_featured)
+        
+        # Ordenamiento
+        if sorting:
+            if sorting == "newest":
+                posts = posts.order_by("-created_at")
+            elif sorting == 'az':
+                posts = posts.order_by("title")
+            elif sorting == 'za':
+                posts = posts.order_by("-title")
+            elif sorting == "recently_updated":
+                posts = posts.order_by("-updated_at")
+            elif sorting == "most_viewed":
+                posts = posts.order_by("-analytics_views")
+
+        return list(posts)
+
+
+class PostDetailView(CachedResponseMixin, StandardAPIView):
     permission_classes = [HasValidAPIKey]
 
     def get(self, request):
@@ -457,72 +585,110 @@ class PostDetailView(StandardAPIView):
             raise NotFound(detail="A valid slug must be provided")
 
         try:
-            # Verificar si los datos están en caché
-            cache_key = f"post_detail:{slug}"
-            cached_post = cache.get(cache_key)
-            if cached_post:
-                serialized_post = PostSerializer(cached_post, context={'request': request}).data
-                self._register_view_interaction(cached_post, ip_address, user)
-                return self.response(serialized_post)
-
-            # Si no está en caché, obtener el post de la base de datos
-            try:
-                post = Post.postobjects.get(slug=slug)
-            except Post.DoesNotExist:
-                raise NotFound(f"Post {slug} does not exist.")
-
-            serialized_post = PostSerializer(post, context={'request': request}).data
-
-            # Guardar en el caché
-            cache.set(cache_key, post, timeout=60 * 5)
-
-            # Registrar interaccion
-            self._register_view_interaction(post, ip_address, user)
-            
+            # Obtener el post del caché o de la base de datos (una sola reconstrucción a la vez)
+            post = get_or_fill(
+                f"post_detail:{slug}",
+                lambda: self._get_post(slug),
+                timeout=60 * 5,
+                store=two_tier_cache,
+            )
+
+            # Registrar interaccion (tambien cuando el cliente ya tiene la version actual)
+            register_post_view(post.id, ip_address, user)
+
+            etag, last_modified = self._get_validators(post, user)
+            not_modified = get_not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                not_modified["Vary"] = "Authorization"
+                return not_modified
+
+            if user is None:
+                # Sin usuario la respuesta es igual para todos: se sirve renderizada y comprimida.
+                # La clave siempre lleva la ventana de firma para poder calcularla sin el post.
+                return self.cached_response(
+                    request,
+                    response_cache_key(request, f"post_detail:{slug}", signed=True),
+                    lambda: self._build_response(request, post, etag, last_modified),
+                    timeout=settings.AWS_CLOUDFRONT_SIGNED_URL_EXPIRE,
+                    meta={"post_id": post.id},
+                )
+
+            return self._build_response(request, post, etag, last_modified)
 
         except Post.DoesNotExist:
             raise NotFound(detail="The requested post does not exist")
         except Exception as e:
             raise APIException(detail=f"An unexpected error occurred: {str(e)}")
 
-        return self.response(serialized_post)
+    def _build_response(self, request, post, etag, last_modified):
+        # Thumbnail firmada por ventana: la respuesta anónima se cachea hasta el final de la ventana
+        signed_urls = cached_signed_urls([post.thumbnail.key] if post.thumbnail_id else [])
+        serialized_post = PostSerializer(post, context={'request': request, 'signed_urls': signed_urls}).data
+        response = set_validators(self.response(serialized_post), etag, last_modified)
+        # has_liked depende del usuario autenticado
+        response["Vary"] = "Authorization"
+        return response
+
+    def _get_post(self, slug):
+        return Post.postobjects.select_related("category", "thumbnail", "post_analytics").get(slug=slug)
 
-    def _register_view_interaction(self, post, ip_address, user):
+    def _get_validators(self, post, user):
         """
-        Registra la interacción de tipo 'view', maneja incrementos de vistas únicas 
-        y totales, y actualiza PostAnalytics.
+        ETag y Last-Modified del post cacheado. Las métricas del snapshot cambian
+        el ETag porque se incluyen en la respuesta. Con thumbnail (URL firmada) el
+        ETag lleva la ventana de firma y no se envía Last-Modified.
         """
-        # Verifica si esta IP y usuario ya registraron una vista única
-        if not PostView.objects.filter(post=post, ip_address=ip_address, user=user).exists():
-            # Crea un registro de vista unica
-            PostView.objects.create(post=post, ip_address=ip_address, user=user)
-
-            try:
-                PostInteraction.objects.create(
-                    user=user,
-                    post=post,
-                    interaction_type="view",
-                    ip_address=ip_address,
-                )
-            except Exception as e:
-                raise ValueError(f"Error creeating PostInteraction: {e}")
+        analytics = getattr(post, "post_analytics", None)
+        etag = make_etag(
+            post.id,
+            post.updated_at,
+            analytics.views if analytics else 0,
+            analytics.likes if analytics else 0,
+            analytics.comments if analytics else 0,
+            user.pk if user else "anon",
+            signed_url_window() if post.thumbnail_id else "",
+        )
+        return etag, None if post.thumbnail_id else post.updated_at
 
-            analytics, _ = PostAnalytics.objects.get_or_create(post=post)
-            analytics.increment_metric('views')
-        
 
-class PostHeadingsView(StandardAPIView):
+class PostHeadingsView(CachedResponseMixin, StandardAPIView):
     permission_classes = [HasValidAPIKey]
 
     def get(self,request):
         post_slug = request.query_params.get("slug")
+
+        # Encabezados ya serializados junto con su ETag: un 304 cuesta una lectura de cache
+        headings = get_or_fill(
+            f"post_headings:{post_slug}",
+            lambda: self._get_headings(post_slug),
+            timeout=60 * 5,
+        )
+
+        not_modified = get_not_modified_response(request, headings["etag"], headings["last_modified"])
+        if not_modified is not None:
+            return not_modified
+
+        return self.cached_response(
+            request,
+            response_cache_key(request, f"post_headings:{post_slug}"),
+            lambda: set_validators(self.response(headings["results"]), headings["etag"], headings["last_modified"]),
+        )
+
+    def _get_headings(self, post_slug):
         heading_objects = Heading.objects.filter(post__slug = post_slug)
         serialized_data = HeadingSerializer(heading_objects, many=True).data
-        return self.response(serialized_data)
+        last_modified = Post.objects.filter(slug=post_slug).values_list("updated_at", flat=True).first()
+        return {
+            "results": serialized_data,
+            "etag": make_etag(json.dumps(serialized_data, sort_keys=True, default=str)),
+            "last_modified": last_modified,
+        }
     
 
 class IncrementPostClickView(StandardAPIView):
     permission_classes = [HasValidAPIKey]
+    # Los clics inflan el CTR: por IP, también para anónimos
+    rate_limits = {"POST": RateLimit("60/m", burst=20, key="ip")}
 
     def post(self, request):
         """
@@ -554,75 +720,80 @@ class CategoryListView(StandardAPIView):
 
         try:
             # Parametros de solicitud
-            parent_slug = request.query_params.get("parent_slug", None)
-            ordering = request.query_params.get("ordering", None)
-            sorting = request.query_params.get("sorting", None)
-            search = request.query_params.get("search", "").strip()
-            page = request.query_params.get("p", "1")
+            parent_slug, ordering, sorting, search, page = self._get_params(request)
 
             # Construir clave de cache para resultados paginados
             cache_key = f"category_list:{page}:{ordering}:{sorting}:{search}:{parent_slug}"
-            cached_categories = cache.get(cache_key)
-            if cached_categories:
-                # Serializar los datos del caché
-                serialized_categories = CategoryListSerializer(cached_categories, many=True).data
-                # Incrementar impresiones en Redis para los posts del caché
-                for category in cached_categories:
-                    redis_client.incr(f"category:impressions:{category.id}")  # Usar `post.id`
-                return self.paginate(request, serialized_categories)
-
-            # Consulta inicial optimizada
-            if parent_slug:
-                categories = Category.objects.filter(parent__slug=parent_slug).prefetch_related(
-                    Prefetch("category_analytics", to_attr="analytics_cache")
-                )
-            else:
-                # Si no especificamos un parent_slug buscamos las categorias padre
-                categories = Category.objects.filter(parent__isnull=True).prefetch_related(
-                    Prefetch("category_analytics", to_attr="analytics_cache")
-                )
-
-            if not categories.exists():
-                raise NotFound(detail="No categories found.")
-            
-            # Filtrar por busqueda
-            if search != "":
-                categories = categories.filter(
-                    Q(name__icontains=search) |
-                    Q(slug__icontains=search) |
-                    Q(title__icontains=search) |
-                    Q(description__icontains=search)
-                )
-            
-            # Ordenamiento
-            if sorting:
-                if sorting == 'newest':
-                    categories = categories.order_by("-created_at")
-                elif sorting == 'recently_updated':
-                    categories = categories.order_by("-updated_at")
-                elif sorting == 'most_viewed':
-                    categories = categories.annotate(popularity=F("analytics_cache__views")).order_by("-popularity")
-
-            if ordering:
-                if ordering == 'az':
-                    posts = posts.order_by("name")
-                if ordering == 'za':
-                    posts = posts.order_by("-name")
-
-            # Guardar los objetos en el caché
-            cache.set(cache_key, categories, timeout=60 * 5)
+            categories = get_or_fill(
+                cache_key,
+                lambda: self._get_categories(parent_slug, ordering, sorting, search),
+                timeout=60 * 5,
+                store=two_tier_cache,
+            )
 
             # Serializacion
             serialized_categories = CategoryListSerializer(categories, many=True).data
 
-            # Incrementar impresiones en Redis
-            for category in categories:
-                redis_client.incr(f"category:impressions:{category.id}")
+            # Incrementar impresiones en Redis (un solo round trip)
+            incr_many([f"category:impressions:{category.id}" for category in categories])
 
             return self.paginate(request, serialized_categories)
         except Exception as e:
                 raise APIException(detail=f"An unexpected error occurred: {str(e)}")
 
+    def _get_params(self, request):
+        return (
+            request.query_params.get("parent_slug", None),
+            request.query_params.get("ordering", None),
+            request.query_params.get("sorting", None),
+            request.query_params.get("search", "").strip(),
+            request.query_params.get("p", "1"),
+        )
+
+    def _get_categories(self, parent_slug, ordering, sorting, search):
+        """
+        Construye la lista de categorias para los filtros dados.
+        """
+        # Consulta inicial optimizada
+        if parent_slug:
+            categories = Category.objects.filter(parent__slug=parent_slug).prefetch_related(
+                Prefetch("category_analytics", to_attr="analytics_cache")
+            )
+        else:
+            # Si no especificamos un parent_slug buscamos las categorias padre
+            categories = Category.objects.filter(parent__isnull=True).prefetch_related(
+                Prefetch("category_analytics", to_attr="analytics_cache")
+            )
+
+        if not categories.exists():
+            raise NotFound(detail="No categories found.")
+        
+        # Filtrar por busqueda
+        if search != "":
+            categories = categories.filter(
+                Q(name__icontains=search) |
+                Q(slug__icontains=search) |
+                Q(title__icontains=search) |
+                Q(description__icontains=search)
+            )
+        
+        # Ordenamiento
+        if sorting:
+            if sorting == 'newest':
+                categories = categories.order_by("-created_at")
+            elif sorting == 'recently_updated':
+                categories = categories.order_by("-updated_at")
+            elif sorting == 'most_viewed':
+                categories = categories.annotate(popularity=F("analytics_cache__views")).order_by("-popularity")
+
+        if ordering:
+            if ordering == 'az':
+                categories = categories.order_by("name")
+            if ordering == 'za':
+                categories = categories.order_by("-name")
+
+        return list(categories)
+
 
 class CategoryDetailView(StandardAPIView):
     permission_classes = [HasValidAPIKey]
@@ -638,44 +809,40 @@ class CategoryDetailView(StandardAPIView):
                 return self.error("Missing slug parameter")
             
             # Construir cache
-            cache_key = f"category_posts:{slug}:{page}"
-            cached_posts = cache.get(cache_key)
-            if cached_posts:
-                # Serializar los datos del caché
-                serialized_posts = PostListSerializer(cached_posts, many=True).data
-                # Incrementar impresiones en Redis para los posts del caché
-                for post in cached_posts:
-                    redis_client.incr(f"post:impressions:{post.id}")  # Usar `post.id`
-                return self.paginate(request, serialized_posts)
-
-            # Obtener la categoria por slug
-            category = get_object_or_404(Category, slug=slug)
-
-            # Obtener los posts que pertenecen a esta categoria
-            posts = Post.postobjects.filter(category=category).select_related("category").prefetch_related(
-                Prefetch("post_analytics", to_attr="analytics_cache")
-            )
-            
-            if not posts.exists():
-                raise NotFound(detail=f"No posts found for category '{category.name}'")
-            
-            # Guardar los objetos en el caché
-            cache.set(cache_key, posts, timeout=60 * 5)
+            cache_key = category_posts_cache_key(slug, page)
+            posts = get_or_fill(cache_key, lambda: self._get_category_posts(slug), timeout=60 * 5)
 
             # Serializar los posts
             serialized_posts = PostListSerializer(posts, many=True).data
 
-            # Incrementar impresiones en Redis
-            for post in posts:
-                redis_client.incr(f"post:impressions:{post.id}")
+            # Incrementar impresiones en Redis (un solo round trip)
+            incr_many([f"post:impressions:{post.id}" for post in posts])
 
             return self.paginate(request, serialized_posts)
         except Exception as e:
             raise APIException(detail=f"An unexpected error occurred: {str(e)}")
 
+    def _get_category_posts(self, slug):
+        """
+        Obtiene los posts publicados que pertenecen a una categoria.
+        """
+        # Obtener la categoria por slug
+        category = get_object_or_404(Category, slug=slug)
+
+        # Obtener los posts que pertenecen a esta categoria
+        posts = Post.postobjects.filter(category=category).select_related("category", "user", "thumbnail").prefetch_related(
+            Prefetch("post_analytics", to_attr="analytics_cache")
+        )
+        
+        if not posts.exists():
+            raise NotFound(detail=f"No posts found for category '{category.name}'")
+
+        return list(posts)
+
 
 class IncrementCategoryClickView(StandardAPIView):
     permission_classes = [HasValidAPIKey]
+    rate_limits = {"POST": RateLimit("60/m", burst=20, key="ip")}
 
     def post(self, request):
         """
@@ -712,11 +879,16 @@ class ListPostCommentsView(StandardAPIView):
             raise NotFound(detail="A valid post slug must be provided")
         
         # Definir clave cache
-        cache_key = f"post_comments:{post_slug}:{page}"
-        cached_comments = cache.get(cache_key)
-        if cached_comments:
-            return self.paginate(request, cached_comments)
-        
+        cache_key = post_comments_cache_key(post_slug, page)
+        serialized_comments = get_or_fill(
+            cache_key,
+            lambda: self._get_serialized_comments(post_slug),
+            timeout=60 * 5,
+        )
+
+        return self.paginate(request, serialized_comments)
+
+    def _get_serialized_comments(self, post_slug):
         try:
             post = Post.objects.get(slug=post_slug)
         except Post.DoesNotExist:
@@ -727,20 +899,17 @@ class ListPostCommentsView(StandardAPIView):
 
         serialized_comments = CommentSerializer(comments, many=True).data
 
-        # Guardar clave en el índice
-        cache_index_key = f"post_comments_cache_keys:{post_slug}"
-        cache_keys = cache.get(cache_index_key, [])
-        cache_keys.append(cache_key)
-        cache.set(cache_index_key, cache_keys, timeout=60 * 5)
-
-        # Almacenar los datos en caché
-        cache.set(cache_key, serialized_comments, timeout=60 * 5)
-
-        return self.paginate(request, serialized_comments)
+        return serialized_comments
 
 
 class PostCommentViews(StandardAPIView):
     permission_classes = [HasValidAPIKey, permissions.IsAuthenticated]
+    # Editar y borrar comparten un bucket aparte del de publicar
+    rate_limits = {
+        "POST": RateLimit("10/m", burst=5),
+        "PUT": RateLimit("30/m", burst=10, scope="PostCommentEdit"),
+        "DELETE": RateLimit("30/m", burst=10, scope="PostCommentEdit"),
+    }
     
     def post(self, request):
         """
@@ -768,10 +937,14 @@ class PostCommentViews(StandardAPIView):
         )
 
         # Invalidar el cache de comentarios para el post
-        self._invalidate_post_comments_cache(post_slug)
+        invalidate_post_comments_cache(post_slug)
 
         # Actualizar interaccion de post
         self._register_comment_interaction(comment, post, ip_address, user)
+        # Las métricas del detalle cacheado (y su ETag) cambiaron
+        invalidate_post_detail_cache(post.slug)
+
+        publish_comment_event(comment, "comment")
 
         return self.response(f"Comment created for post {post.title}")
     
@@ -795,10 +968,10 @@ class PostCommentViews(StandardAPIView):
         comment.save()
 
         # Invalidar el cache de comentarios para el post
-        self._invalidate_post_comments_cache(comment.post.slug)
+        invalidate_post_comments_cache(comment.post.slug)
 
-        if comment.parent and comment.parent.replies.exists():
-            self._invalidate_comment_replies_cache(comment.parent.id)
+        if comment.parent_id:
+            invalidate_comment_replies_cache(comment.parent_id)
 
         return self.response("Comment content updated successfully")
     
@@ -819,8 +992,8 @@ class PostCommentViews(StandardAPIView):
         post = comment.post
         post_analytics, _ = PostAnalytics.objects.get_or_create(post=post)
 
-        if comment.parent and comment.parent.replies.exists():
-            self._invalidate_comment_replies_cache(comment.parent.id)
+        if comment.parent_id:
+            invalidate_comment_replies_cache(comment.parent_id)
 
         comment.delete()
 
@@ -831,7 +1004,9 @@ class PostCommentViews(StandardAPIView):
         post_analytics.save()
 
         # Invalidar el cache de comentarios para el post
-        self._invalidate_post_comments_cache(post.slug)
+        invalidate_post_comments_cache(post.slug)
+        # Las métricas del detalle cacheado (y su ETag) cambiaron
+        invalidate_post_detail_cache(post.slug)
 
         return self.response("Comment deleted successfully")
     
@@ -848,33 +1023,6 @@ class PostCommentViews(StandardAPIView):
         analytics, _ = PostAnalytics.objects.get_or_create(post=post)
         analytics.increment_metric("comments")
 
-    def _invalidate_post_comments_cache(self, post_slug):
-        """
-        Invalida todas las claves de caché relacionadas con los comentarios de un post.
-        """
-        # definir clave cache
-        cache_index_key = f"post_comments_cache_keys:{post_slug}"
-        cache_keys = cache.get(cache_index_key, [])
-
-        # Eliminar cada clave almacenada en el indice
-        for key in cache_keys:
-            cache.delete(key)
-
-        # Limpiar el indice de claves
-        cache.delete(cache_index_key)
-
-    def _invalidate_comment_replies_cache(self, comment_id):
-        """
-        Invalida todas las claves de caché relacionadas con las respuestas de un comentario.
-        """
-        cache_index_key = f"comment_replies_cache_keys:{comment_id}"
-        cache_keys = cache.get(cache_index_key, [])
-
-        for key in cache_keys:
-            cache.delete(key)
-
-        cache.delete(cache_index_key)
-
 
 class ListCommentRepliesView(StandardAPIView):
     permission_classes = [HasValidAPIKey]
@@ -888,11 +1036,16 @@ class ListCommentRepliesView(StandardAPIView):
             raise NotFound(detail="A valid comment_id must be provided")
         
         # Definir la clave cache
-        cache_key = f"comment_replies:{comment_id}:{page}"
-        cached_replies = cache.get(cache_key)
-        if cached_replies:
-            return self.paginate(request, cached_replies)
-        
+        cache_key = comment_replies_cache_key(comment_id, page)
+        serialized_replies = get_or_fill(
+            cache_key,
+            lambda: self._get_serialized_replies(comment_id),
+            timeout=60 * 5,
+        )
+
+        return self.paginate(request, serialized_replies)
+
+    def _get_serialized_replies(self, comment_id):
         # Obtener el comentario padre
         try:
             parent_comment = Comment.objects.get(id=comment_id)
@@ -905,27 +1058,12 @@ class ListCommentRepliesView(StandardAPIView):
         # Serializar respuesta
         serialized_replies = CommentSerializer(replies, many=True).data
 
-        # Registrar la clave en el índice de caché
-        self._register_comment_reply_cache_key(comment_id, cache_key)
-
-        # Guardar las respuestas en el caché
-        cache.set(cache_key, serialized_replies, timeout=60 * 5)
-
-        return self.paginate(request, serialized_replies)
-    
-    def _register_comment_reply_cache_key(self, comment_id, cache_key):
-        """
-        Registrar claves de caché relacionadas con las respuestas de un comentario.
-        """
-        cache_index_key = f"comment_replies_cache_keys:{comment_id}"
-        cache_keys = cache.get(cache_index_key, [])
-        if cache_key not in cache_keys:
-            cache_keys.append(cache_key)
-        cache.set(cache_index_key, cache_keys, timeout=60 * 5)
+        return serialized_replies
 
     
 class CommentReplyViews(StandardAPIView):
     permission_classes = [HasValidAPIKey, permissions.IsAuthenticated]
+    rate_limits = {"POST": RateLimit("10/m", burst=5)}
 
     def post(self, request):
 
@@ -952,11 +1090,15 @@ class CommentReplyViews(StandardAPIView):
             content=content,
         )
 
-        # Invalidar caché de respuestas
-        self._invalidate_comment_replies_cache(comment_id)
+        # Invalidar caché de respuestas y el replies_count del listado de comentarios
+        invalidate_comment_replies_cache(comment_id)
+        invalidate_post_comments_cache(parent_comment.post.slug)
 
         # Actualiizar metricas
         self._register_comment_interaction(comment, comment.post, ip_address, user)
+        invalidate_post_detail_cache(comment.post.slug)
+
+        publish_comment_event(comment, "reply")
 
         return self.response("Comment reply created successfully")
 
@@ -973,21 +1115,13 @@ class CommentReplyViews(StandardAPIView):
         analytics, _ = PostAnalytics.objects.get_or_create(post=post)
         analytics.increment_metric("comments")
 
-    def _invalidate_comment_replies_cache(self, comment_id):
-        """
-        Invalida todas las claves de caché relacionadas con las respuestas de un comentario.
-        """
-        cache_index_key = f"comment_replies_cache_keys:{comment_id}"
-        cache_keys = cache.get(cache_index_key, [])
-
-        for key in cache_keys:
-            cache.delete(key)
-
-        cache.delete(cache_index_key)
-
 
 class PostLikeViews(StandardAPIView):
     permission_classes = [HasValidAPIKey, permissions.IsAuthenticated]
+    rate_limits = {
+        "POST": RateLimit("30/m", burst=10),
+        "DELETE": RateLimit("30/m", burst=10),
+    }
 
     def post(self, request):
         """
@@ -1024,6 +1158,8 @@ class PostLikeViews(StandardAPIView):
         # Incrementar métricas
         analytics, _ = PostAnalytics.objects.get_or_create(post=post)
         analytics.increment_metric("likes")
+        # Las métricas del detalle cacheado (y su ETag) cambiaron
+        invalidate_post_detail_cache(post.slug)
 
         return self.response(f"You have liked the post: {post.title}")
     
@@ -1055,12 +1191,15 @@ class PostLikeViews(StandardAPIView):
         analytics, _ = PostAnalytics.objects.get_or_create(post=post)
         analytics.likes = PostLike.objects.filter(post=post).count()
         analytics.save()
+        # Las métricas del detalle cacheado (y su ETag) cambiaron
+        invalidate_post_detail_cache(post.slug)
 
         return self.response(f"You have unliked the post: {post.title}")
 
 
 class PostShareView(StandardAPIView):
     permission_classes = [HasValidAPIKey]
+    rate_limits = {"POST": RateLimit("20/m", burst=5)}
 
     def post(self, request):
         """
@@ -1121,11 +1260,12 @@ class GenerateFakePostsView(StandardAPIView):
 
         posts_to_generate = 100  # Número de posts ficticios a generar
         status_options = ["draft", "published"]
+        user = UserAccount.objects.get(username="test_editor")
 
+        posts = []
         for _ in range(posts_to_generate):
             title = fake.sentence(nb_words=6)  # Generar título aleatorio
-            user = UserAccount.objects.get(username="test_editor")
-            post = Post(
+            posts.append(Post(
                 id=uuid.uuid4(),
                 user=user,
                 title=title,
@@ -1135,8 +1275,11 @@ class GenerateFakePostsView(StandardAPIView):
                 slug=slugify(title),  # Generar slug a partir del título
                 category=random.choice(categories),  # Asignar una categoría aleatoria
                 status=random.choice(status_options),
-            )
-            post.save()
+            ))
+
+        # bulk_create no dispara post_save, las analíticas se crean en lote
+        Post.objects.bulk_create(posts)
+        PostAnalytics.objects.bulk_create([PostAnalytics(post=post) for post in posts])
 
         return self.response(f"{posts_to_generate} posts generados exitosamente.")
     
@@ -1153,6 +1296,11 @@ class GenerateFakeAnalyticsView(StandardAPIView):
             return self.response({"error": "No hay posts disponibles para generar analíticas"}, status=400)
 
         analytics_to_generate = len(posts)  # Una analítica por post
+        existing_analytics = {
+            analytics.post_id: analytics for analytics in PostAnalytics.objects.filter(post__in=posts)
+        }
+        analytics_to_create = []
+        analytics_to_update = []
 
         # Generar analíticas para cada post
         for post in posts:
@@ -1162,12 +1310,68 @@ class GenerateFakeAnalyticsView(StandardAPIView):
             avg_time_on_page = round(random.uniform(10, 300), 2)  # Tiempo promedio en segundos
             
             # Crear o actualizar analíticas para el post
-            analytics, created = PostAnalytics.objects.get_or_create(post=post)
+            analytics = existing_analytics.get(post.id)
+            if analytics is None:
+                analytics = PostAnalytics(post=post)
+                analytics_to_create.append(analytics)
+            else:
+                analytics_to_update.append(analytics)
             analytics.views = views
             analytics.impressions = impressions
             analytics.clicks = clicks
             analytics.avg_time_on_page = avg_time_on_page
-            analytics._update_click_through_rate()  # Recalcular el CTR
-            analytics.save()
+            analytics.click_through_rate = (clicks / impressions) * 100  # Recalcular el CTR
+
+        PostAnalytics.objects.bulk_create(analytics_to_create)
+        PostAnalytics.objects.bulk_update(
+            analytics_to_update,
+            ["views", "impressions", "clicks", "avg_time_on_page", "click_through_rate"],
+        )
 
-        return self.response({"message": f"Analíticas generadas para {analytics_to_generate} posts."})
\ No newline at end of file
+        return self.response({"message": f"Analíticas generadas para {analytics_to_generate} posts."})
+
+class ExportPostDataView(StandardAPIView):
+    permission_classes = [HasValidAPIKey, permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        Exportar interacciones, vistas o analíticas en streaming (NDJSON o CSV)
+        """
+        export = request.query_params.get("type", "interactions")
+        file_format = request.query_params.get("output", "ndjson")
+        use_gzip = request.query_params.get("gzip", "false").lower() in ["true", "1", "yes"]
+        post_slug = request.query_params.get("slug", None)
+
+        if file_format not in CONTENT_TYPES:
+            raise ValidationError(f"Invalid output: {file_format}. Choose one of: {', '.join(CONTENT_TYPES)}")
+
+        try:
+            queryset = export_queryset(
+                export,
+                since=parse_time(request.query_params.get("since")),
+                until=parse_time(request.query_params.get("until")),
+                post_slug=post_slug,
+            )
+        except ValueError as e:
+            raise ValidationError(str(e))
+
+        # El stream se consume después de ReplicaRoutingMiddleware: la base de
+        # datos se elige ahora
+        queryset = queryset.using(queryset.db)
+
+        chunks = stream_rows(queryset, file_format, chunk_size=settings.EXPORT_CHUNK_SIZE)
+        filename = f"{export}.{file_format}"
+        content_type = CONTENT_TYPES[file_format]
+        if use_gzip:
+            chunks = gzip_stream(chunks)
+            filename += ".gz"
+            content_type = "application/gzip"
+
+        if isinstance(request._request, ASGIRequest):
+            chunks = aiter_chunks(chunks)
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["Cache-Control"] = "no-store"
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -0,0 +1,84 @@
+import logging
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import warm
+from .models import Post, Category
+from .views import (
+    PostListView,
+    PostDetailView,
+    CategoryDetailView,
+    post_list_cache_key,
+    category_posts_cache_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def iter_warm_targets():
+    """
+    Devuelve pares (clave, builder) con el mismo formato que usan las vistas:
+    detalle de los posts más vistos, primeras páginas del listado para los
+    ordenamientos habituales y primeras páginas de las categorías más vistas.
+    """
+    pages = [str(page) for page in range(1, settings.CACHE_WARM_LIST_PAGES + 1)]
+
+    detail_view = PostDetailView()
+    top_slugs = Post.postobjects.order_by("-post_analytics__views").values_list("slug", flat=True)[
+        :settings.CACHE_WARM_TOP_POSTS
+    ]
+    for slug in top_slugs:
+        yield f"post_detail:{slug}", lambda slug=slug: detail_view._get_post(slug)
+
+    # La paginación se hace en memoria: todas las páginas guardan la misma lista
+    list_view = PostListView()
+    for sorting in settings.CACHE_WARM_SORTINGS:
+        build = lru_cache(maxsize=None)(lambda sorting=sorting: list_view._get_posts("", sorting, None, [], None))
+        for page in pages:
+            yield post_list_cache_key(sorting=sorting, page=page), build
+
+    category_view = CategoryDetailView()
+    top_categories = Category.objects.order_by("-category_analytics__views").values_list("slug", flat=True)[
+        :settings.CACHE_WARM_TOP_CATEGORIES
+    ]
+    for slug in top_categories:
+        build = lru_cache(maxsize=None)(lambda slug=slug: category_view._get_category_posts(slug))
+        for page in pages:
+            yield category_posts_cache_key(slug, page), build
+
+
+def warm_caches(force=False):
+    """
+    Precalcula las claves de ``iter_warm_targets``. Las claves que siguen frescas
+    o que otro worker está reconstruyendo se omiten, y entre cada reconstrucción
+    se espera ``CACHE_WARM_INTERVAL`` para no competir con el tráfico real.
+    """
+    stats = {"warmed": 0, "skipped": 0, "failed": 0}
+
+    for key, builder in iter_warm_targets():
+        try:
+            built = warm(
+                key,
+                builder,
+                timeout=60 * 5,
+                store=cache,
+                min_ttl=settings.CACHE_WARM_MIN_TTL,
+                force=force,
+            )
+        except Exception as e:
+            # Un listado vacío (NotFound) o un post borrado no detiene el resto
+            logger.info(f"Error warming cache key {key}: {str(e)}")
+            stats["failed"] += 1
+            continue
+
+        if not built:
+            stats["skipped"] += 1
+            continue
+
+        stats["warmed"] += 1
+        time.sleep(settings.CACHE_WARM_INTERVAL)
+
+    return stats
@@ -0,0 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboxEmail
+from .outbox import schedule_outbox_flush
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'from_email', 'status', 'attempts', 'send_after', 'sent_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'from_email')
+    readonly_fields = ('attempts', 'last_error', 'sent_at', 'created_at')
+    ordering = ('-created_at',)
+    actions = ('retry_now',)
+
+    @admin.action(description="Retry selected emails now")
+    def retry_now(self, request, queryset):
+        queryset.exclude(status="sent").update(status="pending", attempts=0, send_after=timezone.now())
+        schedule_outbox_flush(countdown=0)
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+
+from .models import OutboxEmail
+from .outbox import outbox_email_from_message, schedule_outbox_flush
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Backend de email que guarda los mensajes en la bandeja de salida en lugar
+    de enviarlos. ``send_outbox_emails`` los envía en segundo plano por
+    ``EMAIL_DELIVERY_BACKEND``: la petición no espera al servidor de correo.
+    Los mensajes con adjuntos se envían en el momento.
+    """
+
+    def send_messages(self, email_messages):
+        queued = [message for message in email_messages if not message.attachments]
+        direct = [message for message in email_messages if message.attachments]
+
+        sent = 0
+        if queued:
+            OutboxEmail.objects.bulk_create([outbox_email_from_message(message) for message in queued])
+            # El worker no debe buscar los emails antes de que se confirme la transacción
+            transaction.on_commit(schedule_outbox_flush)
+            sent += len(queued)
+        if direct:
+            connection = get_connection(settings.EMAIL_DELIVERY_BACKEND, fail_silently=self.fail_silently)
+            sent += connection.send_messages(direct) or 0
+        return sent
@@ -0,0 +1,45 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEmail(models.Model):
+    """
+    Email pendiente de enviar. Lo crea ``OutboxEmailBackend`` en la petición y
+    lo envía ``send_outbox_emails`` (Celery) con el backend real.
+    """
+
+    statuses = (
+        ("pending", "Pending"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    )
+
+    id = models.UUIDField(default=uuid.uuid4, unique=True, primary_key=True)
+    subject = models.TextField()
+    body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    # [[contenido, mimetype], ...], p. ej. la versión HTML
+    alternatives = models.JSONField(default=list, blank=True)
+
+    status = models.CharField(max_length=10, choices=statuses, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Próximo intento; mientras se envía, hasta cuándo lo tiene reservado un worker
+    send_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "send_after"])]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)}"
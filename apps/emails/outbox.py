@@ -0,0 +1,146 @@
+"""
+Bandeja de salida de emails.
+
+Las peticiones no hablan con el servidor de correo: ``OutboxEmailBackend``
+(``EMAIL_BACKEND``) guarda cada mensaje como ``OutboxEmail`` y programa
+``send_outbox_emails``. El worker reserva lotes de ``EMAIL_OUTBOX_BATCH_SIZE``
+mensajes y los envía por una sola conexión de ``EMAIL_DELIVERY_BACKEND``
+(SMTP en producción, consola o fichero en local).
+
+Un mensaje que falla se reintenta con espera exponencial
+(``EMAIL_OUTBOX_RETRY_DELAY``, el doble en cada intento) hasta
+``EMAIL_OUTBOX_MAX_ATTEMPTS`` intentos. Un mensaje reservado por un worker
+que se cae vuelve a enviarse pasado ``EMAIL_OUTBOX_LOCK_TIMEOUT``.
+"""
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SCHEDULED_KEY = "emails:outbox:scheduled"
+
+
+def outbox_email_from_message(message):
+    """``OutboxEmail`` (sin guardar) con los datos de un ``EmailMessage``."""
+    return OutboxEmail(
+        subject=str(message.subject),
+        body=str(message.body),
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+        alternatives=[[str(content), mimetype] for content, mimetype in getattr(message, "alternatives", [])],
+    )
+
+
+def message_from_outbox_email(email, connection=None):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        connection=connection,
+    )
+    for content, mimetype in email.alternatives:
+        message.attach_alternative(content, mimetype)
+    return message
+
+
+def claim_outbox_emails(batch_size):
+    """
+    Reserva hasta ``batch_size`` mensajes listos para enviar. Con
+    ``SKIP LOCKED`` varios workers reservan lotes distintos sin esperarse.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status__in=["pending", "sending"], send_after__lte=now)
+            .order_by("send_after")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        OutboxEmail.objects.filter(id__in=ids).update(
+            status="sending",
+            attempts=F("attempts") + 1,
+            send_after=now + datetime.timedelta(seconds=settings.EMAIL_OUTBOX_LOCK_TIMEOUT),
+        )
+    return list(OutboxEmail.objects.filter(id__in=ids))
+
+
+def retry_delay(attempts):
+    return settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def _mark_failed(email, error):
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = "failed"
+        logger.error(f"Giving up on email {email.id} after {email.attempts} attempts: {error}")
+    else:
+        email.status = "pending"
+        email.send_after = timezone.now() + datetime.timedelta(seconds=retry_delay(email.attempts))
+    email.save(update_fields=["status", "last_error", "send_after"])
+
+
+def deliver_outbox_emails(emails):
+    """
+    Envía ``emails`` por una sola conexión. Devuelve ``(enviados, fallidos)``;
+    los fallidos quedan programados para reintentarse.
+    """
+    if not emails:
+        return 0, 0
+
+    connection = get_connection(settings.EMAIL_DELIVERY_BACKEND, fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # Sin conexión no sale ninguno: todo el lote se reintenta
+        for email in emails:
+            _mark_failed(email, e)
+        return 0, len(emails)
+
+    sent, failed = [], []
+    try:
+        for email in emails:
+            try:
+                # La conexión ya está abierta: send_messages la reutiliza sin cerrarla
+                connection.send_messages([message_from_outbox_email(email, connection)])
+                sent.append(email.id)
+            except Exception as e:
+                _mark_failed(email, e)
+                failed.append(email.id)
+    finally:
+        connection.close()
+
+    OutboxEmail.objects.filter(id__in=sent).update(status="sent", sent_at=timezone.now(), last_error="")
+    return len(sent), len(failed)
+
+
+def schedule_outbox_flush(countdown=None):
+    """Programa ``send_outbox_emails``; los emails encolados mientras tanto van en la misma ejecución."""
+    from .tasks import send_outbox_emails
+
+    countdown = settings.EMAIL_OUTBOX_FLUSH_DELAY if countdown is None else countdown
+    # El TTL solo libera la clave si la tarea se pierde
+    if not cache.add(FLUSH_SCHEDULED_KEY, 1, timeout=max(countdown * 10, 60)):
+        return
+    try:
+        send_outbox_emails.apply_async(countdown=countdown)
+    except Exception as e:
+        cache.delete(FLUSH_SCHEDULED_KEY)
+        logger.error(f"Error scheduling outbox flush: {str(e)}")
@@ -0,0 +1,46 @@
+from celery import shared_task
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .outbox import (
+    FLUSH_SCHEDULED_KEY,
+    claim_outbox_emails,
+    deliver_outbox_emails,
+    retry_delay,
+    schedule_outbox_flush,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def send_outbox_emails():
+    """
+    Envía los emails pendientes en lotes de ``EMAIL_OUTBOX_BATCH_SIZE``, cada
+    lote por una sola conexión con el servidor de correo.
+    """
+    # Los emails a partir de aquí programan la siguiente ejecución
+    cache.delete(FLUSH_SCHEDULED_KEY)
+
+    batch_size = settings.EMAIL_OUTBOX_BATCH_SIZE
+    total_sent = total_failed = 0
+    for _ in range(settings.EMAIL_OUTBOX_MAX_BATCHES):
+        emails = claim_outbox_emails(batch_size)
+        sent, failed = deliver_outbox_emails(emails)
+        total_sent += sent
+        total_failed += failed
+        if len(emails) < batch_size:
+            break
+    else:
+        # Quedan emails: seguir en otra ejecución en lugar de ocupar el worker
+        schedule_outbox_flush(countdown=0)
+
+    if total_failed:
+        # Primer reintento; los siguientes los recoge beat
+        schedule_outbox_flush(countdown=retry_delay(1))
+        logger.warning(f"Failed to send {total_failed} emails")
+    if total_sent:
+        logger.info(f"Sent {total_sent} emails")
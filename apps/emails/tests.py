@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
+from django.core.mail.backends.locmem import EmailBackend as LocMemEmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import OutboxEmail
+from .tasks import send_outbox_emails
+
+
+### EMAIL OUTBOX TESTS
+
+@override_settings(
+    EMAIL_BACKEND="apps.emails.backends.OutboxEmailBackend",
+    EMAIL_DELIVERY_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+)
+class EmailOutboxTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def enqueue(self, count=1):
+        with patch("apps.emails.tasks.send_outbox_emails.apply_async") as mock_schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(count):
+                    message = EmailMultiAlternatives(f"Subject {i}", "Body", "noreply@example.com", [f"user{i}@example.com"])
+                    message.attach_alternative("<p>Body</p>", "text/html")
+                    message.send()
+        return mock_schedule
+
+    def test_sending_only_enqueues(self):
+        mock_schedule = self.enqueue(3)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.filter(status="pending").count(), 3)
+        # Una sola ejecución para los emails encolados juntos
+        mock_schedule.assert_called_once()
+
+    def test_worker_sends_a_batch_over_one_connection(self):
+        self.enqueue(3)
+        with patch("apps.emails.outbox.get_connection", wraps=get_connection) as mock_connection:
+            send_outbox_emails()
+        mock_connection.assert_called_once()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives, [("<p>Body</p>", "text/html")])
+        self.assertEqual(OutboxEmail.objects.filter(status="sent", sent_at__isnull=False).count(), 3)
+
+    @patch("apps.emails.tasks.schedule_outbox_flush")
+    def test_failed_emails_are_retried_with_backoff(self, mock_schedule):
+        self.enqueue()
+        with patch.object(LocMemEmailBackend, "send_messages", side_effect=OSError("SMTP down")):
+            send_outbox_emails()
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.status, email.attempts, email.last_error), ("pending", 1, "SMTP down"))
+        self.assertGreater(email.send_after, timezone.now())
+        mock_schedule.assert_called_once()
+
+        # Aún no toca reintentar
+        send_outbox_emails()
+        self.assertEqual(OutboxEmail.objects.get().attempts, 1)
+
+        OutboxEmail.objects.update(send_after=timezone.now())
+        with patch.object(LocMemEmailBackend, "send_messages", side_effect=OSError("SMTP down")):
+            send_outbox_emails()
+        self.assertEqual(OutboxEmail.objects.get().status, "failed")
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_send_mail_goes_through_the_outbox(self):
+        with patch("apps.emails.tasks.send_outbox_emails.apply_async"):
+            send_mail("Your OTP Code", "Your OTP code is 123456", "noreply@example.com", ["otp@example.com"])
+        self.assertEqual(OutboxEmail.objects.get().to, ["otp@example.com"])
@@ -1,11 +1,10 @@
 import datetime
 
 from rest_framework import serializers
-from botocore.signers import CloudFrontSigner
 from django.conf import settings
 from django.utils import timezone
 
-from utils.s3_utils import rsa_signer
+from utils.s3_utils import cloudfront_signed_url
 from .models import Media
 
 
@@ -19,11 +18,11 @@ class MediaSerializer(serializers.ModelSerializer):
     def get_url(self, obj):
         if not obj.key:
             return None
-        
-        key_id = str(settings.AWS_CLOUDFRONT_KEY_ID)
-        obj_url = f"https://{settings.AWS_CLOUDFRONT_DOMAIN}/{obj.key}"
-
-        cloudfront_signer = CloudFrontSigner(key_id, rsa_signer)
-        expire_date = timezone.now() + datetime.timedelta(seconds=60)
-        signed_url = cloudfront_signer.generate_presigned_url(obj_url, date_less_than=expire_date)
-        return signed_url
\ No newline at end of file
+
+        # URLs firmadas en lote por quien serializa (p. ej. ProfilePictureLoader)
+        signed_urls = self.context.get("signed_urls")
+        if signed_urls and obj.key in signed_urls:
+            return signed_urls[obj.key]
+
+        expire_date = timezone.now() + datetime.timedelta(seconds=settings.AWS_CLOUDFRONT_SIGNED_URL_EXPIRE)
+        return cloudfront_signed_url(obj.key, expire_date)
@@ -3,6 +3,7 @@ from rest_framework import status
 from rest_framework.exceptions import APIException
 
 from core.permissions import HasValidAPIKey
+from core.ratelimit import RateLimit
 from .models import NewsletterUser
 
 class DuplicateEmailException(APIException):
@@ -13,6 +14,7 @@ class DuplicateEmailException(APIException):
 
 class NewsletterSignupView(StandardAPIView):
     permission_classes = (HasValidAPIKey,)
+    rate_limits = {"POST": RateLimit("5/h", burst=3, key="ip")}
 
     def post(self, request):
         email = request.data.get("email")
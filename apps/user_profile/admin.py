@@ -1,11 +1,14 @@
 from django.contrib import admin
 
+from core.admin import ScalableModelAdmin, media_preview
+
 from .models import UserProfile
 
 
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
-    list_display = ('user', 'profile_picture_preview', 'birthday', 'website')
+class UserProfileAdmin(ScalableModelAdmin):
+    list_display = ('user', media_preview('profile_picture', 'Profile Picture Preview', width=50, empty='No Profile Picture'), 'birthday', 'website')
+    list_select_related = ('user', 'profile_picture')
     search_fields = ('user__username', 'user__email', 'biography', 'website')
     list_filter = ('birthday',)
     readonly_fields = ('profile_picture_preview', 'banner_picture_preview')
@@ -0,0 +1,70 @@
+"""
+Carga por lotes de las fotos de perfil que se serializan en una respuesta.
+
+Un listado de posts serializa el autor de cada post; sin loader cada uno
+costaba una consulta a ``UserProfile``, otra a ``Media`` y una firma RSA,
+aunque la mayoría de posts compartan pocos autores. ``ProfilePictureLoader``
+junta los usuarios pendientes, trae sus perfiles con la media en una sola
+consulta y firma las URLs de todos con ``cached_signed_urls``. Cada autor se
+carga y se firma una vez por petición.
+"""
+from django.db import models
+from rest_framework import serializers
+
+from apps.media.serializers import MediaSerializer
+from utils.s3_utils import cached_signed_urls
+from .models import UserProfile
+
+
+class ProfilePictureLoader:
+    def __init__(self):
+        self._pictures = {}
+        self._pending = set()
+
+    def prime(self, user_ids):
+        """Anota usuarios que se van a serializar; se cargan con el siguiente ``load``."""
+        self._pending.update(user_id for user_id in user_ids if user_id is not None and user_id not in self._pictures)
+
+    def load(self, user_id):
+        """Foto de perfil serializada (``MediaSerializer``) del usuario, o ``None``."""
+        if user_id not in self._pictures:
+            self._pending.add(user_id)
+            self._fetch()
+        return self._pictures[user_id]
+
+    def _fetch(self):
+        user_ids, self._pending = self._pending, set()
+        profiles = UserProfile.objects.filter(
+            user_id__in=user_ids, profile_picture__isnull=False
+        ).select_related("profile_picture")
+        medias = {profile.user_id: profile.profile_picture for profile in profiles}
+        urls = cached_signed_urls(media.key for media in medias.values())
+        context = {"signed_urls": urls}
+        for user_id in user_ids:
+            media = medias.get(user_id)
+            self._pictures[user_id] = MediaSerializer(media, context=context).data if media else None
+
+
+def profile_picture_loader(serializer):
+    """
+    Loader de la petición del contexto del serializador, o del serializador
+    raíz si no hay petición (un loader por ``.data``).
+    """
+    request = serializer.context.get("request")
+    owner = getattr(request, "_request", request) if request is not None else serializer.root
+    loader = getattr(owner, "_profile_picture_loader", None)
+    if loader is None:
+        loader = owner._profile_picture_loader = ProfilePictureLoader()
+    return loader
+
+
+class PrimeAuthorsListSerializer(serializers.ListSerializer):
+    """
+    ``ListSerializer`` para modelos con ``user``: anota al loader los autores
+    de todas las filas antes de serializarlas, así se cargan en un lote.
+    """
+
+    def to_representation(self, data):
+        rows = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        profile_picture_loader(self).prime(row.user_id for row in rows)
+        return super().to_representation(rows)
@@ -8,7 +8,7 @@ from django.utils.html import format_html
 from ckeditor.fields import RichTextField
 from djoser.signals import user_registered, user_activated
 from apps.media.models import Media
-from apps.media.serializers import MediaSerializer
+from utils.s3_utils import cached_signed_urls
 
 User = settings.AUTH_USER_MODEL
 
@@ -49,16 +49,14 @@ class UserProfile(models.Model):
 
     def profile_picture_preview(self):
         if self.profile_picture:
-            serializer = MediaSerializer(instance=self.profile_picture)
-            url = serializer.data.get('url')
+            url = cached_signed_urls([self.profile_picture.key]).get(self.profile_picture.key)
             if url:
                 return format_html('<img src="{}" style="width: 50px; height: auto;" />', url)
         return 'No Profile Picture'
 
     def banner_picture_preview(self):
         if self.banner_picture:
-            serializer = MediaSerializer(instance=self.banner_picture)
-            url = serializer.data.get('url')
+            url = cached_signed_urls([self.banner_picture.key]).get(self.banner_picture.key)
             if url:
                 return format_html('<img src="{}" style="width: 50px; height: auto;" />', url)
         return 'No Banner Picture'
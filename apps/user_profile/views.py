@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 
 from rest_framework import permissions, status
 from rest_framework_api.views import StandardAPIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from apps.authentication.authentication import CachedJWTAuthentication
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.conf import settings
@@ -22,7 +22,7 @@ User = get_user_model()
 
 class MyUserProfileView(StandardAPIView):
     permission_classes = [HasValidAPIKey, permissions.IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def get(self, request):
         user = request.user
@@ -58,7 +58,7 @@ class DetailUserProfileView(StandardAPIView):
 
 class GetMyProfilePictureView(StandardAPIView):
     permission_classes = [HasValidAPIKey, permissions.IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def get(self, request):
         user = request.user
@@ -85,7 +85,7 @@ class GetMyProfilePictureView(StandardAPIView):
 
 class GetMyBannerPictureView(StandardAPIView):
     permission_classes = [HasValidAPIKey, permissions.IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def get(self, request):
         user = request.user
@@ -112,7 +112,7 @@ class GetMyBannerPictureView(StandardAPIView):
 
 class UploadProfilePictureView(StandardAPIView):
     permission_classes = [HasValidAPIKey, permissions.IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def post(self, request):
         user = request.user
@@ -139,7 +139,7 @@ class UploadProfilePictureView(StandardAPIView):
 
 class UploadBannerPictureView(StandardAPIView):
     permission_classes = [HasValidAPIKey, permissions.IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def post(self, request):
         user = request.user
@@ -166,7 +166,7 @@ class UploadBannerPictureView(StandardAPIView):
 
 class GetMyProfilePicture(StandardAPIView):
     permission_classes = [HasValidAPIKey, permissions.IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def get(self, request):
         user = request.user
@@ -175,7 +175,7 @@ class GetMyProfilePicture(StandardAPIView):
 
 class UpdateUserProfileView(StandardAPIView):
     permission_classes = [HasValidAPIKey, permissions.IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def put(self, request):
         user = request.user
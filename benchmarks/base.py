@@ -0,0 +1,34 @@
+import os
+import statistics
+import time
+
+
+def setup_django():
+    """Configure Django for benchmarks that touch models, settings or the ORM."""
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    django.setup()
+
+
+def bench(name, func, number=1000, repeat=5):
+    """
+    Run ``func`` ``number`` times per round and print the best and median
+    time per call. Returns the best time per call in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+
+    best = min(timings)
+    median = statistics.median(timings)
+    print(f"{name:<50} best {best * 1e6:10.1f} us   median {median * 1e6:10.1f} us")
+    return best
+
+
+def compare(baseline, candidate):
+    """Print how many times faster ``candidate`` is than ``baseline``."""
+    print(f"{'':<50} speedup x{baseline / candidate:.2f}\n")
@@ -0,0 +1,57 @@
+"""
+Impression counters: one INCR per post (previous views) versus a single
+pipelined round trip with ``incr_many``, and the sync task's read/delete.
+
+Runs against the Redis configured by REDIS_URL, or without a server using
+fakeredis (``pip install -r requirements-test.txt``):
+
+    REDIS_BACKEND=fake python -m benchmarks.bench_counters
+
+fakeredis has no network, so it only measures client overhead; the
+round-trip savings show up against a real server.
+"""
+from benchmarks.base import bench, compare, setup_django
+
+setup_django()
+
+from core.redis_client import drain_counters, get_redis, incr_many  # noqa: E402
+
+PAGE_KEYS = [f"bench:impressions:{i}" for i in range(20)]  # una página del listado
+
+
+def per_key_incr():
+    client = get_redis()
+    for key in PAGE_KEYS:
+        client.incr(key)
+
+
+def legacy_sync():
+    client = get_redis()
+    for key in client.keys("bench:impressions:*"):
+        int(client.get(key))
+        client.delete(key)
+
+
+def fill():
+    incr_many(PAGE_KEYS)
+
+
+def main():
+    client = get_redis()
+    print(f"backend: {type(client).__name__}\n")
+
+    compare(
+        bench("INCR per post (20 posts)", per_key_incr, number=500),
+        bench("incr_many pipeline (20 posts)", lambda: incr_many(PAGE_KEYS), number=500),
+    )
+    compare(
+        bench("KEYS + GET + DELETE per key", lambda: (fill(), legacy_sync()), number=200),
+        bench("SCAN + drain_counters (MULTI)", lambda: (
+            fill(), drain_counters(client.scan_iter(match="bench:impressions:*", count=1000))
+        ), number=200),
+    )
+    client.delete(*PAGE_KEYS)
+
+
+if __name__ == "__main__":
+    main()
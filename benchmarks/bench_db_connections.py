@@ -0,0 +1,62 @@
+"""
+Per-request database connection overhead: a new Postgres connection for
+every request (``CONN_MAX_AGE = 0``, the previous setting) versus a
+persistent connection with health checks (the web and worker processes).
+
+Each iteration runs Django's request cycle around a single query:
+``request_started`` (close_old_connections), ``SELECT 1`` and
+``request_finished``. Needs the Postgres configured in settings.
+
+The asgi process opens one connection per request against PgBouncer. Pass
+PgBouncer's address to also time that setup against direct connections:
+
+    python -m benchmarks.bench_db_connections
+    python -m benchmarks.bench_db_connections blog_w_authentication_pgbouncer:5432
+"""
+import sys
+
+from benchmarks.base import bench, compare, setup_django
+
+setup_django()
+
+from django.core.signals import request_finished, request_started  # noqa: E402
+from django.db import connection  # noqa: E402
+
+
+def request_cycle():
+    request_started.send(sender=None)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    request_finished.send(sender=None)
+
+
+# Postgres from settings, without PgBouncer
+DIRECT = (connection.settings_dict["HOST"], connection.settings_dict["PORT"])
+
+
+def with_conn_max_age(max_age, health_checks, host=None, port=None):
+    connection.close()
+    connection.settings_dict["CONN_MAX_AGE"] = max_age
+    connection.settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+    connection.settings_dict["HOST"] = host or DIRECT[0]
+    connection.settings_dict["PORT"] = port or DIRECT[1]
+    return request_cycle
+
+
+def main():
+    print(f"database: {connection.vendor} {connection.settings_dict['HOST']}:{connection.settings_dict['PORT']}\n")
+
+    direct = bench("new connection per request (CONN_MAX_AGE=0)", with_conn_max_age(0, False), number=100)
+    compare(direct, bench("persistent + health checks (CONN_MAX_AGE=60)", with_conn_max_age(60, True), number=100))
+
+    if len(sys.argv) > 1:
+        host, _, port = sys.argv[1].partition(":")
+        compare(
+            direct,
+            bench("new connection per request via PgBouncer (asgi)", with_conn_max_age(0, False, host, port or 5432), number=100),
+        )
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
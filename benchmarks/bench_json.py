@@ -0,0 +1,104 @@
+"""
+JSON rendering of a post list response: DRF's JSONRenderer (stdlib json
+with DRF's encoder) versus core.renderers.ORJSONRenderer.
+
+Uses PostListSerializer output for the published posts in the database
+when there are any, otherwise a synthetic page with the same shape.
+
+    python -m benchmarks.bench_json
+"""
+import io
+import uuid
+
+from benchmarks.base import bench, compare, setup_django
+
+setup_django()
+
+from django.db import DatabaseError  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework_api.serializers import APIResponseSerializer  # noqa: E402
+
+from apps.blog.models import Post  # noqa: E402
+from apps.blog.serializers import PostListSerializer  # noqa: E402
+from core.parsers import ORJSONParser  # noqa: E402
+from core.renderers import ORJSONRenderer  # noqa: E402
+
+
+def synthetic_posts(count):
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Post number {i} about Django performance",
+            "description": "A walk through select_related, prefetch_related and caching " * 2,
+            "thumbnail": {
+                "id": str(uuid.uuid4()),
+                "order": 0,
+                "name": "thumbnail.jpg",
+                "size": "120 KB",
+                "type": "image/jpeg",
+                "key": f"media/thumbnails/{i}.jpg",
+                "media_type": "image",
+                "url": f"https://cdn.example.com/media/thumbnails/{i}.jpg?Expires=1700000000&Signature=" + "a" * 300,
+            },
+            "slug": f"post-number-{i}",
+            "category": {"name": "Backend", "slug": "backend", "thumbnail": None},
+            "view_count": i * 17,
+            "updated_at": "2024-11-05T10:15:30.123456Z",
+            "created_at": "2024-11-01T08:00:00.000000Z",
+            "user": {
+                "username": f"author{i % 10}",
+                "first_name": "Ana",
+                "last_name": "Pérez",
+                "updated_at": "2024-10-01T08:00:00.000000Z",
+                "role": "editor",
+                "verified": True,
+                "profile_picture": None,
+            },
+            "featured": i % 7 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+def load_posts(count):
+    try:
+        posts = list(Post.postobjects.select_related("category", "thumbnail", "post_analytics")[:count])
+    except DatabaseError:
+        posts = []
+    if not posts:
+        print("No posts in the database, using a synthetic page.\n")
+        return synthetic_posts(count)
+    return PostListSerializer(posts, many=True).data
+
+
+def envelope(results):
+    # Misma envoltura que StandardAPIView.paginate
+    return APIResponseSerializer({
+        "success": True,
+        "status": 200,
+        "results": results,
+        "count": len(results),
+        "next": "https://api.example.com/api/blog/posts/?p=2",
+        "previous": None,
+    }).data
+
+
+def main():
+    stdlib, fast = JSONRenderer(), ORJSONRenderer()
+    for count in (20, 200):
+        data = envelope(load_posts(count))
+        compare(
+            bench(f"JSONRenderer ({count} posts)", lambda: stdlib.render(data), number=200),
+            bench(f"ORJSONRenderer ({count} posts)", lambda: fast.render(data), number=200),
+        )
+
+    body = fast.render(envelope(load_posts(20)))
+    compare(
+        bench("JSONParser (20 posts)", lambda: JSONParser().parse(io.BytesIO(body)), number=500),
+        bench("ORJSONParser (20 posts)", lambda: ORJSONParser().parse(io.BytesIO(body)), number=500),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Micro-benchmarks for utils.string_utils.
+
+Compares the previous implementation (``bleach.clean`` with fresh arguments
+and ``re.compile`` on every call) against the cached Cleaner / compiled
+pattern version, on realistic post payloads.
+
+    python -m benchmarks.bench_sanitize
+"""
+import re
+
+import bleach
+
+from benchmarks.base import bench, compare
+from utils.string_utils import (
+    ALLOWED_ATTRIBUTES,
+    ALLOWED_SCHEMES,
+    ALLOWED_TAGS,
+    sanitize_fields,
+    sanitize_html,
+    sanitize_string,
+)
+
+
+def legacy_sanitize_string(string):
+    if string is None:
+        return ""
+    cleaned_string = bleach.clean(string, tags=[], strip=True)
+    pattern = re.compile(r"[^a-zA-Z0-9\s',:.?-ÁÉÍÓÚáéíóúÑñüÜ]")
+    return pattern.sub("", cleaned_string)
+
+
+def legacy_sanitize_html(content):
+    if content is None:
+        return ""
+    return bleach.clean(
+        content,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_SCHEMES,
+        strip=True
+    )
+
+
+PARAGRAPH = (
+    "<p>Django's ORM makes it easy to write <strong>readable</strong> queries, "
+    "but every <em>lazy</em> relation can turn into an extra round trip. "
+    'See <a href="https://docs.djangoproject.com/en/4.2/topics/db/optimization/" '
+    'title="Database access optimization">the optimization guide</a> for details.</p>'
+)
+SECTION = (
+    "<h2>Section title</h2>"
+    + PARAGRAPH * 3
+    + "<ul><li>select_related</li><li>prefetch_related</li><li>only / defer</li></ul>"
+    + "<blockquote>Measure before optimizing.</blockquote>"
+    + "<pre>Post.objects.select_related('category')</pre>"
+)
+
+
+def build_post_body(sections):
+    return "<h1>Post title</h1>" + SECTION * sections
+
+
+SHORT_BODY = build_post_body(1)  # ~1.5 KB
+LONG_BODY = build_post_body(12)  # ~18 KB
+HOSTILE_BODY = LONG_BODY + '<script>alert(1)</script><img src=x onerror="alert(1)"><iframe></iframe>'
+
+POST_DATA = {
+    "title": "How we cut query counts on the post list",
+    "description": "A walk through select_related, prefetch_related and caching",
+    "content": LONG_BODY,
+    "status": "published",
+    "keywords": "django, orm, performance, caching",
+}
+POST_FIELDS = {
+    "title": "string",
+    "description": "string",
+    "content": "html",
+    "status": "string",
+    "keywords": "string",
+}
+
+
+def legacy_post_update():
+    return {
+        "title": legacy_sanitize_string(POST_DATA["title"]),
+        "description": legacy_sanitize_string(POST_DATA["description"]),
+        "content": legacy_sanitize_html(POST_DATA["content"]),
+        "status": legacy_sanitize_string(POST_DATA["status"]),
+        "keywords": legacy_sanitize_string(POST_DATA["keywords"]),
+    }
+
+
+def main():
+    title = POST_DATA["title"]
+
+    compare(
+        bench("legacy sanitize_string (ascii title)", lambda: legacy_sanitize_string(title), number=5000),
+        bench("sanitize_string (ascii title)", lambda: sanitize_string(title), number=5000),
+    )
+    compare(
+        bench("legacy sanitize_html (1.5 KB body)", lambda: legacy_sanitize_html(SHORT_BODY), number=200),
+        bench("sanitize_html (1.5 KB body)", lambda: sanitize_html(SHORT_BODY), number=200),
+    )
+    compare(
+        bench("legacy sanitize_html (18 KB body)", lambda: legacy_sanitize_html(LONG_BODY), number=50),
+        bench("sanitize_html (18 KB body)", lambda: sanitize_html(LONG_BODY), number=50),
+    )
+    compare(
+        bench("legacy sanitize_html (18 KB hostile body)", lambda: legacy_sanitize_html(HOSTILE_BODY), number=50),
+        bench("sanitize_html (18 KB hostile body)", lambda: sanitize_html(HOSTILE_BODY), number=50),
+    )
+    compare(
+        bench("legacy post update (5 fields)", legacy_post_update, number=50),
+        bench("sanitize_fields post update (5 fields)", lambda: sanitize_fields(POST_DATA, POST_FIELDS), number=50),
+    )
+
+
+if __name__ == "__main__":
+    main()
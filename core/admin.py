@@ -0,0 +1,186 @@
+"""
+Changelists del admin para tablas con millones de filas.
+
+- ``ScalableModelAdmin``: sin el ``COUNT(*)`` del total y con un paginador
+  que usa la estimación de PostgreSQL en lugar del conteo exacto.
+- ``CursorPaginatedModelAdmin``: tablas de eventos paginadas por cursor
+  (``timestamp``, ``pk``) en lugar de ``OFFSET``, que en las últimas páginas
+  recorre todas las filas anteriores.
+- ``media_preview``: miniaturas de media con las URLs firmadas de toda la
+  página pedidas en lote al cache (``cached_signed_urls``).
+"""
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+
+from utils.s3_utils import cached_signed_urls
+
+CURSOR_VAR = "cursor"
+
+
+def estimated_count(queryset):
+    """
+    Filas estimadas por el planner de PostgreSQL: ``reltuples`` de ``pg_class``
+    sin filtros, o las filas del plan de ``EXPLAIN`` con filtros. ``None`` en
+    otras bases de datos o si la tabla nunca se analizó.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            # -1: la tabla aún no tiene estadísticas
+            return row[0] if row and row[0] >= 0 else None
+
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Cuenta exacta solo en tablas pequeñas: por encima de
+    ``ADMIN_EXACT_COUNT_THRESHOLD`` filas estimadas usa la estimación.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < settings.ADMIN_EXACT_COUNT_THRESHOLD:
+            return super().count
+        return estimate
+
+
+class PreparedChangeList(ChangeList):
+    """Deja que el ModelAdmin cargue en lote lo que necesita la página (``prepare_results``)."""
+
+    def get_results(self, request):
+        super().get_results(request)
+        # Evalúa el queryset de la página; la plantilla reutiliza las mismas filas
+        self.model_admin.prepare_results(self.result_list)
+
+
+class CursorChangeList(ChangeList):
+    """
+    Página siguiente por cursor (``cursor_field`` y ``pk`` de la última fila)
+    con el orden fijo ``-cursor_field, -pk``. No cuenta filas ni admite
+    ordenar por columna.
+    """
+
+    def get_queryset(self, request):
+        # Fuera de self.params: ni es un filtro ni debe seguir en los enlaces de filtros
+        self.cursor = self.params.pop(CURSOR_VAR, None)
+        return super().get_queryset(request)
+
+    def get_ordering(self, request, queryset):
+        return [f"-{self.model_admin.cursor_field}", "-pk"]
+
+    def get_results(self, request):
+        field = self.model_admin.cursor_field
+        queryset = self.queryset
+        if self.cursor:
+            value, _, pk = self.cursor.rpartition("_")
+            value = parse_datetime(value)
+            if value is None:
+                raise IncorrectLookupParameters
+            try:
+                # (field, pk) < (value, pk): el <= sobre el campo solo es el límite del índice
+                queryset = queryset.filter(
+                    Q(**{f"{field}__lte": value}),
+                    Q(**{f"{field}__lt": value}) | Q(pk__lt=pk),
+                )
+            except ValidationError:
+                raise IncorrectLookupParameters
+
+        # Una fila de más indica si hay página siguiente
+        rows = list(queryset[: self.list_per_page + 1])
+        self.result_list = rows[: self.list_per_page]
+        self.next_cursor = None
+        if len(rows) > self.list_per_page:
+            last = self.result_list[-1]
+            self.next_cursor = f"{getattr(last, field).isoformat()}_{last.pk}"
+        self.model_admin.prepare_results(self.result_list)
+
+        self.result_count = len(self.result_list)
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or self.next_cursor)
+        self.paginator = None
+
+    @property
+    def next_page_url(self):
+        if self.next_cursor is None:
+            return None
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+    @property
+    def first_page_url(self):
+        return self.get_query_string()
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def get_changelist(self, request, **kwargs):
+        return PreparedChangeList
+
+    def prepare_results(self, objs):
+        """Carga en lote las URLs firmadas de las columnas ``media_preview`` de la página."""
+        previews = [column for column in self.list_display if getattr(column, "media_field", None)]
+        if not previews or not objs:
+            return
+        medias = [getattr(obj, column.media_field) for obj in objs for column in previews]
+        urls = cached_signed_urls(media.key for media in medias if media is not None)
+        for obj in objs:
+            obj._signed_urls = urls
+
+
+class CursorPaginatedModelAdmin(ScalableModelAdmin):
+    cursor_field = "timestamp"
+    change_list_template = "admin/cursor_change_list.html"
+    sortable_by = ()
+
+    def get_changelist(self, request, **kwargs):
+        return CursorChangeList
+
+
+def media_preview(field, description, width=100, empty="No Image"):
+    """
+    Columna de ``list_display`` con la miniatura del ``Media`` en ``field``.
+    Incluir ``field`` en ``list_select_related`` para no consultar por fila.
+    """
+
+    def preview(obj):
+        media = getattr(obj, field)
+        if media is None or not media.key:
+            return empty
+        urls = getattr(obj, "_signed_urls", None)
+        if urls is None or media.key not in urls:
+            urls = cached_signed_urls([media.key])
+        return format_html('<img src="{}" style="width: {}px; height: auto;" />', urls[media.key], width)
+
+    preview.short_description = description
+    preview.media_field = field
+    return preview
@@ -6,10 +6,18 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 django_asgi_app = get_asgi_application()
 
-from channels.routing import  ProtocolTypeRouter
+from django.conf import settings
+from channels.routing import  ProtocolTypeRouter, URLRouter
+from channels.security.websocket import OriginValidator
+
+from apps.blog.routing import websocket_urlpatterns as blog_websocket_urlpatterns
 
 application = ProtocolTypeRouter(
     {
-        "http": django_asgi_app
+        "http": django_asgi_app,
+        "websocket": OriginValidator(
+            URLRouter(blog_websocket_urlpatterns),
+            settings.CHANNELS_ALLOWED_ORIGINS.split(","),
+        ),
     }
 )
@@ -0,0 +1,460 @@
+import fnmatch
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches, DEFAULT_CACHE_ALIAS
+from django.db import connections
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from core.db_router import use_replicas
+from core.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LocalLRUCache:
+    """
+    Cache en memoria del proceso, acotado por numero de entradas y con TTL.
+    Thread-safe; se usa como primer nivel delante de Redis.
+    """
+
+    def __init__(self, max_entries=1024, timeout=30):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def delete_pattern(self, pattern):
+        with self._lock:
+            for key in [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TwoTierCache:
+    """
+    Cache de dos niveles: LRU local por proceso delante del cache de Django (Redis).
+
+    Las escrituras e invalidaciones se aplican en Redis y se publican en un canal
+    pub/sub para que los demás workers eliminen su copia local.
+    """
+
+    def __init__(self, backend=None, max_entries=None, local_timeout=None, channel=None):
+        self.backend = backend or cache
+        self.local = LocalLRUCache(
+            max_entries=max_entries or getattr(settings, "LOCAL_CACHE_MAX_ENTRIES", 1024),
+            timeout=local_timeout or getattr(settings, "LOCAL_CACHE_TIMEOUT", 30),
+        )
+        self.channel = channel or getattr(settings, "LOCAL_CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+        self._stats = {"local_hits": 0, "local_misses": 0, "redis_hits": 0, "redis_misses": 0}
+        self._lock = threading.Lock()
+        self._origin = None
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+
+    # Lectura / escritura
+
+    def get(self, key, default=None):
+        self._ensure_listener()
+
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count("local_hits")
+            return value
+        self._count("local_misses")
+
+        value = self.backend.get(key, _MISSING)
+        if value is _MISSING:
+            self._count("redis_misses")
+            return default
+        self._count("redis_hits")
+
+        self.local.set(key, value)
+        return value
+
+    async def aget(self, key, default=None):
+        self._ensure_listener()
+
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count("local_hits")
+            return value
+        self._count("local_misses")
+
+        value = await acache_get(key, _MISSING, store=self.backend)
+        if value is _MISSING:
+            self._count("redis_misses")
+            return default
+        self._count("redis_hits")
+
+        self.local.set(key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, local_timeout=None):
+        self._ensure_listener()
+        self.backend.set(key, value, timeout=timeout)
+        if local_timeout is None and isinstance(timeout, (int, float)):
+            local_timeout = timeout
+        self.local.set(key, value, timeout=local_timeout)
+        # Los demás workers descartan su copia anterior
+        self._publish({"keys": [key]})
+
+    # Invalidacion
+
+    def delete(self, *keys):
+        self.backend.delete_many(keys)
+        self.local.delete(*keys)
+        self._publish({"keys": list(keys)})
+
+    def delete_pattern(self, pattern):
+        if hasattr(self.backend, "delete_pattern"):
+            self.backend.delete_pattern(pattern)
+        else:
+            # Backends sin delete_pattern (LocMemCache en pruebas)
+            self.backend.clear()
+        self.local.delete_pattern(pattern)
+        self._publish({"pattern": pattern})
+
+    def clear_local(self):
+        self.local.clear()
+
+    # Estadisticas
+
+    def stats(self):
+        """Hit rate por nivel para este proceso."""
+        with self._lock:
+            stats = dict(self._stats)
+        local_total = stats["local_hits"] + stats["local_misses"]
+        redis_total = stats["redis_hits"] + stats["redis_misses"]
+        return {
+            "local": {
+                "hits": stats["local_hits"],
+                "misses": stats["local_misses"],
+                "hit_rate": stats["local_hits"] / local_total if local_total else 0.0,
+                "size": len(self.local),
+            },
+            "redis": {
+                "hits": stats["redis_hits"],
+                "misses": stats["redis_misses"],
+                "hit_rate": stats["redis_hits"] / redis_total if redis_total else 0.0,
+            },
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+    def _count(self, stat):
+        # ``+=`` no es atómico entre hilos
+        with self._lock:
+            self._stats[stat] += 1
+
+    # Pub/sub
+
+    def _get_redis(self):
+        try:
+            from django_redis import get_redis_connection
+            return get_redis_connection("default")
+        except (ImportError, NotImplementedError):
+            # El cache configurado no es django_redis: no hay otros workers a los que avisar
+            return None
+
+    def _publish(self, message):
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            client.publish(self.channel, json.dumps({**message, "origin": self._origin}))
+        except Exception:
+            logger.exception("Error publishing cache invalidation")
+
+    def _handle_message(self, data):
+        message = json.loads(data)
+        if self._origin is not None and message.get("origin") == self._origin:
+            # Invalidación de este mismo proceso: la copia local ya está al día
+            return
+        if "keys" in message:
+            self.local.delete(*message["keys"])
+        if "pattern" in message:
+            self.local.delete_pattern(message["pattern"])
+
+    def _ensure_listener(self):
+        """Arranca el hilo suscriptor una vez por proceso (tambien despues de un fork)."""
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._listener_lock:
+            if self._listener_pid == pid:
+                return
+            # Despues de un fork la copia local heredada puede estar desactualizada
+            self.local.clear()
+            self._origin = uuid.uuid4().hex
+            self._listener_pid = pid
+            client = self._get_redis()
+            if client is None:
+                return
+            thread = threading.Thread(target=self._listen, args=(client,), name="cache-invalidation", daemon=True)
+            thread.start()
+
+    def _listen(self, client):
+        while True:
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    self._handle_message(message["data"])
+            except Exception:
+                # Mientras no estemos suscritos se pueden perder invalidaciones
+                logger.exception("Cache invalidation listener disconnected, retrying")
+                self.local.clear()
+                time.sleep(1)
+
+
+two_tier_cache = TwoTierCache()
+
+
+# Lecturas async
+
+async def acache_get(key, default=None, store=None):
+    """
+    Lee ``key`` sin ocupar un hilo. Con django_redis como cache por defecto se
+    lee directamente con ``redis.asyncio`` (misma clave y serialización); con
+    otros backends se usa su API async.
+    """
+    store = store or cache
+    if isinstance(store, TwoTierCache):
+        return await store.aget(key, default)
+
+    # ``cache`` es un proxy: el backend real permite saber si es django_redis
+    backend = caches[DEFAULT_CACHE_ALIAS] if store is cache else store
+    if backend is not caches[DEFAULT_CACHE_ALIAS] or not type(backend).__module__.startswith("django_redis"):
+        return await backend.aget(key, default)
+
+    location = settings.CACHES[DEFAULT_CACHE_ALIAS]["LOCATION"]
+    if isinstance(location, (list, tuple)):
+        location = location[0]
+    value = await get_async_redis(location).get(backend.client.make_key(key))
+    return default if value is None else backend.client.decode(value)
+
+
+# Namespaces con contador de generacion
+
+def get_generation(namespace, store=None):
+    """
+    Generacion actual de ``namespace``. Se incluye en las claves de cache para que
+    ``bump_generation`` invalide todas las claves del namespace con un solo INCR.
+    """
+    store = store or cache
+    key = f"gen:{namespace}"
+    generation = store.get(key)
+    if generation is None:
+        # Se arranca desde el timestamp: si el contador se pierde (evicción) no
+        # se reutilizan generaciones anteriores cuyas claves aun podrian existir
+        store.add(key, int(time.time()), timeout=None)
+        generation = store.get(key, 0)
+    return generation
+
+
+async def aget_generation(namespace, store=None):
+    generation = await acache_get(f"gen:{namespace}", store=store)
+    if generation is None:
+        generation = await sync_to_async(get_generation)(namespace, store)
+    return generation
+
+
+def bump_generation(namespace, store=None):
+    """Invalida todas las claves de ``namespace`` de forma atomica."""
+    store = store or cache
+    key = f"gen:{namespace}"
+    try:
+        return store.incr(key)
+    except ValueError:
+        # El contador aun no existe: nadie pudo cachear con la generacion nueva
+        get_generation(namespace, store)
+        return store.incr(key)
+
+
+# Relleno de cache con proteccion contra estampidas
+
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+
+class CacheEntry:
+    """Valor cacheado junto con su expiracion logica y el tiempo que costo construirlo."""
+
+    __slots__ = ("value", "expires_at", "delta")
+
+    def __init__(self, value, expires_at, delta):
+        self.value = value
+        self.expires_at = expires_at
+        self.delta = delta
+
+    def __getstate__(self):
+        return (self.value, self.expires_at, self.delta)
+
+    def __setstate__(self, state):
+        self.value, self.expires_at, self.delta = state
+
+    def should_refresh(self, beta=1.0, now=None):
+        """
+        Recalculo temprano probabilistico (XFetch): cuanto mas cara es la
+        reconstruccion y mas cerca esta la expiracion, mas probable es refrescar.
+        """
+        now = time.time() if now is None else now
+        return now - self.delta * beta * math.log(1.0 - random.random()) >= self.expires_at
+
+
+def _store_entry(store, key, builder, timeout, stale_timeout):
+    started = time.time()
+    # Siempre desde el primario: una réplica con retraso dejaría en el cache,
+    # durante todo el TTL, los datos de antes de la invalidación
+    with use_replicas(False):
+        value = builder()
+    entry = CacheEntry(value, time.time() + timeout, time.time() - started)
+    store.set(key, entry, timeout=timeout + stale_timeout)
+    return entry
+
+
+def _refresh_in_background(store, lock_store, key, lock_key, builder, timeout, stale_timeout):
+    try:
+        _store_entry(store, key, builder, timeout, stale_timeout)
+    except Exception:
+        logger.exception("Error refreshing cache key %s", key)
+    finally:
+        lock_store.delete(lock_key)
+        connections.close_all()
+
+
+def get_or_fill(key, builder, timeout=60 * 5, stale_timeout=60, store=None, beta=1.0,
+                lock_timeout=10, wait_timeout=0.5):
+    """
+    Devuelve el valor de ``key`` o lo construye con ``builder()`` protegiendo
+    contra estampidas:
+
+    - Solo un proceso reconstruye una clave a la vez (lock con ``add`` en Redis).
+    - Una entrada expirada se sigue sirviendo durante ``stale_timeout`` segundos
+      mientras el dueño del lock la refresca en segundo plano.
+    - Las entradas se refrescan antes de expirar de forma probabilistica.
+    - Sin valor que servir, los demas esperan hasta ``wait_timeout`` segundos
+      a que el dueño del lock termine antes de construirlo ellos mismos.
+    """
+    store = store or cache
+    # Los locks siempre van al cache compartido, nunca al nivel local
+    lock_store = getattr(store, "backend", store)
+    lock_key = f"lock:{key}"
+
+    entry = store.get(key)
+    if not isinstance(entry, CacheEntry):
+        # Valores guardados antes de usar get_or_fill se tratan como ausentes
+        entry = None
+    if entry is not None and not entry.should_refresh(beta):
+        return entry.value
+
+    if lock_store.add(lock_key, 1, timeout=lock_timeout):
+        if entry is not None and getattr(settings, "CACHE_BACKGROUND_REFRESH", True):
+            # Stale-while-revalidate: servir el valor actual y refrescar aparte
+            _refresh_executor.submit(
+                _refresh_in_background, store, lock_store, key, lock_key, builder, timeout, stale_timeout
+            )
+            return entry.value
+        try:
+            return _store_entry(store, key, builder, timeout, stale_timeout).value
+        finally:
+            lock_store.delete(lock_key)
+
+    if entry is not None:
+        # Otro proceso esta reconstruyendo la clave
+        return entry.value
+
+    deadline = time.monotonic() + wait_timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = store.get(key)
+        if isinstance(entry, CacheEntry):
+            return entry.value
+
+    return _store_entry(store, key, builder, timeout, stale_timeout).value
+
+
+async def aget_or_fill(key, builder, timeout=60 * 5, stale_timeout=60, store=None, beta=1.0, **kwargs):
+    """
+    Versión async de ``get_or_fill``. Una entrada fresca se sirve sin salir del
+    loop; reconstruirla (ORM, serializadores) es sync y pasa por ``get_or_fill``
+    en un hilo, con la misma protección contra estampidas.
+    """
+    entry = await acache_get(key, store=store)
+    if isinstance(entry, CacheEntry) and not entry.should_refresh(beta):
+        return entry.value
+    return await sync_to_async(get_or_fill)(
+        key, builder, timeout=timeout, stale_timeout=stale_timeout, store=store, beta=beta, **kwargs
+    )
+
+
+def warm(key, builder, timeout=60 * 5, stale_timeout=60, store=None, min_ttl=0, force=False, lock_timeout=10):
+    """
+    Precalcula ``key`` fuera del ciclo de una peticion, con el mismo formato que
+    ``get_or_fill``. No hace nada si la entrada sigue fresca al menos ``min_ttl``
+    segundos (salvo ``force``) o si otro proceso ya la esta reconstruyendo.
+    Devuelve True si se reconstruyo la entrada.
+    """
+    store = store or cache
+    lock_store = getattr(store, "backend", store)
+    lock_key = f"lock:{key}"
+
+    if not force:
+        # Leer del cache compartido, sin llenar el nivel local de este proceso
+        entry = lock_store.get(key)
+        if isinstance(entry, CacheEntry) and entry.expires_at - time.time() > min_ttl:
+            return False
+
+    if not lock_store.add(lock_key, 1, timeout=lock_timeout):
+        return False
+    try:
+        _store_entry(store, key, builder, timeout, stale_timeout)
+        return True
+    finally:
+        lock_store.delete(lock_key)
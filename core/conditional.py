@@ -0,0 +1,41 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Strong ETag built from a hash of ``parts``."""
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode("utf-8"), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def signed_url_window():
+    """
+    Ventana actual de las URLs firmadas de CloudFront. Se incluye en el ETag de
+    respuestas con media para que un 304 nunca reutilice URLs ya expiradas.
+    """
+    return int(time.time()) // settings.AWS_CLOUDFRONT_SIGNED_URL_EXPIRE
+
+
+def get_not_modified_response(request, etag, last_modified=None):
+    """
+    Evalua If-None-Match / If-Modified-Since antes de serializar.
+    Devuelve una respuesta 304 con los validadores, o None si hay que responder completo.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        return None
+    return set_validators(response, etag, last_modified)
+
+
+def set_validators(response, etag, last_modified=None):
+    """Agrega ETag, Last-Modified y Cache-Control: no-cache (revalidar siempre) a la respuesta."""
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(response, no_cache=True)
+    return response
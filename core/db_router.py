@@ -0,0 +1,43 @@
+import contextlib
+import contextvars
+import random
+
+from django.conf import settings
+
+# Solo dentro de use_replicas() las lecturas pueden ir a una réplica
+_read_from_replica = contextvars.ContextVar("read_from_replica", default=False)
+
+
+@contextlib.contextmanager
+def use_replicas(enabled=True):
+    """Envía las lecturas del bloque a las réplicas (si hay alguna configurada)."""
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Escrituras y migraciones al primario (``default``). Las lecturas van a una
+    réplica de ``DATABASE_REPLICAS`` solo dentro de ``use_replicas()``, que
+    activa ``ReplicaRoutingMiddleware`` para peticiones de solo lectura; fuera
+    de una petición (Celery, comandos, shell) todo va al primario.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        if replicas and _read_from_replica.get():
+            return random.choice(replicas)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplicas tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
@@ -0,0 +1,235 @@
+import hashlib
+import math
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from core.cache import acache_get
+from core.db_router import use_replicas
+from apps.authentication.api_keys import (
+    aconsume_api_key_quota,
+    alookup_api_key,
+    consume_api_key_quota,
+    lookup_api_key,
+)
+from core.permissions import has_valid_api_key
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """
+    WhiteNoise solo es sync: bajo ASGI Django pasaría por un hilo todos los
+    middlewares que tiene debajo (y la vista). Esta versión admite async y
+    solo servir un fichero estático pasa por ``sync_to_async``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class APIKeyMiddleware:
+    """
+    Resuelve la cabecera ``API-Key`` y gasta un token de la cuota de la clave
+    antes de que corran las sesiones, la autenticación, el ORM o DRF. Las
+    claves que superan su cuota reciben aquí mismo un 429 con ``Retry-After``.
+
+    El resultado queda en ``request.api_key`` (la entrada de la clave, o None
+    si no existe) para ``HasValidAPIKey`` y ``CachedResponseMiddleware``. Las
+    peticiones sin la cabecera no se tocan.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        raw_key = request.headers.get("API-Key")
+        if raw_key is not None:
+            request.api_key = lookup_api_key(raw_key)
+            if request.api_key is not None:
+                allowed, retry_after = consume_api_key_quota(request.api_key)
+                if not allowed:
+                    return self.throttled(retry_after)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        raw_key = request.headers.get("API-Key")
+        if raw_key is not None:
+            request.api_key = await alookup_api_key(raw_key)
+            if request.api_key is not None:
+                allowed, retry_after = await aconsume_api_key_quota(request.api_key)
+                if not allowed:
+                    return self.throttled(retry_after)
+        return await self.get_response(request)
+
+    def throttled(self, retry_after):
+        wait = max(1, math.ceil(retry_after))
+        # Mismo cuerpo que Throttled de DRF
+        response = JsonResponse(
+            {"detail": f"Request was throttled. Expected available in {wait} seconds."}, status=429
+        )
+        response["Retry-After"] = str(wait)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Envía las lecturas de las peticiones seguras (GET, HEAD) a las réplicas de
+    ``DATABASE_REPLICAS``; el resto lee del primario.
+
+    Tras una escritura correcta, las peticiones del mismo cliente (misma
+    cabecera Authorization o cookie de sesión) leen del primario durante
+    ``DATABASE_REPLICA_STICKY_SECONDS``: el usuario ve sus propios cambios
+    aunque la réplica vaya con retraso. Las lecturas anónimas no consultan
+    el cache.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    SAFE_METHODS = ("GET", "HEAD")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        key = self.sticky_key(request)
+        replicas = self.can_use_replicas(request) and (key is None or not cache.get(key))
+        with use_replicas(replicas):
+            response = self.get_response(request)
+        if self.wrote(request, response) and key is not None:
+            cache.set(key, 1, timeout=settings.DATABASE_REPLICA_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        key = self.sticky_key(request)
+        replicas = self.can_use_replicas(request) and (key is None or not await acache_get(key))
+        with use_replicas(replicas):
+            response = await self.get_response(request)
+        if self.wrote(request, response) and key is not None:
+            await cache.aset(key, 1, timeout=settings.DATABASE_REPLICA_STICKY_SECONDS)
+        return response
+
+    def can_use_replicas(self, request):
+        return request.method in self.SAFE_METHODS and bool(getattr(settings, "DATABASE_REPLICAS", []))
+
+    def wrote(self, request, response):
+        return request.method not in self.SAFE_METHODS + ("OPTIONS",) and response.status_code < 400
+
+    def sticky_key(self, request):
+        client = request.META.get("HTTP_AUTHORIZATION") or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if not client:
+            return None
+        return f"db:primary:{hashlib.blake2b(client.encode(), digest_size=16).hexdigest()}"
+
+
+class CachedResponseMiddleware:
+    """
+    Camino rápido para los GET públicos con más tráfico. Si la respuesta
+    renderizada ya está en cache, se devuelve antes de la sesión, la
+    autenticación y el dispatch de DRF (decodificar el JWT, buscar el usuario,
+    negociar el contenido, envolver la respuesta).
+
+    Las rutas se configuran en ``CACHED_RESPONSE_ROUTES`` como
+    ``{url_name: "ruta.al.handler"}``. Un handler recibe la petición y devuelve
+    una respuesta, o None para seguir hasta la vista. Bajo ASGI se espera en el
+    event loop el handler con prefijo ``a`` del mismo módulo (``apost_list``
+    para ``post_list``); si no existe, el handler corre en un hilo.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._routes = None
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    @property
+    def routes(self):
+        # Las URLs se resuelven en la primera petición, cuando el URLconf ya está cargado
+        if self._routes is None:
+            self._routes = {
+                reverse(name): self.load_handlers(handler)
+                for name, handler in getattr(settings, "CACHED_RESPONSE_ROUTES", {}).items()
+            }
+        return self._routes
+
+    @staticmethod
+    def load_handlers(path):
+        """``(handler, handler_async)`` de la ruta ``path``."""
+        handler = import_string(path)
+        module, name = path.rsplit(".", 1)
+        try:
+            async_handler = import_string(f"{module}.a{name}")
+        except ImportError:
+            async_handler = sync_to_async(handler)
+        return handler, async_handler
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.fast_path(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        handlers = self.get_handlers(request)
+        response = None
+        if handlers is not None:
+            response = await handlers[1](request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+    def fast_path(self, request):
+        handlers = self.get_handlers(request)
+        return handlers[0](request) if handlers is not None else None
+
+    def get_handlers(self, request):
+        if request.method != "GET":
+            return None
+        handlers = self.routes.get(request.path_info)
+        if handlers is None:
+            return None
+        # Las respuestas autenticadas y la API navegable siguen por DRF
+        if "HTTP_AUTHORIZATION" in request.META or "text/html" in request.META.get("HTTP_ACCEPT", ""):
+            return None
+        if not has_valid_api_key(request):
+            return None
+        return handlers
@@ -1,12 +1,41 @@
 from rest_framework import permissions
-from django.conf import settings
+from rest_framework.exceptions import Throttled
+
+from apps.authentication.api_keys import alookup_api_key, consume_api_key_quota, lookup_api_key
+
+
+def is_valid_api_key(api_key):
+    return lookup_api_key(api_key) is not None
+
+
+async def ais_valid_api_key(api_key):
+    return await alookup_api_key(api_key) is not None
+
+
+def has_valid_api_key(request):
+    """
+    Check the API-Key header. Also used by middleware, before DRF runs.
+    ``APIKeyMiddleware`` stores the resolved key as ``request.api_key``.
+    """
+    if hasattr(request, "api_key"):
+        return request.api_key is not None
+    return is_valid_api_key(request.headers.get("API-Key"))
 
 
 class HasValidAPIKey(permissions.BasePermission):
     """
-    Custom permission to check if a valid API-Key is provided in the request
+    Custom permission to check if a valid API-Key is provided in the request.
+    Keys over their quota get a 429 with ``Retry-After``.
     """
 
     def has_permission(self, request, view):
-        api_key = request.headers.get("API-Key")
-        return api_key in getattr(settings, "VALID_API_KEYS", [])
\ No newline at end of file
+        if hasattr(request, "api_key"):
+            # The middleware already checked the key and spent its quota
+            return request.api_key is not None
+        entry = lookup_api_key(request.headers.get("API-Key"))
+        if entry is None:
+            return False
+        allowed, retry_after = consume_api_key_quota(entry)
+        if not allowed:
+            raise Throttled(wait=retry_after)
+        return True
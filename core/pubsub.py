@@ -0,0 +1,113 @@
+"""
+Reparto de mensajes de Redis pub/sub dentro de un proceso ASGI.
+
+Una suscripción por cliente (SSE, WebSocket) ocuparía una conexión del pool
+por cada lector conectado. ``PubSubHub`` mantiene una sola suscripción por
+patrón y event loop, y reparte cada mensaje en colas locales por canal.
+"""
+import asyncio
+import contextlib
+import logging
+import weakref
+
+from core.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def _running_in(loop):
+    """
+    ``True`` si el código corre en ``loop`` y este sigue activo. Un generador
+    recogido por el GC puede cerrarse fuera de su loop: ahí no se puede esperar.
+    """
+    try:
+        return asyncio.get_running_loop() is loop and not loop.is_closed()
+    except RuntimeError:
+        return False
+
+
+def get_hub(pattern):
+    """Hub de ``pattern`` para el event loop actual."""
+    hubs = _hubs.setdefault(asyncio.get_running_loop(), {})
+    hub = hubs.get(pattern)
+    if hub is None:
+        hub = hubs[pattern] = PubSubHub(pattern)
+    return hub
+
+
+class PubSubHub:
+    """
+    Suscripción compartida a ``pattern``. Se conecta con el primer suscriptor
+    y se cierra con el último; si Redis se cae, se reconecta sola.
+    """
+
+    def __init__(self, pattern, queue_size=100):
+        self.pattern = pattern
+        self.queue_size = queue_size
+        self._queues = {}
+        self._task = None
+        self._ready = asyncio.Event()
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, channel):
+        """Cola con los mensajes (``bytes``) publicados en ``channel`` mientras dure el bloque."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._queues.setdefault(channel, set()).add(queue)
+        if self._task is None or self._task.done():
+            self._ready.clear()
+            self._task = asyncio.get_running_loop().create_task(self._read())
+        try:
+            # Los mensajes publicados antes de suscribirse a Redis se perderían
+            await self._ready.wait()
+            yield queue
+        finally:
+            queues = self._queues.get(channel, set())
+            queues.discard(queue)
+            if not queues:
+                self._queues.pop(channel, None)
+            if not self._queues and self._task is not None:
+                task, self._task = self._task, None
+                task.cancel()
+                if _running_in(task.get_loop()):
+                    # Espera a que se cierre la suscripción y se libere la conexión
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await task
+
+    @property
+    def subscribers(self):
+        return sum(len(queues) for queues in self._queues.values())
+
+    async def _read(self):
+        while True:
+            pubsub = get_async_redis().pubsub()
+            try:
+                await pubsub.psubscribe(self.pattern)
+                self._ready.set()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and message["type"] == "pmessage":
+                        self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Mientras no estemos suscritos se pueden perder mensajes
+                logger.exception("Pub/sub listener for %s disconnected, retrying", self.pattern)
+                await asyncio.sleep(1)
+            finally:
+                # Se cancela la suscripción antes de cerrar: la conexión vuelve limpia
+                with contextlib.suppress(Exception):
+                    await pubsub.punsubscribe()
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
+    def _dispatch(self, channel, data):
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        for queue in list(self._queues.get(channel, ())):
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # Un cliente lento pierde mensajes en lugar de frenar a los demás
+                logger.warning("Dropping pub/sub message for a slow subscriber on %s", channel)
@@ -0,0 +1,235 @@
+"""
+Acceso compartido a Redis para contadores y estructuras propias de la app
+(lo que no pasa por el cache de Django, Celery ni channels).
+
+- ``get_redis()`` devuelve un cliente sobre un pool de conexiones por proceso,
+  configurado con ``REDIS_URL`` y los timeouts/reintentos de settings.
+- Con ``REDIS_BACKEND = "fake"`` devuelve un cliente de ``fakeredis`` en
+  memoria, para pruebas y benchmarks sin servidor (``requirements-test.txt``).
+  Con el extra ``lua`` los scripts se ejecutan igual que en Redis.
+- ``incr_many`` / ``drain_counters`` agrupan contadores en un solo round trip
+  y ``Script`` ejecuta Lua registrado una vez por cliente (``incr_expire``,
+  ``token_bucket``).
+- ``get_async_redis()`` / ``aincr_many`` son los equivalentes para vistas async
+  (``redis.asyncio``, un pool por event loop).
+"""
+import asyncio
+import os
+import threading
+import weakref
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
+
+_clients = {}
+_clients_lock = threading.RLock()
+
+# Los pools de redis.asyncio quedan ligados al loop que los creó
+_async_clients = weakref.WeakKeyDictionary()
+
+# Datos de fakeredis, compartidos por los clientes sync y async del proceso
+_fake_server = None
+
+
+def get_redis():
+    """Cliente de Redis del proceso actual (un pool por proceso y configuración)."""
+    backend = getattr(settings, "REDIS_BACKEND", "redis")
+    key = (os.getpid(), backend, settings.REDIS_URL)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _create_fake_client() if backend == "fake" else _create_client()
+                _clients[key] = client
+    return client
+
+
+def _pool_options():
+    return {
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        "health_check_interval": 30,
+        "retry_on_timeout": True,
+    }
+
+
+def _create_client():
+    pool = redis.ConnectionPool.from_url(
+        settings.REDIS_URL,
+        retry=Retry(ExponentialBackoff(cap=1, base=0.01), settings.REDIS_RETRIES),
+        **_pool_options(),
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+def _get_fake_server():
+    global _fake_server
+    # Dependencia de pruebas: no se importa con REDIS_BACKEND = "redis"
+    import fakeredis
+
+    with _clients_lock:
+        if _fake_server is None:
+            _fake_server = fakeredis.FakeServer()
+        return _fake_server
+
+
+def _create_fake_client():
+    import fakeredis
+
+    return fakeredis.FakeRedis(server=_get_fake_server())
+
+
+def get_async_redis(url=None):
+    """
+    Cliente de ``redis.asyncio`` para el event loop actual. Sin ``url`` usa
+    ``REDIS_URL`` (o ``fakeredis`` con ``REDIS_BACKEND = "fake"``).
+
+    Bajo uvicorn hay un loop por proceso; bajo WSGI cada petición a una vista
+    async crea su propio loop (y su pool), por eso las vistas async solo se
+    activan al servir por ASGI (``ASYNC_READ_VIEWS``).
+    """
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    if url is None:
+        if getattr(settings, "REDIS_BACKEND", "redis") == "fake":
+            client = clients.get("fake")
+            if client is None:
+                import fakeredis
+
+                client = clients["fake"] = fakeredis.FakeAsyncRedis(server=_get_fake_server())
+            return client
+        url = settings.REDIS_URL
+    client = clients.get(url)
+    if client is None:
+        pool = aioredis.ConnectionPool.from_url(
+            url,
+            retry=AsyncRetry(ExponentialBackoff(cap=1, base=0.01), settings.REDIS_RETRIES),
+            **_pool_options(),
+        )
+        client = clients[url] = aioredis.Redis(connection_pool=pool)
+    return client
+
+
+def reset_redis():
+    """Descarta los clientes creados y los datos de fakeredis (pruebas o cambio de configuración)."""
+    global _fake_server
+    with _clients_lock:
+        _clients.clear()
+        _fake_server = None
+    _async_clients.clear()
+
+
+# Contadores
+
+def incr_many(keys, amount=1, client=None):
+    """Incrementa varios contadores en un solo round trip."""
+    client = client or get_redis()
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.incrby(key, amount)
+    return pipe.execute()
+
+
+async def aincr_many(keys, amount=1, client=None):
+    """Versión async de ``incr_many``."""
+    client = client or get_async_redis()
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.incrby(key, amount)
+    return await pipe.execute()
+
+
+def drain_counters(keys, client=None):
+    """
+    Lee y borra los contadores de forma atomica (MULTI/EXEC): los incrementos
+    que llegan mientras se sincroniza quedan para la siguiente ejecucion.
+    Devuelve ``{key: int}`` sin los contadores vacios.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    client = client or get_redis()
+    pipe = client.pipeline(transaction=True)
+    pipe.mget(keys)
+    pipe.delete(*keys)
+    values, _ = pipe.execute()
+    return {key: int(value) for key, value in zip(keys, values) if value and int(value)}
+
+
+class Script:
+    """Script Lua registrado una vez por cliente (``EVALSHA``, con ``EVAL`` si Redis no lo tiene)."""
+
+    def __init__(self, lua):
+        self.lua = lua
+        # Un cliente que se descarta (su event loop se cerró) libera su entrada
+        self._scripts = weakref.WeakKeyDictionary()
+
+    def _get_script(self, client):
+        script = self._scripts.get(client)
+        if script is None:
+            script = client.register_script(self.lua)
+            # Siempre se llama con ``client``: sin la referencia, la entrada no mantiene vivo al cliente
+            script.registered_client = None
+            self._scripts[client] = script
+        return script
+
+    def __call__(self, keys=(), args=(), client=None):
+        client = client or get_redis()
+        return self._get_script(client)(keys=keys, args=args, client=client)
+
+    async def acall(self, keys=(), args=(), client=None):
+        """Versión async; ``client`` es un cliente de ``get_async_redis()``."""
+        client = client or get_async_redis()
+        return await self._get_script(client)(keys=keys, args=args, client=client)
+
+
+# INCRBY que fija el TTL solo al crear la clave (ventanas fijas, límites)
+incr_expire = Script(
+    """
+    local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+    if value == tonumber(ARGV[1]) then
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+    end
+    return value
+    """
+)
+
+
+# Token bucket: ARGV = tokens por segundo, capacidad, coste de la petición.
+# Devuelve {permitido (0/1), ms hasta tener tokens, tokens restantes}. Si se
+# permite, incrementa además los contadores de KEYS[2..] en el mismo round trip.
+# El reloj es el de Redis: todos los procesos ven el mismo.
+token_bucket = Script(
+    """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local updated_at = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate / 1000)
+
+    local allowed, retry_after = 0, 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+        for i = 2, #KEYS do
+            redis.call('INCR', KEYS[i])
+        end
+    else
+        retry_after = math.ceil((cost - tokens) * 1000 / rate)
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+    return {allowed, retry_after, math.floor(tokens)}
+    """
+)
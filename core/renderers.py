@@ -0,0 +1,69 @@
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# orjson no escapa U+2028 / U+2029; DRF sí, para que el JSON sea JavaScript válido
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+_encoder = JSONEncoder()
+
+
+def default(obj):
+    """
+    Tipos que orjson no serializa de forma nativa (Decimal, lazy strings,
+    timedelta, QuerySet, generadores...): misma representación que DRF.
+    """
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson. Same output as DRF's renderer for the data
+    the API returns (UUIDs as strings, UTC datetimes with ``Z``, Decimal as
+    float). Indented output (browsable API, ``; indent=``) and anything orjson
+    cannot encode fall back to the stdlib renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # p. ej. enteros de más de 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+def event_stream_frame(event, data, event_id=None):
+    """Un evento SSE con ``data`` en JSON (una sola línea: orjson escapa los saltos)."""
+    frame = b"event: " + event.encode() + b"\n"
+    if event_id is not None:
+        frame += b"id: " + str(event_id).encode() + b"\n"
+    return frame + b"data: " + ORJSONRenderer().render(data) + b"\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets views that stream server-sent events negotiate ``text/event-stream``.
+    The stream itself is written by the view; regular responses (errors) are
+    rendered as a single ``error`` event.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return event_stream_frame("error", data)
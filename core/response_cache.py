@@ -0,0 +1,188 @@
+import gzip
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import parse_http_date_safe
+
+from core.cache import acache_get, aget_generation, get_generation
+from core.conditional import signed_url_window
+from core.db_router import use_replicas
+
+try:
+    import brotli
+except ImportError:  # Sin brotli se sirven solo gzip e identity
+    brotli = None
+
+# Orden de preferencia cuando el cliente acepta varias codificaciones
+ENCODINGS = ("br", "gzip")
+
+# Cabeceras de la respuesta original que se guardan junto al cuerpo
+CACHED_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Vary")
+
+
+class CachedResponse:
+    """
+    Respuesta ya renderizada, con el cuerpo en cada codificación disponible.
+    ``meta`` guarda lo que se necesita para los efectos de la vista (p. ej. ids
+    de posts para impresiones) cuando se sirve sin pasar por ella.
+    """
+
+    __slots__ = ("status", "content_type", "headers", "bodies", "meta")
+
+    def __init__(self, status, content_type, headers, bodies, meta=None):
+        self.status = status
+        self.content_type = content_type
+        self.headers = headers
+        self.bodies = bodies
+        self.meta = meta or {}
+
+    def __getstate__(self):
+        return (self.status, self.content_type, self.headers, self.bodies, self.meta)
+
+    def __setstate__(self, state):
+        self.status, self.content_type, self.headers, self.bodies, self.meta = state
+
+
+def compress(content):
+    """Devuelve ``{encoding: body}`` con el cuerpo sin comprimir y sus versiones comprimidas."""
+    bodies = {"identity": content}
+    if len(content) < settings.RESPONSE_CACHE_MIN_COMPRESS_SIZE:
+        return bodies
+
+    bodies["gzip"] = gzip.compress(content, compresslevel=settings.RESPONSE_CACHE_GZIP_LEVEL, mtime=0)
+    if brotli is not None:
+        bodies["br"] = brotli.compress(content, quality=settings.RESPONSE_CACHE_BROTLI_QUALITY)
+
+    # Solo se guardan las codificaciones que realmente reducen el tamaño
+    return {encoding: body for encoding, body in bodies.items() if len(body) <= len(content)}
+
+
+def negotiate_encoding(accept_encoding, available):
+    """Elige la mejor codificación de ``available`` según la cabecera Accept-Encoding."""
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        encoding, _, params = item.strip().partition(";")
+        encoding = encoding.strip().lower()
+        if not encoding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[encoding] = quality
+
+    for encoding in ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+def response_cache_key(request, namespace, signed=False):
+    """
+    Clave de la respuesta renderizada para ``request``. Incluye la generación de
+    ``namespace`` (para invalidar con ``bump_generation``) y, si la respuesta
+    contiene URLs firmadas, la ventana de firma actual.
+    """
+    return _make_response_cache_key(request, namespace, get_generation(f"responses:{namespace}"), signed)
+
+
+async def aresponse_cache_key(request, namespace, signed=False):
+    return _make_response_cache_key(request, namespace, await aget_generation(f"responses:{namespace}"), signed)
+
+
+def _make_response_cache_key(request, namespace, generation, signed):
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    key = f"response:{namespace}:{generation}:{request.path}?{query}"
+    if signed:
+        key += f":{signed_url_window()}"
+    return key
+
+
+def cache_response(key, response, timeout, meta=None):
+    """
+    Comprime ``response`` (ya renderizada) y la guarda en ``key``.
+    Devuelve el ``CachedResponse`` para servirlo en esta misma petición.
+    """
+    cached = CachedResponse(
+        status=response.status_code,
+        content_type=response["Content-Type"],
+        headers={header: response[header] for header in CACHED_HEADERS if response.has_header(header)},
+        bodies=compress(response.content),
+        meta=meta,
+    )
+    cache.set(key, cached, timeout=timeout)
+    return cached
+
+
+def get_cached_response(key):
+    cached = cache.get(key)
+    return cached if isinstance(cached, CachedResponse) else None
+
+
+async def aget_cached_response(key):
+    cached = await acache_get(key)
+    return cached if isinstance(cached, CachedResponse) else None
+
+
+def serve_cached_response(request, cached):
+    """Construye la respuesta HTTP en la codificación que acepta el cliente, sin volver a comprimir."""
+    etag = cached.headers.get("ETag")
+    last_modified = parse_http_date_safe(cached.headers.get("Last-Modified", ""))
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        for header, value in cached.headers.items():
+            not_modified[header] = value
+        patch_vary_headers(not_modified, ("Accept-Encoding",))
+        return not_modified
+
+    encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING"), cached.bodies)
+    response = HttpResponse(cached.bodies[encoding], status=cached.status, content_type=cached.content_type)
+    for header, value in cached.headers.items():
+        response[header] = value
+
+    if encoding != "identity":
+        response["Content-Encoding"] = encoding
+        # El cuerpo comprimido no es idéntico byte a byte: ETag débil, como GZipMiddleware
+        if etag and not etag.startswith("W/"):
+            response["ETag"] = f"W/{etag}"
+    response["Content-Length"] = str(len(response.content))
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Para vistas de DRF: sirve la respuesta renderizada y comprimida desde el cache,
+    o la construye con ``build()``, la renderiza y comprime una sola vez y la guarda.
+    """
+
+    def cached_response(self, request, key, build, timeout=60 * 5, meta=None):
+        cached = get_cached_response(key)
+        if cached is None:
+            # Lo que se cachea se lee del primario, como en get_or_fill
+            with use_replicas(False):
+                response = build()
+            # Solo se cachean respuestas correctas en JSON (no la API navegable)
+            if response.status_code != 200 or request.accepted_renderer.format != "json":
+                return response
+            response = self.finalize_response(request, response)
+            response.render()
+            cached = cache_response(key, response, timeout, meta=meta)
+        return serve_cached_response(request, cached)
+
+    async def acached_response(self, request, key, build, timeout=60 * 5, meta=None):
+        """
+        Versión async de ``cached_response``: un acierto se sirve sin salir del
+        loop; ``build`` (ORM, serializadores) se ejecuta en un hilo.
+        """
+        cached = await aget_cached_response(key)
+        if cached is None:
+            return await sync_to_async(self.cached_response)(request, key, build, timeout=timeout, meta=meta)
+        return serve_cached_response(request, cached)
@@ -1,9 +1,12 @@
+import logging
 import os
 import environ
 from datetime import timedelta
 
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -16,7 +19,8 @@ environ.Env.read_env()
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = env("SECRET_KEY")
-VALID_API_KEYS = env.str("VALID_API_KEYS").split(",")
+# Claves de entorno, válidas junto a las del modelo APIKey (las nuevas se crean en el admin)
+VALID_API_KEYS = env.list("VALID_API_KEYS", default=[])
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
@@ -43,6 +47,7 @@ PROJECT_APPS = [
     'apps.media',
     'apps.blog',
     'apps.newsletter',
+    'apps.emails',
 ]
 
 THIRD_PARTY_APPS = [
@@ -72,7 +77,13 @@ AXES_LOCK_OUT_AT_FAILURE = True
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.WhiteNoiseMiddleware',
+    # API key y su cuota antes de tocar la base de datos
+    'core.middleware.APIKeyMiddleware',
+    # Lecturas de peticiones GET a las réplicas, salvo justo después de escribir
+    'core.middleware.ReplicaRoutingMiddleware',
+    # Respuestas cacheadas de endpoints públicos antes de sesión, autenticación y DRF
+    'core.middleware.CachedResponseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -112,6 +123,38 @@ ASGI_APPLICATION = 'core.asgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Tipo de proceso: asgi (uvicorn), web (WSGI/runserver), worker (celery) o beat
+PROCESS_TYPE = env("PROCESS_TYPE", default="web")
+
+# Segundos que cada proceso reutiliza su conexión a Postgres (0 = una por petición/tarea).
+# Bajo ASGI el código sync de cada petición corre en su propio hilo y las conexiones
+# persistentes se acumularían: el proceso asgi abre una conexión por petición contra
+# PgBouncer, que mantiene el pool de conexiones reales a Postgres.
+DATABASE_CONN_MAX_AGE = {
+    "asgi": 0,
+    "web": 60,
+    "worker": 60 * 10,
+    "beat": 0,
+}
+
+# PgBouncer en modo transaction: los cursores del lado del servidor no
+# sobreviven entre transacciones, así que se desactivan
+DATABASE_PGBOUNCER = env.bool("DATABASE_PGBOUNCER", default=False)
+
+# Sin PgBouncer el proceso asgi abre una conexión a Postgres por petición. Funciona
+# (desarrollo, despliegues pequeños), pero se avisa; con DATABASE_PGBOUNCER_REQUIRED
+# el arranque falla
+DATABASE_PGBOUNCER_REQUIRED = env.bool("DATABASE_PGBOUNCER_REQUIRED", default=False)
+
+if PROCESS_TYPE == "asgi" and not DATABASE_PGBOUNCER:
+    message = (
+        "PROCESS_TYPE=asgi without PgBouncer opens a Postgres connection per request: "
+        "point DATABASE_HOST/DATABASE_PORT at PgBouncer and set DATABASE_PGBOUNCER=True"
+    )
+    if DATABASE_PGBOUNCER_REQUIRED:
+        raise ImproperlyConfigured(message)
+    logging.getLogger(__name__).warning(message)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -119,10 +162,33 @@ DATABASES = {
         'USER': env("DATABASE_USER"),
         'PASSWORD': env("DATABASE_PASSWORD"),
         'HOST': env("DATABASE_HOST"),
-        'PORT': 5432
+        'PORT': env.int("DATABASE_PORT", default=5432),
+        'CONN_MAX_AGE': env.int("DATABASE_CONN_MAX_AGE", default=DATABASE_CONN_MAX_AGE.get(PROCESS_TYPE, 0)),
+        # Una conexión reutilizada se comprueba antes de la primera consulta de cada petición
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': DATABASE_PGBOUNCER,
+        'OPTIONS': {
+            'connect_timeout': env.int("DATABASE_CONNECT_TIMEOUT", default=5),
+        },
     }
 }
 
+# Réplicas de lectura: mismas credenciales que el primario, otro host. En pruebas
+# reflejan la base de datos de pruebas del primario (TEST.MIRROR).
+DATABASE_REPLICAS = []
+for index, host in enumerate(env.list("DATABASE_REPLICA_HOSTS", default=[]), start=1):
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+
+DATABASE_ROUTERS = ["core.db_router.PrimaryReplicaRouter"]
+
+# Segundos que un cliente lee del primario después de escribir (lag de replicación)
+DATABASE_REPLICA_STICKY_SECONDS = env.int("DATABASE_REPLICA_STICKY_SECONDS", default=5)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -177,11 +243,29 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly"
     ],
+    # JWTAuthentication con el usuario en cache (AUTH_USER_CACHE_TIMEOUT)
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication"
-    ]
+        "apps.authentication.authentication.CachedJWTAuthentication"
+    ],
+    # orjson para JSON; la API navegable sigue disponible
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # Token buckets en Redis para las vistas que declaran rate_limits
+    "DEFAULT_THROTTLE_CLASSES": [
+        "core.ratelimit.TokenBucketThrottle",
+    ],
 }
 
+# Permite desactivar los límites de peticiones de las vistas (pruebas de carga)
+RATELIMIT_ENABLED = env.bool("RATELIMIT_ENABLED", default=True)
+
 AUTHENTICATION_BACKENDS = (
     # AxesStandaloneBackend should be the first backend in the AUTHENTICATION_BACKENDS list.
     'axes.backends.AxesStandaloneBackend',
@@ -201,6 +285,13 @@ SIMPLE_JWT = {
     "SIGNING_KEY": env("SECRET_KEY"),
 }
 
+# Códigos OTP enviados por email: validez en segundos e intentos antes de invalidarlos
+OTP_TTL = env.int("OTP_TTL", default=60 * 5)
+OTP_MAX_ATTEMPTS = env.int("OTP_MAX_ATTEMPTS", default=5)
+
+# Vida en cache del usuario de los tokens; guardarlo o borrarlo lo invalida antes
+AUTH_USER_CACHE_TIMEOUT = env.int("AUTH_USER_CACHE_TIMEOUT", default=60 * 5)
+
 DJOSER = {
     'LOGIN_FIELD': "email",
     'USER_CREATE_PASSWORD_RETYPE': True,
@@ -230,34 +321,93 @@ DJOSER = {
     }
 }
 
+REDIS_HOST = env("REDIS_HOST")
+REDIS_URL = env("REDIS_URL")
+
+# Cliente compartido de core.redis_client (contadores de analítica, etc.)
+REDIS_BACKEND = env.str("REDIS_BACKEND", default="redis") # "fake": fakeredis en memoria para pruebas y benchmarks (requirements-test.txt)
+REDIS_MAX_CONNECTIONS = env.int("REDIS_MAX_CONNECTIONS", default=50)
+REDIS_SOCKET_TIMEOUT = env.float("REDIS_SOCKET_TIMEOUT", default=2)
+REDIS_SOCKET_CONNECT_TIMEOUT = env.float("REDIS_SOCKET_CONNECT_TIMEOUT", default=2)
+REDIS_RETRIES = env.int("REDIS_RETRIES", default=3)
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
         "CONFIG": {
-            "hosts": [env("REDIS_URL")]
+            "hosts": [REDIS_URL]
         }
     }
 }
 
-REDIS_HOST = env("REDIS_HOST")
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": env("REDIS_URL"),
+        "LOCATION": REDIS_URL,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient"
         }
     }
 }
 
+# Cache local (LRU por proceso) delante de Redis para las claves más leídas
+LOCAL_CACHE_MAX_ENTRIES = env.int("LOCAL_CACHE_MAX_ENTRIES", default=1024)
+LOCAL_CACHE_TIMEOUT = env.int("LOCAL_CACHE_TIMEOUT", default=30)
+LOCAL_CACHE_INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Las entradas expiradas se sirven mientras un solo worker las reconstruye en segundo plano
+CACHE_BACKGROUND_REFRESH = env.bool("CACHE_BACKGROUND_REFRESH", default=True)
+
+# Respuestas renderizadas: se comprimen una vez al llenar el cache, no en cada petición
+RESPONSE_CACHE_MIN_COMPRESS_SIZE = 512
+RESPONSE_CACHE_GZIP_LEVEL = 9
+RESPONSE_CACHE_BROTLI_QUALITY = 9
+
+# Variantes async de los endpoints de lectura (solo al servir por ASGI, p. ej. uvicorn)
+ASYNC_READ_VIEWS = env.bool("ASYNC_READ_VIEWS", default=False)
+
+# Endpoints públicos que CachedResponseMiddleware sirve directamente desde el cache
+CACHED_RESPONSE_ROUTES = {
+    "post-list": "apps.blog.fast_path.post_list",
+    "post-detail": "apps.blog.fast_path.post_detail",
+    "post-headings": "apps.blog.fast_path.post_headings",
+}
+
 CHANNELS_ALLOWED_ORIGINS = "http://localhost:3000"
 
+# Comentario SSE de keepalive cuando no hay eventos (segundos)
+SSE_KEEPALIVE_INTERVAL = env.int("SSE_KEEPALIVE_INTERVAL", default=15)
+# Duración máxima de un stream SSE antes de que el cliente se reconecte (segundos)
+SSE_STREAM_TIMEOUT = env.int("SSE_STREAM_TIMEOUT", default=60 * 5)
+
+# Como máximo un mensaje de contadores por post en cada intervalo (segundos)
+POST_COUNTERS_INTERVAL = env.float("POST_COUNTERS_INTERVAL", default=1)
+
+# Eventos de vistas (stream de Redis) aplicados por lotes
+POST_EVENTS_BATCH_SIZE = env.int("POST_EVENTS_BATCH_SIZE", default=1000)
+# Segundos entre la primera vista y el flush que la aplica
+POST_EVENTS_FLUSH_INTERVAL = env.int("POST_EVENTS_FLUSH_INTERVAL", default=5)
+# Lotes por ejecución; si quedan eventos se programa otra
+POST_EVENTS_MAX_BATCHES = env.int("POST_EVENTS_MAX_BATCHES", default=20)
+# Segundos sin confirmar tras los que otro consumidor reclama un lote
+POST_EVENTS_CLAIM_IDLE = env.int("POST_EVENTS_CLAIM_IDLE", default=60)
+# Longitud máxima (aproximada) del stream si el consumidor se detiene
+POST_EVENTS_MAX_LENGTH = env.int("POST_EVENTS_MAX_LENGTH", default=1_000_000)
+
+# Por debajo de estas filas estimadas el admin cuenta exacto (COUNT(*))
+ADMIN_EXACT_COUNT_THRESHOLD = env.int("ADMIN_EXACT_COUNT_THRESHOLD", default=10000)
+
+# Filas leídas por vuelta del cursor y escritas por bloque en las exportaciones
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", default=2000)
+
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
+# Cada proceso hijo mantiene su propia conexión persistente a Postgres
+CELERY_WORKER_CONCURRENCY = env.int("CELERY_WORKER_CONCURRENCY", default=4)
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "America/Lima"
 
-CELERY_BROKER_URL = env("REDIS_URL")
+CELERY_BROKER_URL = REDIS_URL
 CELERY_BROKER_TRANSPORT_OPTIONS = {
     'visibility_timeout': 3600,
     'socket_timeout': 5,
@@ -269,18 +419,63 @@ CELERY_CACHE_BACKEND = 'default'
 
 CELERY_IMPORTS = (
     'core.tasks',
-    'apps.blog.tasks'
+    'apps.blog.tasks',
+    'apps.authentication.tasks',
+    'apps.emails.tasks',
 )
 
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
-CELERY_BEAT_SCHEDULE = {}
+CELERY_BEAT_SCHEDULE = {
+    "warm-post-caches": {
+        "task": "apps.blog.tasks.warm_post_caches",
+        "schedule": 60 * 4,
+    },
+    # Respaldo: las vistas ya programan su propio flush
+    "flush-post-view-events": {
+        "task": "apps.blog.tasks.flush_post_view_events",
+        "schedule": 60,
+    },
+    # Respaldo y reintentos: encolar un email ya programa su envío
+    "send-outbox-emails": {
+        "task": "apps.emails.tasks.send_outbox_emails",
+        "schedule": 60,
+    },
+    "sync-api-key-usage": {
+        "task": "apps.authentication.tasks.sync_api_key_usage",
+        "schedule": 60,
+    },
+}
 
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+# API keys: cuota por defecto (token bucket por clave) y vida del conjunto de claves en cache
+API_KEY_RATE_LIMIT = env.int("API_KEY_RATE_LIMIT", default=600) # Peticiones por minuto
+API_KEY_BURST = env.int("API_KEY_BURST", default=0) # Ráfaga máxima; 0 = una ventana de API_KEY_RATE_LIMIT
+SETTINGS_API_KEY_RATE_LIMIT = env.int("SETTINGS_API_KEY_RATE_LIMIT", default=0) # Cuota de las claves de VALID_API_KEYS; 0 = sin cuota
+API_KEY_CACHE_TIMEOUT = env.int("API_KEY_CACHE_TIMEOUT", default=60 * 5) # Los cambios invalidan el cache al momento
+
+# Calentamiento de cache: posts más vistos y primeras páginas de los listados
+CACHE_WARM_TOP_POSTS = env.int("CACHE_WARM_TOP_POSTS", default=20)
+CACHE_WARM_TOP_CATEGORIES = env.int("CACHE_WARM_TOP_CATEGORIES", default=10)
+CACHE_WARM_LIST_PAGES = env.int("CACHE_WARM_LIST_PAGES", default=3)
+CACHE_WARM_SORTINGS = [None, "newest", "recently_updated", "most_viewed"]
+CACHE_WARM_MIN_TTL = 60 * 4 # Solo se recalculan las claves que expirarían antes de la siguiente ejecución
+CACHE_WARM_INTERVAL = env.float("CACHE_WARM_INTERVAL", default=0.1) # Pausa entre claves para no competir con el tráfico
+CACHE_WARM_COUNTDOWN = 30 # Agrupa las publicaciones cercanas en un solo calentamiento
+
+# Los emails se guardan en la bandeja de salida y un worker los envía con EMAIL_DELIVERY_BACKEND
+EMAIL_BACKEND = "apps.emails.backends.OutboxEmailBackend"
+EMAIL_DELIVERY_BACKEND = env.str("EMAIL_DELIVERY_BACKEND", default="django.core.mail.backends.console.EmailBackend")
+EMAIL_OUTBOX_BATCH_SIZE = env.int("EMAIL_OUTBOX_BATCH_SIZE", default=50) # Emails por conexión
+EMAIL_OUTBOX_MAX_BATCHES = env.int("EMAIL_OUTBOX_MAX_BATCHES", default=20) # Lotes por ejecución del worker
+EMAIL_OUTBOX_FLUSH_DELAY = 1 # Agrupa los emails de peticiones cercanas en un envío
+EMAIL_OUTBOX_MAX_ATTEMPTS = env.int("EMAIL_OUTBOX_MAX_ATTEMPTS", default=5)
+EMAIL_OUTBOX_RETRY_DELAY = env.int("EMAIL_OUTBOX_RETRY_DELAY", default=30) # Segundos; se dobla en cada intento
+EMAIL_OUTBOX_LOCK_TIMEOUT = 60 * 5 # Un lote reservado por un worker caído vuelve a enviarse pasado este tiempo
 
 # Configuracion de Cloudfront
 AWS_CLOUDFRONT_DOMAIN=env("AWS_CLOUDFRONT_DOMAIN")
 AWS_CLOUDFRONT_KEY_ID =env.str("AWS_CLOUDFRONT_KEY_ID").strip()
 AWS_CLOUDFRONT_KEY =env.str("AWS_CLOUDFRONT_KEY", multiline=True).encode("ascii").strip()
+AWS_CLOUDFRONT_SIGNED_URL_EXPIRE = 60 # Segundos de validez de las URLs firmadas de media
 
 # Configuraciones de AWS
 AWS_ACCESS_KEY_ID=env("AWS_ACCESS_KEY_ID")
@@ -312,7 +507,7 @@ DEFAULT_FILE_STORAGE = "core.storage_backends.PublicMediaStorage"
 
 
 if not DEBUG:
-    EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    EMAIL_DELIVERY_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
     EMAIL_HOST = env("EMAIL_HOST")
     EMAIL_PORT = env("EMAIL_PORT")
     EMAIL_HOST_USER = env("EMAIL_HOST_USER")
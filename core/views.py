@@ -0,0 +1,42 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from rest_framework_api.views import StandardAPIView
+
+
+class AsyncStandardAPIView(StandardAPIView):
+    """
+    ``StandardAPIView`` con handlers ``async def``.
+
+    DRF solo despacha vistas sync: aquí ``dispatch`` es una corrutina, así que
+    Django la ejecuta en el event loop bajo ASGI. Las partes sync de DRF
+    (autenticación JWT, permisos, throttling, negociación) se ejecutan en un
+    hilo con ``sync_to_async``; el resto del handler queda libre para esperar
+    al cache y a Redis sin ocupar un hilo.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # request.user queda resuelto aquí y el handler ya no consulta la base de datos
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # OPTIONS y métodos no permitidos siguen siendo sync
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
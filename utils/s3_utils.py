@@ -1,12 +1,18 @@
+import datetime
+import functools
 import logging
 
 from django.conf import settings
+from django.core.cache import cache
 from botocore.exceptions import ClientError
+from botocore.signers import CloudFrontSigner
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import padding
 
+from core.conditional import signed_url_window
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,13 +39,19 @@ def generate_presigned_url(s3_client, client_method, method_parameters, expires_
     return url
 
 
-def rsa_signer(message):
-    # Load the private key from the string in Django settings
-    private_key = serialization.load_pem_private_key(
-        settings.AWS_CLOUDFRONT_KEY,  # Directly use the key from settings
+@functools.lru_cache(maxsize=1)
+def load_private_key(pem):
+    # Parsing the PEM costs more than the signature itself, so it is done once per key
+    return serialization.load_pem_private_key(
+        pem,
         password=None,  # No password is assumed; adjust if your key is password-protected
         backend=default_backend()
     )
+
+
+def rsa_signer(message):
+    # Load the private key from the string in Django settings
+    private_key = load_private_key(settings.AWS_CLOUDFRONT_KEY)
     # Sign the message
     signature = private_key.sign(
         message,
@@ -47,4 +59,40 @@ def rsa_signer(message):
         hashes.SHA1()
     )
     # Return the base64-encoded signature
-    return signature
\ No newline at end of file
+    return signature
+
+def cloudfront_signed_url(key, expire_date):
+    """Sign the CloudFront URL of the object ``key``, valid until ``expire_date``."""
+    signer = CloudFrontSigner(str(settings.AWS_CLOUDFRONT_KEY_ID), rsa_signer)
+    return signer.generate_presigned_url(
+        f"https://{settings.AWS_CLOUDFRONT_DOMAIN}/{key}", date_less_than=expire_date
+    )
+
+
+def cached_signed_urls(keys):
+    """
+    Signed URLs for many object keys with a single cache round trip.
+
+    Each key is signed once per signed URL window and the URL is valid until
+    the end of the following window, so a cached URL always has at least
+    ``AWS_CLOUDFRONT_SIGNED_URL_EXPIRE`` seconds left when it is served.
+    Returns a dict mapping each key to its URL.
+    """
+    expire = settings.AWS_CLOUDFRONT_SIGNED_URL_EXPIRE
+    window = signed_url_window()
+    cache_keys = {f"signed_url:{window}:{key}": key for key in set(keys) if key}
+    if not cache_keys:
+        return {}
+
+    urls = cache.get_many(list(cache_keys))
+    expire_date = datetime.datetime.fromtimestamp((window + 2) * expire, tz=datetime.timezone.utc)
+    missing = {
+        cache_key: cloudfront_signed_url(key, expire_date)
+        for cache_key, key in cache_keys.items()
+        if cache_key not in urls
+    }
+    if missing:
+        cache.set_many(missing, timeout=expire)
+        urls.update(missing)
+
+    return {cache_keys[cache_key]: url for cache_key, url in urls.items()}
@@ -1,8 +1,9 @@
 import re
+import threading
 from urllib.parse import urlparse
 
 from rest_framework import serializers
-import bleach
+from bleach.sanitizer import Cleaner
 
 ALLOWED_TAGS = [
     "p", "h1", "h2", "ul", "ol", "li", "sub", "sup", "blockquote",
@@ -12,32 +13,67 @@ ALLOWED_TAGS = [
 ALLOWED_ATTRIBUTES = {"a": ["href", "title"]}
 ALLOWED_SCHEMES = ['http', 'https']
 
+# Patrones compilados una sola vez al importar el modulo
+STRING_PATTERN = re.compile(r"[^a-zA-Z0-9\s',:.?-ÁÉÍÓÚáéíóúÑñüÜ]")
+USERNAME_PATTERN = re.compile(r"[^a-zA-Z0-9_-]")
+URL_PATTERN = re.compile(r'^(https?://)?([a-zA-Z0-9.-]+(?:\.[a-zA-Z]{2,6}))([:/?#].*)?$')
+
+# Texto ASCII imprimible sin '<', '>' ni '&': bleach lo devuelve sin cambios
+UNSAFE_TEXT_PATTERN = re.compile(r"[^\t\n\x20-\x25\x27-\x3b\x3d\x3f-\x7e]")
+
+# Los Cleaner de bleach no son thread-safe, se mantiene uno por hilo
+_cleaners = threading.local()
+
+
+def _get_cleaner(name):
+    """Return the per-thread bleach Cleaner for ``name`` ("text" or "html")."""
+    cleaner = getattr(_cleaners, name, None)
+    if cleaner is None:
+        if name == "html":
+            cleaner = Cleaner(
+                tags=ALLOWED_TAGS,
+                attributes=ALLOWED_ATTRIBUTES,
+                protocols=ALLOWED_SCHEMES,
+                strip=True
+            )
+        else:
+            cleaner = Cleaner(tags=[], strip=True)
+        setattr(_cleaners, name, cleaner)
+    return cleaner
+
+
+def is_safe_text(value):
+    """Return True when bleach would leave ``value`` untouched."""
+    return UNSAFE_TEXT_PATTERN.search(value) is None
+
+
+def strip_tags(value):
+    """Remove every HTML tag from ``value``, skipping bleach for safe input."""
+    if is_safe_text(value):
+        return value
+    return _get_cleaner("text").clean(value)
+
+
 def sanitize_string(string):
     if string is None:
         return ""
-    
+
     # Sanitizar usando bleach para remover cualquier tag que no deseamos
-    cleaned_string = bleach.clean(string, tags=[], strip=True)
+    cleaned_string = strip_tags(string)
 
     # Permittir solamente letras, numeros, espacios, apostrofes, comillas, comas y puntos
-    pattern = re.compile(r"[^a-zA-Z0-9\s',:.?-ÁÉÍÓÚáéíóúÑñüÜ]")
-
-    # Remover caracters indeseados
-    sanitized_string = pattern.sub("", cleaned_string)
+    sanitized_string = STRING_PATTERN.sub("", cleaned_string)
 
     return sanitized_string
 
 def sanitize_html(content):
     if content is None:
         return ""
-    
-    return bleach.clean(
-        content, 
-        tags=ALLOWED_TAGS, 
-        attributes=ALLOWED_ATTRIBUTES, 
-        protocols=ALLOWED_SCHEMES, 
-        strip=True
-    )
+
+    if is_safe_text(content):
+        return content
+
+    return _get_cleaner("html").clean(content)
 
 def sanitize_username(username):
     """Sanitizes and validates a username to ensure it contains only safe characters."""
@@ -45,13 +81,10 @@ def sanitize_username(username):
         return ""
 
     # Strip all unwanted HTML or special characters
-    cleaned_username = bleach.clean(username, tags=[], strip=True)
+    cleaned_username = strip_tags(username)
 
-    # Define a regex pattern to allow only letters, numbers, underscores, and hyphens
-    pattern = re.compile(r"[^a-zA-Z0-9_-]")
-
-    # Remove any characters that don't match the pattern
-    sanitized_username = pattern.sub("", cleaned_username)
+    # Remove any characters that are not letters, numbers, underscores or hyphens
+    sanitized_username = USERNAME_PATTERN.sub("", cleaned_username)
 
     # Ensure the username is not too long (e.g., max 150 characters)
     if len(sanitized_username) > 150:
@@ -72,7 +105,7 @@ def sanitize_url(url):
         return ""
 
     # Strip all unwanted HTML or special characters
-    cleaned_url = bleach.clean(url, tags=[], strip=True)
+    cleaned_url = strip_tags(url)
 
     # Use urlparse to validate and check the scheme
     parsed_url = urlparse(cleaned_url)
@@ -85,11 +118,44 @@ def sanitize_url(url):
         raise serializers.ValidationError("Invalid URL. Missing hostname.")
 
     # Allow only valid URL characters using regex (can be extended based on specific needs)
-    url_pattern = re.compile(
-        r'^(https?://)?([a-zA-Z0-9.-]+(?:\.[a-zA-Z]{2,6}))([:/?#].*)?$'
-    )
-
-    if not url_pattern.match(cleaned_url):
+    if not URL_PATTERN.match(cleaned_url):
         raise serializers.ValidationError("Invalid URL format.")
 
-    return cleaned_url
\ No newline at end of file
+    return cleaned_url
+
+
+SANITIZERS = {
+    "string": sanitize_string,
+    "html": sanitize_html,
+    "username": sanitize_username,
+    "url": sanitize_url,
+}
+
+
+def sanitize_many(values, kind="string"):
+    """
+    Sanitize a list of values with the same sanitizer.
+    Repeated values are only sanitized once.
+    """
+    sanitizer = SANITIZERS[kind]
+    cleaned = {}
+    sanitized_values = []
+    for value in values:
+        if value not in cleaned:
+            cleaned[value] = sanitizer(value)
+        sanitized_values.append(cleaned[value])
+    return sanitized_values
+
+
+def sanitize_fields(data, fields, defaults=None):
+    """
+    Sanitize several fields of ``data`` in one call.
+
+    ``fields`` maps each field name to a key of ``SANITIZERS``. Missing fields
+    take their value from ``defaults`` (or None) before being sanitized.
+    """
+    defaults = defaults or {}
+    return {
+        field: SANITIZERS[kind](data.get(field, defaults.get(field)))
+        for field, kind in fields.items()
+    }